@@ -0,0 +1,23 @@
+# ============================================================================
+# backend/api/apps.py
+# ============================================================================
+"""
+Configuration de l'application api
+"""
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    """Configuration de l'application API générale"""
+    
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
+    verbose_name = 'API et statistiques'
+    
+    def ready(self):
+        """Configuration lors du chargement de l'application"""
+        import api.signals  # Importer les signaux
+        
+        from django.core import checks
+        from .conditionnel import verifier_cache_partage
+        checks.register(verifier_cache_partage, checks.Tags.caches)
@@ -0,0 +1,41 @@
+# ============================================================================
+# backend/api/bloom.py
+# ============================================================================
+"""
+Filtre de Bloom en mémoire
+Répond « absent » avec certitude et « peut-être présent » avec un taux de
+faux positifs borné : permet d'écarter sans requête les valeurs qui ne
+figurent pas dans une table de référence. Les k positions d'une valeur
+sont dérivées d'une seule empreinte blake2b (double hachage).
+"""
+import hashlib
+import math
+
+
+class FiltreBloom:
+    """Ensemble probabiliste de chaînes (ajout et test d'appartenance seulement)"""
+
+    def __init__(self, capacite, taux_faux_positifs=0.01):
+        capacite = max(int(capacite), 1)
+        self.taille = max(int(-capacite * math.log(taux_faux_positifs) / math.log(2) ** 2), 8)
+        self.nb_hachages = max(int(round(self.taille / capacite * math.log(2))), 1)
+        self.bits = bytearray((self.taille + 7) // 8)
+        self.nombre = 0
+
+    def positions(self, valeur):
+        empreinte = hashlib.blake2b(valeur.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(empreinte[:8], 'little')
+        h2 = int.from_bytes(empreinte[8:], 'little') | 1
+        return [(h1 + i * h2) % self.taille for i in range(self.nb_hachages)]
+
+    def ajouter(self, valeur):
+        for position in self.positions(valeur):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.nombre += 1
+
+    def __contains__(self, valeur):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.positions(valeur))
+
+    def __len__(self):
+        return self.nombre
@@ -0,0 +1,163 @@
+# ============================================================================
+# backend/api/conditionnel.py
+# ============================================================================
+"""
+Réponses HTTP conditionnelles (ETag / Last-Modified)
+Les validateurs d'une ressource combinent sa date_modification et une
+version des données liées (inscriptions, modules) tenue en cache et
+avancée par signaux, ainsi que les échéances déjà atteintes qui changent
+le contenu sans écriture (début ou fin d'un événement, date limite
+d'inscription). Une requête If-None-Match / If-Modified-Since dont les
+validateurs sont inchangés reçoit un 304 sans sérialisation.
+Les versions ne sont cohérentes que si le cache est partagé par tous les
+processus (Redis, fichiers) : verifier_cache_partage le signale au
+démarrage.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+# Durée de conservation (secondes) des versions en cache
+DUREE_VERSION = 7 * 24 * 3600
+
+# Contenu publié : réutilisable une minute par le client, puis revalidé ;
+# brouillon : toujours revalidé (le 304 évite de retélécharger)
+CACHE_CONTROL_PUBLIE = 'private, max-age=60, must-revalidate'
+CACHE_CONTROL_BROUILLON = 'private, no-cache'
+
+
+def cle_version(ressource):
+    return f'http_version_{ressource}'
+
+
+def version(ressource):
+    """Horodatage de la dernière modification connue des données liées à une ressource"""
+    cle = cle_version(ressource)
+    valeur = cache.get(cle)
+    if valeur is None:
+        # Version inconnue (cache vidé) : on la date de maintenant, ce qui
+        # invalide les validateurs déjà distribués
+        cache.add(cle, time.time(), DUREE_VERSION)
+        valeur = cache.get(cle, time.time())
+    return valeur
+
+
+def marquer_modification(*ressources):
+    """Avance la version des ressources (appelé par les signaux d'écriture)"""
+    maintenant = time.time()
+    cache.set_many({cle_version(ressource): maintenant for ressource in ressources}, DUREE_VERSION)
+
+
+# Caches propres à chaque processus : une modification écrite par un worker
+# n'y est pas vue par les autres
+CACHES_NON_PARTAGES = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+
+def verifier_cache_partage(app_configs, **kwargs):
+    """Check système : les versions et invalidations exigent un cache partagé"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in CACHES_NON_PARTAGES:
+        return [checks.Warning(
+            f"Le cache par défaut ({backend}) n'est pas partagé entre les processus",
+            hint="Configurer Redis, Memcached, un cache fichier ou base de données : "
+                 "les ETag, les corrigés de quiz et les tableaux de bord seraient périmés",
+            id='api.W001',
+        )]
+    return []
+
+
+def validateurs(request, date_modification=None, ressources=(), echeances=()):
+    """
+    Retourne (ETag, horodatage Last-Modified) d'une réponse.
+    `echeances` : dates auxquelles le contenu change de lui-même (champs
+    calculés par rapport à maintenant) ; celles déjà atteintes entrent dans
+    les validateurs, qui ne changent donc qu'avec les données.
+    L'ETag dépend aussi de l'URL, du format demandé et de l'utilisatrice
+    (les contenus portent des champs propres à chacune, ex. est_inscrit).
+    """
+    versions = [version(ressource) for ressource in ressources]
+    maintenant = timezone.now()
+    atteintes = sorted(echeance for echeance in echeances if echeance and echeance <= maintenant)
+    
+    horodatages = versions + [echeance.timestamp() for echeance in atteintes]
+    if date_modification is not None:
+        horodatages.append(date_modification.timestamp())
+    
+    empreinte = hashlib.md5('|'.join([
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        str(getattr(request.user, 'pk', '')),
+        date_modification.isoformat() if date_modification else '',
+        *(repr(valeur) for valeur in versions),
+        *(echeance.isoformat() for echeance in atteintes),
+    ]).encode()).hexdigest()
+    
+    return f'W/"{empreinte}"', int(max(horodatages, default=0))
+
+
+def appliquer_validateurs(reponse, etag, derniere_modification, publie=True):
+    """Ajoute ETag, Last-Modified et Cache-Control à une réponse"""
+    reponse['ETag'] = etag
+    reponse['Last-Modified'] = http_date(derniere_modification)
+    reponse['Cache-Control'] = CACHE_CONTROL_PUBLIE if publie else CACHE_CONTROL_BROUILLON
+    patch_vary_headers(reponse, ['Authorization'])
+    return reponse
+
+
+def reponse_non_modifiee(request, etag, derniere_modification, publie=True):
+    """Réponse 304 si les validateurs envoyés par le client sont à jour, sinon None"""
+    entetes = appliquer_validateurs(HttpResponse(), etag, derniere_modification, publie)
+    reponse = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=derniere_modification,
+        response=entetes
+    )
+    return None if reponse is entetes else reponse
+
+
+class RetrieveConditionnelMixin:
+    """
+    retrieve() avec validateurs HTTP pour un ViewSet dont le modèle porte
+    date_modification. La vue précise les ressources dont la version entre
+    dans les validateurs, les échéances de l'objet et s'il est publié.
+    """
+    
+    def ressources_conditionnelles(self, instance):
+        return []
+    
+    def contenu_publie(self, instance):
+        return True
+    
+    def echeances_conditionnelles(self, instance):
+        """Dates auxquelles la représentation de l'objet change sans écriture"""
+        return []
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        publie = self.contenu_publie(instance)
+        etag, derniere_modification = validateurs(
+            request,
+            instance.date_modification,
+            self.ressources_conditionnelles(instance),
+            self.echeances_conditionnelles(instance)
+        )
+        
+        non_modifiee = reponse_non_modifiee(request, etag, derniere_modification, publie)
+        if non_modifiee is not None:
+            return non_modifiee
+        
+        serializer = self.get_serializer(instance)
+        return appliquer_validateurs(Response(serializer.data), etag, derniere_modification, publie)
@@ -0,0 +1,214 @@
+# ============================================================================
+# backend/api/emails.py
+# ============================================================================
+"""
+Couche d'envoi des emails transactionnels
+File d'envoi bornée, lots envoyés sur une connexion SMTP réutilisée et
+réessais avec délai exponentiel sur les erreurs temporaires
+"""
+import logging
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+logger = logging.getLogger(__name__)
+
+
+# Nombre maximal de messages en file, envoyés ensuite sur une même connexion
+TAILLE_LOT_EMAILS = 100
+
+# Nombre de tentatives par message sur une erreur temporaire
+TENTATIVES_EMAILS = 3
+
+# Délai (secondes) avant le premier réessai, doublé à chaque tentative
+DELAI_REESSAI_EMAILS = 1
+
+
+class EchecEnvoiEmail(Exception):
+    """Levée quand un email n'a pas pu être remis au serveur"""
+
+
+class ServeurEmailIndisponible(EchecEnvoiEmail):
+    """Levée quand le serveur reste injoignable après tous les réessais"""
+
+
+def erreur_temporaire(exc):
+    """Indique si une erreur d'envoi mérite d'être réessayée"""
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        # Codes 4xx : refus temporaire du serveur
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    # Erreurs réseau (connexion refusée, délai dépassé...)
+    return isinstance(exc, OSError)
+
+
+def creer_email(sujet, texte, destinataires, html=None, pieces_jointes=()):
+    """
+    Construit un email texte (et HTML optionnel) depuis l'adresse par défaut.
+    `pieces_jointes` est une liste de tuples (nom, contenu, type MIME).
+    """
+    message = EmailMultiAlternatives(
+        subject=sujet,
+        body=texte,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=list(destinataires)
+    )
+    if html:
+        message.attach_alternative(html, 'text/html')
+    for nom, contenu, type_mime in pieces_jointes:
+        message.attach(nom, contenu, type_mime)
+    return message
+
+
+class EnvoiGroupe:
+    """
+    File d'envoi bornée pour les emails transactionnels.
+    
+    Les messages ajoutés sont envoyés dès que la file atteint `taille_lot`
+    (et à la sortie du bloc `with`) ; chaque lot est envoyé sur une seule
+    connexion SMTP. Les erreurs temporaires sont réessayées avec un délai
+    exponentiel ; si le serveur reste injoignable, les messages restants
+    sont reportés sans nouvelle tentative.
+    
+    `vider()` retourne, pour chaque clé fournie à `ajouter()` (par défaut le
+    rang d'ajout du message), None si le message est parti ou l'exception
+    rencontrée sinon (ServeurEmailIndisponible pour les messages reportés).
+    
+    Les réessais attendent (time.sleep) : à réserver aux tâches Celery, pas
+    au traitement d'une requête.
+    """
+    
+    def __init__(self, taille_lot=TAILLE_LOT_EMAILS, tentatives=TENTATIVES_EMAILS,
+                 delai=DELAI_REESSAI_EMAILS, connexion=None):
+        self.taille_lot = taille_lot
+        self.tentatives = tentatives
+        self.delai = delai
+        self.connexion = connexion or get_connection(fail_silently=False)
+        self.file = []
+        self.resultats = {}
+        self.nombre_ajoutes = 0
+        self.indisponible = False
+        self.metriques = {
+            'envoyes': 0,
+            'echecs': 0,
+            'reportes': 0,
+            'reessais': 0,
+            'lots': 0,
+        }
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.vider()
+        return False
+    
+    def ajouter(self, message, cle=None):
+        """Met un message en file ; envoie le lot si la file est pleine"""
+        if cle is None:
+            cle = self.nombre_ajoutes
+        self.nombre_ajoutes += 1
+        self.file.append((cle, message))
+        if len(self.file) >= self.taille_lot:
+            self._envoyer_lot()
+    
+    def vider(self):
+        """Envoie les messages en attente et retourne les résultats accumulés"""
+        while self.file:
+            self._envoyer_lot()
+        
+        resultats, self.resultats = self.resultats, {}
+        return resultats
+    
+    def _envoyer_lot(self):
+        lot, self.file = self.file[:self.taille_lot], self.file[self.taille_lot:]
+        
+        if self.indisponible:
+            self._reporter(lot, ServeurEmailIndisponible("Serveur email indisponible"))
+            return
+        
+        self.metriques['lots'] += 1
+        try:
+            for position, (cle, message) in enumerate(lot):
+                try:
+                    self._envoyer(message)
+                except ServeurEmailIndisponible as e:
+                    self.indisponible = True
+                    self._reporter(lot[position:], e)
+                    logger.error(f"Serveur email indisponible, {len(lot) - position} message(s) reporté(s): {e}")
+                    break
+                except Exception as e:
+                    self.resultats[cle] = e
+                    self.metriques['echecs'] += 1
+                    logger.warning(f"Échec d'envoi à {', '.join(message.to)}: {e}")
+                else:
+                    self.resultats[cle] = None
+                    self.metriques['envoyes'] += 1
+        finally:
+            self.connexion.close()
+    
+    def _envoyer(self, message):
+        """Envoie un message sur la connexion du lot, avec réessais"""
+        for tentative in range(self.tentatives):
+            try:
+                # Ouvre la connexion au premier message du lot (ou après une coupure)
+                self.connexion.open()
+                if self.connexion.send_messages([message]) != 1:
+                    raise EchecEnvoiEmail("Message sans destinataire")
+                return
+            except Exception as e:
+                if not erreur_temporaire(e):
+                    raise
+                derniere_erreur = e
+                self.connexion.close()
+                if tentative + 1 < self.tentatives:
+                    self.metriques['reessais'] += 1
+                    time.sleep(self.delai * 2 ** tentative)
+        
+        raise ServeurEmailIndisponible(str(derniere_erreur))
+    
+    def _reporter(self, lot, erreur):
+        for cle, message in lot:
+            self.resultats[cle] = erreur
+        self.metriques['reportes'] += len(lot)
+
+
+def envoyer_emails(messages, **options):
+    """
+    Envoie une série de messages par lots sur des connexions réutilisées
+    (équivalent de send_mass_mail). Retourne les métriques de l'envoi et,
+    sous 'erreurs', l'erreur de chaque message non remis par rang.
+    """
+    envoi = EnvoiGroupe(**options)
+    for position, message in enumerate(messages):
+        envoi.ajouter(message, cle=position)
+    resultats = envoi.vider()
+    
+    return dict(
+        envoi.metriques,
+        erreurs={position: erreur for position, erreur in resultats.items() if erreur is not None}
+    )
+
+
+def envoyer_message(message):
+    """
+    Envoie un message unique avec réessais.
+    Lève EchecEnvoiEmail si le message n'a pas pu être remis.
+    """
+    envoi = EnvoiGroupe(taille_lot=1)
+    envoi.ajouter(message, cle=0)
+    erreur = envoi.vider()[0]
+    if erreur is not None:
+        raise EchecEnvoiEmail(str(erreur)) from erreur
+    return True
+
+
+def envoyer_email(sujet, texte, destinataires, html=None, pieces_jointes=()):
+    """Construit puis envoie un email unique (voir envoyer_message)"""
+    return envoyer_message(creer_email(sujet, texte, destinataires, html, pieces_jointes))
@@ -0,0 +1,292 @@
+# ============================================================================
+# backend/api/management/commands/benchmark_api.py
+# ============================================================================
+"""
+Commande de test de charge des chemins critiques de l'API
+Crée un jeu de données paramétrable, rejoue les requêtes en parallèle via
+le client de test DRF et mesure latences, requêtes SQL et débit. Seules
+les lignes créées par l'exécution (clés primaires notées) sont supprimées.
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event
+from quiz.models import Quiz, Question, Reponse, TentativeQuiz
+from training.models import Formation
+
+User = get_user_model()
+
+# Préfixe des données créées par le benchmark, suivi d'un identifiant
+# propre à chaque exécution
+PREFIXE = 'bench_'
+
+SCENARIOS = ['events_list', 'events_inscrire', 'quiz_soumettre', 'formations_list']
+
+
+def percentile(valeurs_triees, rang):
+    """Percentile par rang le plus proche sur une liste triée"""
+    if not valeurs_triees:
+        return 0
+    index = max(0, int(round(rang / 100 * len(valeurs_triees))) - 1)
+    return valeurs_triees[min(index, len(valeurs_triees) - 1)]
+
+
+class Command(BaseCommand):
+    help = "Test de charge : latences p50/p95/p99, requêtes SQL par appel et débit des vues critiques"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--participantes', type=int, default=200, help='Participantes créées')
+        parser.add_argument('--events', type=int, default=20, help='Événements publiés créés')
+        parser.add_argument('--formations', type=int, default=50, help='Formations actives créées')
+        parser.add_argument('--questions', type=int, default=20, help='Questions du quiz soumis')
+        parser.add_argument('--requetes', type=int, default=200, help='Requêtes par scénario')
+        parser.add_argument('--concurrence', type=int, default=8, help='Clients simultanés')
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=SCENARIOS,
+            default=SCENARIOS,
+            help='Scénarios à exécuter',
+        )
+        parser.add_argument(
+            '--seuil-p95',
+            type=float,
+            help='Échoue si le p95 d\'un scénario dépasse ce seuil (ms)',
+        )
+        parser.add_argument(
+            '--garder',
+            action='store_true',
+            help='Conserve le jeu de données après la mesure',
+        )
+    
+    def handle(self, *args, **options):
+        self.execution = uuid.uuid4().hex[:8]
+        self.prefixe = f'{PREFIXE}{self.execution}_'
+        self.crees = {}
+        
+        resultats = []
+        try:
+            donnees = self.creer_donnees(options)
+            for nom in options['scenarios']:
+                appels = getattr(self, f'appels_{nom}')(donnees, options['requetes'])
+                resultats.append(self.executer(nom, appels, options['concurrence']))
+        finally:
+            if options['garder']:
+                self.stdout.write(f"Jeu de données conservé (préfixe {self.prefixe})")
+            else:
+                self.purger()
+        
+        self.afficher(resultats, options)
+        
+        seuil = options['seuil_p95']
+        if seuil is not None:
+            depassements = [r['scenario'] for r in resultats if r['p95'] > seuil]
+            if depassements:
+                raise CommandError(f"p95 supérieur à {seuil} ms pour : {', '.join(depassements)}")
+    
+    # Jeu de données
+    def creer_donnees(self, options):
+        now = timezone.now()
+        
+        User.objects.bulk_create([
+            User(
+                username=f'{self.prefixe}{numero}',
+                email=f'{self.prefixe}{numero}@benchmark.invalid',
+                nip=f'B{self.execution}{numero:07d}',
+                first_name='Bench',
+                last_name=str(numero),
+                region='estuaire',
+                statut_validation='validee',
+                password='!'
+            )
+            for numero in range(options['participantes'])
+        ], batch_size=1000)
+        participantes = list(User.objects.filter(username__startswith=self.prefixe).order_by('pk'))
+        self.noter(User, participantes)
+        organisatrice = participantes[0]
+        
+        events = []
+        for numero in range(options['events']):
+            events.append(Event.objects.create(
+                titre=f'{self.prefixe}événement {numero}',
+                description='Événement de test de charge',
+                date_debut=now + timedelta(days=7 + numero),
+                date_fin=now + timedelta(days=7 + numero, hours=2),
+                lieu='Libreville',
+                max_participants=len(participantes),
+                formateur_nom='Benchmark',
+                cree_par=organisatrice,
+                statut='ouvert',
+                est_publie=True,
+                rappels_automatiques=[]
+            ))
+            self.noter(Event, events[-1:])
+        
+        Formation.objects.bulk_create([
+            Formation(
+                titre=f'{self.prefixe}formation {numero}',
+                slug=f'{self.prefixe}formation-{numero}',
+                description='Formation de test de charge',
+                categorie='leadership',
+                duree_heures=10,
+                max_participants=30,
+                date_debut=now + timedelta(days=numero),
+                date_fin=now + timedelta(days=numero + 30),
+                formateur_nom='Benchmark',
+                status='active',
+                created_by=organisatrice
+            )
+            for numero in range(options['formations'])
+        ])
+        self.noter(Formation, Formation.objects.filter(titre__startswith=self.prefixe))
+        
+        quiz = Quiz.objects.create(
+            titre=f'{self.prefixe}quiz',
+            description='Quiz de test de charge',
+            duree_minutes=600,
+            tentatives_max=1,
+            created_by=organisatrice
+        )
+        self.noter(Quiz, [quiz])
+        reponses = {}
+        for ordre in range(options['questions']):
+            question = Question.objects.create(
+                quiz=quiz,
+                type_question='qcm',
+                enonce=f'Question {ordre}',
+                ordre=ordre,
+                points=1
+            )
+            correcte = Reponse.objects.create(question=question, texte='Oui', est_correcte=True, ordre=0)
+            Reponse.objects.create(question=question, texte='Non', est_correcte=False, ordre=1)
+            reponses[str(question.id)] = correcte.id
+        
+        # Une tentative en cours par participante pour le scénario de soumission
+        TentativeQuiz.objects.bulk_create([
+            TentativeQuiz(quiz=quiz, participante=participante, numero_tentative=1)
+            for participante in participantes
+        ], batch_size=1000)
+        
+        return {
+            'participantes': participantes,
+            'events': events,
+            'quiz': quiz,
+            'reponses': reponses,
+        }
+    
+    def noter(self, modele, objets):
+        """Note les clés primaires des objets créés, seuls supprimés par purger()"""
+        self.crees.setdefault(modele, []).extend(objet.pk for objet in objets)
+    
+    def purger(self):
+        """Supprime les données créées par cette exécution (les dépendances en CASCADE)"""
+        for modele in (Event, Formation, Quiz, User):
+            pks = self.crees.pop(modele, [])
+            for depart in range(0, len(pks), 500):
+                modele.objects.filter(pk__in=pks[depart:depart + 500]).delete()
+    
+    # Scénarios : liste de (participante, méthode, url, données)
+    def appels_events_list(self, donnees, nombre):
+        participantes = donnees['participantes']
+        return [
+            (participantes[numero % len(participantes)], 'get', '/api/events/events/', None)
+            for numero in range(nombre)
+        ]
+    
+    def appels_events_inscrire(self, donnees, nombre):
+        participantes, events = donnees['participantes'], donnees['events']
+        if nombre > len(participantes) * len(events):
+            raise CommandError("Pas assez de couples participante/événement pour ce nombre de requêtes")
+        
+        # Chaque couple (participante, événement) n'est utilisé qu'une fois
+        return [
+            (
+                participantes[numero % len(participantes)],
+                'post',
+                f'/api/events/events/{events[numero // len(participantes)].pk}/inscrire/',
+                {}
+            )
+            for numero in range(nombre)
+        ]
+    
+    def appels_quiz_soumettre(self, donnees, nombre):
+        participantes = donnees['participantes']
+        if nombre > len(participantes):
+            raise CommandError("Une seule soumission par participante : augmentez --participantes")
+        
+        url = f"/api/quiz/quiz/{donnees['quiz'].pk}/soumettre/"
+        return [
+            (participantes[numero], 'post', url, {'reponses': donnees['reponses']})
+            for numero in range(nombre)
+        ]
+    
+    def appels_formations_list(self, donnees, nombre):
+        participantes = donnees['participantes']
+        return [
+            (participantes[numero % len(participantes)], 'get', '/api/training/formations/', None)
+            for numero in range(nombre)
+        ]
+    
+    # Exécution et mesures
+    def executer(self, nom, appels, concurrence):
+        def executer_lot(lot):
+            client = APIClient()
+            mesures = []
+            try:
+                for participante, methode, url, data in lot:
+                    client.force_authenticate(participante)
+                    with CaptureQueriesContext(connection) as requetes_sql:
+                        debut = time.perf_counter()
+                        reponse = getattr(client, methode)(url, data, format='json')
+                        duree = time.perf_counter() - debut
+                    mesures.append((duree, len(requetes_sql.captured_queries), reponse.status_code))
+            finally:
+                connections.close_all()
+            return mesures
+        
+        lots = [appels[numero::concurrence] for numero in range(concurrence)]
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrence) as executeur:
+            mesures = [mesure for lot in executeur.map(executer_lot, lots) for mesure in lot]
+        duree_totale = time.perf_counter() - debut
+        
+        latences = sorted(duree * 1000 for duree, nb_requetes, code in mesures)
+        nb_requetes_sql = [nb_requetes for duree, nb_requetes, code in mesures]
+        erreurs = sum(1 for duree, nb_requetes, code in mesures if code >= 400)
+        
+        return {
+            'scenario': nom,
+            'requetes': len(mesures),
+            'erreurs': erreurs,
+            'debit': len(mesures) / duree_totale if duree_totale else 0,
+            'p50': percentile(latences, 50),
+            'p95': percentile(latences, 95),
+            'p99': percentile(latences, 99),
+            'sql_moyen': sum(nb_requetes_sql) / len(nb_requetes_sql) if nb_requetes_sql else 0,
+            'sql_max': max(nb_requetes_sql, default=0),
+        }
+    
+    def afficher(self, resultats, options):
+        self.stdout.write(
+            f"{options['participantes']} participantes, {options['events']} événements, "
+            f"{options['formations']} formations, {options['questions']} questions, "
+            f"concurrence {options['concurrence']}"
+        )
+        self.stdout.write(
+            f"{'scénario':<18}{'req.':>6}{'err.':>6}{'req/s':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'SQL moy':>9}{'SQL max':>9}"
+        )
+        for r in resultats:
+            self.stdout.write(
+                f"{r['scenario']:<18}{r['requetes']:>6}{r['erreurs']:>6}{r['debit']:>9.1f}"
+                f"{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}{r['sql_moyen']:>9.1f}{r['sql_max']:>9}"
+            )
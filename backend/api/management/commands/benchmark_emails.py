@@ -0,0 +1,126 @@
+# ============================================================================
+# backend/api/management/commands/benchmark_emails.py
+# ============================================================================
+"""
+Commande de mesure du débit d'envoi des emails
+Compare l'envoi message par message (send_mail, une connexion par email)
+à la couche d'envoi groupé de api.emails
+"""
+import tempfile
+import time
+
+from django.core.mail import send_mail
+from django.core.mail.backends import filebased, locmem
+from django.core.management.base import BaseCommand
+
+from api.emails import TAILLE_LOT_EMAILS, creer_email, envoyer_emails
+
+
+class BackendLocmemLatent(locmem.EmailBackend):
+    """
+    Backend en mémoire simulant le coût d'ouverture d'une session SMTP
+    (connexion TCP, TLS, authentification)
+    """
+    
+    latence = 0
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ouverte = False
+    
+    def open(self):
+        if self.ouverte:
+            return False
+        time.sleep(self.latence)
+        self.ouverte = True
+        return True
+    
+    def close(self):
+        self.ouverte = False
+    
+    def send_messages(self, messages):
+        nouvelle_connexion = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if nouvelle_connexion:
+                self.close()
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit d'envoi des emails (messages/s) avec et sans envoi groupé"
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=500,
+            help='Nombre de messages envoyés par scénario',
+        )
+        parser.add_argument(
+            '--backend',
+            choices=['locmem', 'fichier'],
+            default='locmem',
+            help='Backend Django utilisé pour la mesure',
+        )
+        parser.add_argument(
+            '--latence-connexion',
+            type=float,
+            default=20,
+            help="Coût simulé d'ouverture d'une connexion en ms (backend locmem)",
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=TAILLE_LOT_EMAILS,
+            help='Taille des lots de la couche groupée',
+        )
+    
+    def handle(self, *args, **options):
+        nb_messages = options['messages']
+        BackendLocmemLatent.latence = options['latence_connexion'] / 1000
+        
+        with tempfile.TemporaryDirectory() as dossier:
+            if options['backend'] == 'fichier':
+                def nouvelle_connexion():
+                    return filebased.EmailBackend(file_path=dossier, fail_silently=False)
+            else:
+                def nouvelle_connexion():
+                    return BackendLocmemLatent(fail_silently=False)
+            
+            # Envoi historique : send_mail ouvre une connexion par message
+            debut = time.perf_counter()
+            for numero in range(nb_messages):
+                send_mail(
+                    subject=f'Benchmark {numero}',
+                    message='Message de test',
+                    from_email=None,
+                    recipient_list=[f'benchmark{numero}@example.org'],
+                    connection=nouvelle_connexion()
+                )
+            duree_unitaire = time.perf_counter() - debut
+            
+            # Couche groupée : une connexion par lot
+            debut = time.perf_counter()
+            metriques = envoyer_emails(
+                (
+                    creer_email(f'Benchmark {numero}', 'Message de test', [f'benchmark{numero}@example.org'])
+                    for numero in range(nb_messages)
+                ),
+                taille_lot=options['taille_lot'],
+                connexion=nouvelle_connexion()
+            )
+            duree_groupee = time.perf_counter() - debut
+        
+        debit_unitaire = nb_messages / duree_unitaire
+        debit_groupe = metriques['envoyes'] / duree_groupee
+        
+        self.stdout.write(f"Backend: {options['backend']}, {nb_messages} messages")
+        self.stdout.write(f"- send_mail unitaire : {duree_unitaire:.3f}s, {debit_unitaire:.1f} messages/s")
+        self.stdout.write(
+            f"- envoi groupé       : {duree_groupee:.3f}s, {debit_groupe:.1f} messages/s "
+            f"({metriques['lots']} lot(s), {metriques['echecs']} échec(s))"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Gain: x{debit_groupe / debit_unitaire:.1f}")
+        )
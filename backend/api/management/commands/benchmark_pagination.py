@@ -0,0 +1,119 @@
+# ============================================================================
+# backend/api/management/commands/benchmark_pagination.py
+# ============================================================================
+"""
+Commande de mesure de la pagination des listes d'événements
+Compare le temps de lecture d'une page proche du début et d'une page
+profonde, en pagination par numéro (OFFSET + COUNT) et par curseur
+"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.pagination import PaginationListes
+from events.models import Event
+from events.views import EventViewSet
+
+User = get_user_model()
+
+# Préfixe des événements créés par le benchmark (purgés avant et après)
+PREFIXE = 'benchpage_'
+
+URL_EVENTS = '/api/events/events/'
+
+
+class Command(BaseCommand):
+    help = "Mesure la lecture d'une page 1 et d'une page profonde (numéro contre curseur)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100000, help='Événements générés')
+        parser.add_argument('--page', type=int, default=5000, help='Page profonde mesurée')
+        parser.add_argument('--page-size', type=int, default=20, help='Taille de page')
+        parser.add_argument('--repetitions', type=int, default=5, help='Lectures par mesure')
+        parser.add_argument(
+            '--garder',
+            action='store_true',
+            help='Conserve les événements générés après la mesure',
+        )
+    
+    def handle(self, *args, **options):
+        administratrice = User.objects.filter(is_staff=True).first()
+        if administratrice is None:
+            raise CommandError("Un compte administrateur est nécessaire pour lister tous les événements")
+        
+        self.purger()
+        try:
+            self.creer_events(options['events'], administratrice)
+            
+            client = APIClient()
+            client.force_authenticate(administratrice)
+            taille, profonde = options['page_size'], options['page']
+            
+            # Curseur de la page profonde : clé de la dernière ligne de la page précédente
+            ordre = EventViewSet.champs_curseur
+            precedente = Event.objects.order_by(*ordre).values_list(
+                *[champ.lstrip('-') for champ in ordre]
+            )[(profonde - 1) * taille - 1]
+            jeton = PaginationListes.encoder_curseur(precedente)
+            
+            mesures = [
+                ('numéro, page 1', {'page': 1}),
+                (f'numéro, page {profonde}', {'page': profonde}),
+                ('curseur, page 1', {'pagination': 'curseur'}),
+                (f'curseur, page {profonde}', {'curseur': jeton}),
+                (f'curseur, page {profonde} + total', {'curseur': jeton, 'total': 'approx'}),
+            ]
+            
+            self.stdout.write(f"{Event.objects.count()} événements, {taille} par page")
+            self.stdout.write(f"{'mode':<34}{'ms médiane':>12}{'SQL':>6}{'résultats':>11}")
+            for libelle, parametres in mesures:
+                duree, nb_requetes, nb_resultats = self.mesurer(
+                    client, {**parametres, 'page_size': taille}, options['repetitions']
+                )
+                self.stdout.write(f"{libelle:<34}{duree:>12.1f}{nb_requetes:>6}{nb_resultats:>11}")
+        finally:
+            if not options['garder']:
+                self.purger()
+    
+    def mesurer(self, client, parametres, repetitions):
+        durees = []
+        for _ in range(repetitions):
+            with CaptureQueriesContext(connection) as requetes_sql:
+                debut = time.perf_counter()
+                reponse = client.get(URL_EVENTS, parametres)
+                durees.append((time.perf_counter() - debut) * 1000)
+            if reponse.status_code != 200:
+                raise CommandError(f"{URL_EVENTS} {parametres} : HTTP {reponse.status_code}")
+        durees.sort()
+        return durees[len(durees) // 2], len(requetes_sql.captured_queries), len(reponse.data['results'])
+    
+    def creer_events(self, nombre, organisatrice):
+        now = timezone.now()
+        for depart in range(0, nombre, 5000):
+            Event.objects.bulk_create([
+                Event(
+                    titre=f'{PREFIXE}{numero}',
+                    slug=f'{PREFIXE}{numero}',
+                    description='Événement de mesure de pagination',
+                    formateur_nom='Benchmark',
+                    lieu='Libreville',
+                    # Dates en partie identiques pour exercer le départage par id
+                    date_debut=now + timedelta(minutes=numero // 3),
+                    date_fin=now + timedelta(minutes=numero // 3, hours=2),
+                    max_participants=30,
+                    cree_par=organisatrice,
+                    statut='ouvert',
+                    est_publie=True,
+                )
+                for numero in range(depart, min(depart + 5000, nombre))
+            ])
+    
+    def purger(self):
+        """Supprime les événements d'un précédent benchmark"""
+        Event.objects.filter(titre__startswith=PREFIXE).delete()
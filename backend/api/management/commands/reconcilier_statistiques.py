@@ -0,0 +1,34 @@
+# ============================================================================
+# backend/api/management/commands/reconcilier_statistiques.py
+# ============================================================================
+"""
+Commande de gestion pour recalculer les statistiques quotidiennes
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.statistiques import reconstruire_statistiques
+
+
+class Command(BaseCommand):
+    help = 'Recalcule la table des statistiques quotidiennes à partir des tables de faits'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--depuis',
+            help='Ne recalcule que les journées à partir de cette date (AAAA-MM-JJ)',
+        )
+    
+    def handle(self, *args, **options):
+        date_debut = None
+        if options['depuis']:
+            try:
+                date_debut = datetime.strptime(options['depuis'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("Format de date invalide, attendu AAAA-MM-JJ")
+        
+        jours = reconstruire_statistiques(date_debut=date_debut)
+        self.stdout.write(
+            self.style.SUCCESS(f"{jours} journée(s) de statistiques recalculée(s)")
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:03
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistiquesQuotidiennes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Date')),
+                ('inscriptions_events', models.IntegerField(default=0, verbose_name='Inscriptions aux événements')),
+                ('participations_attendues_events', models.IntegerField(default=0, verbose_name='Participations attendues')),
+                ('presences_events', models.IntegerField(default=0, verbose_name='Présences')),
+                ('nb_evaluations_events', models.IntegerField(default=0, verbose_name="Évaluations d'événements")),
+                ('somme_evaluations_events', models.IntegerField(default=0, verbose_name="Somme des évaluations d'événements")),
+                ('inscriptions_formations', models.IntegerField(default=0, verbose_name='Inscriptions aux formations')),
+                ('formations_terminees', models.IntegerField(default=0, verbose_name='Formations terminées')),
+                ('nb_evaluations_formations', models.IntegerField(default=0, verbose_name='Évaluations de formations')),
+                ('somme_evaluations_formations', models.IntegerField(default=0, verbose_name='Somme des évaluations de formations')),
+                ('tentatives_quiz', models.IntegerField(default=0, verbose_name='Tentatives de quiz')),
+                ('tentatives_finies', models.IntegerField(default=0, verbose_name='Tentatives terminées')),
+                ('tentatives_reussies', models.IntegerField(default=0, verbose_name='Tentatives réussies')),
+                ('nb_scores_quiz', models.IntegerField(default=0, verbose_name='Scores enregistrés')),
+                ('somme_scores_quiz', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Somme des scores')),
+                ('nb_temps_quiz', models.IntegerField(default=0, verbose_name='Durées enregistrées')),
+                ('temps_total_quiz', models.DurationField(default=datetime.timedelta, verbose_name='Durée totale des tentatives')),
+                ('date_modification', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+            ],
+            options={
+                'verbose_name': 'Statistiques quotidiennes',
+                'verbose_name_plural': 'Statistiques quotidiennes',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
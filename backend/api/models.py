@@ -0,0 +1,56 @@
+# ============================================================================
+# backend/api/models.py
+# ============================================================================
+"""
+Modèles de l'application api
+Table de statistiques agrégées par jour, maintenue au fil des écritures
+"""
+from datetime import timedelta
+
+from django.db import models
+
+
+class StatistiquesQuotidiennes(models.Model):
+    """
+    Compteurs de la plateforme agrégés par jour. Chaque ligne est mise à
+    jour par incréments depuis les signaux (api.signals) et recalculée
+    chaque nuit (api.tasks.reconcilier_statistiques_plateforme).
+    """
+    
+    date = models.DateField(unique=True, verbose_name="Date")
+    
+    # Événements (inscriptions datées du jour d'inscription)
+    inscriptions_events = models.IntegerField(default=0, verbose_name="Inscriptions aux événements")
+    
+    # Événements (participation datée du jour de fin de l'événement)
+    participations_attendues_events = models.IntegerField(default=0, verbose_name="Participations attendues")
+    presences_events = models.IntegerField(default=0, verbose_name="Présences")
+    nb_evaluations_events = models.IntegerField(default=0, verbose_name="Évaluations d'événements")
+    somme_evaluations_events = models.IntegerField(default=0, verbose_name="Somme des évaluations d'événements")
+    
+    # Formations (datées du jour d'inscription)
+    inscriptions_formations = models.IntegerField(default=0, verbose_name="Inscriptions aux formations")
+    formations_terminees = models.IntegerField(default=0, verbose_name="Formations terminées")
+    nb_evaluations_formations = models.IntegerField(default=0, verbose_name="Évaluations de formations")
+    somme_evaluations_formations = models.IntegerField(default=0, verbose_name="Somme des évaluations de formations")
+    
+    # Quiz (datés du jour de début de la tentative)
+    tentatives_quiz = models.IntegerField(default=0, verbose_name="Tentatives de quiz")
+    tentatives_finies = models.IntegerField(default=0, verbose_name="Tentatives terminées")
+    tentatives_reussies = models.IntegerField(default=0, verbose_name="Tentatives réussies")
+    nb_scores_quiz = models.IntegerField(default=0, verbose_name="Scores enregistrés")
+    somme_scores_quiz = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Somme des scores"
+    )
+    nb_temps_quiz = models.IntegerField(default=0, verbose_name="Durées enregistrées")
+    temps_total_quiz = models.DurationField(default=timedelta, verbose_name="Durée totale des tentatives")
+    
+    date_modification = models.DateTimeField(auto_now=True, verbose_name="Date de modification")
+    
+    class Meta:
+        verbose_name = "Statistiques quotidiennes"
+        verbose_name_plural = "Statistiques quotidiennes"
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"Statistiques du {self.date.strftime('%d/%m/%Y')}"
@@ -0,0 +1,211 @@
+# ============================================================================
+# backend/api/pagination.py
+# ============================================================================
+"""
+Pagination des listes volumineuses
+Pagination par numéro de page (comportement historique) avec un mode
+curseur optionnel : `?pagination=curseur` parcourt la liste par clé
+(keyset) au lieu d'un OFFSET, en temps constant quelle que soit la
+profondeur, et remplace le COUNT(*) exact par un total approximatif.
+"""
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Durée de vie (secondes) des totaux approximatifs mis en cache
+DUREE_CACHE_TOTAL = 300
+
+
+def compte_approximatif(queryset):
+    """
+    Nombre approximatif de lignes d'un queryset : statistiques du planificateur
+    PostgreSQL (pg_class.reltuples) pour une table non filtrée, sinon COUNT(*)
+    mis en cache quelques minutes par requête SQL.
+    """
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table]
+            )
+            ligne = cursor.fetchone()
+        if ligne and ligne[0] >= 0:
+            return ligne[0]
+    
+    sql, params = queryset.query.sql_with_params()
+    empreinte = hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+    cle = f'pagination_total_{empreinte}'
+    
+    total = cache.get(cle)
+    if total is None:
+        total = queryset.count()
+        cache.set(cle, total, DUREE_CACHE_TOTAL)
+    return total
+
+
+class PaginationListes(PageNumberPagination):
+    """
+    Pagination des grandes listes de l'API.
+    
+    Par défaut : pagination par numéro de page (page, page_size).
+    
+    Avec `?pagination=curseur` et si la vue déclare `champs_curseur` (par
+    exemple ('-date_debut', '-id')) : pagination par clé. La liste est
+    triée sur ces champs, chaque page est lue par un WHERE sur la clé de la
+    dernière ligne reçue (liens `next` / `previous` avec `?curseur=`), sans
+    OFFSET ni COUNT(*). `?total=approx` ajoute un total approximatif.
+    """
+    
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    
+    mode_query_param = 'pagination'
+    curseur_query_param = 'curseur'
+    total_query_param = 'total'
+    
+    def mode_curseur(self, request, view=None):
+        """Indique si la requête demande (et la vue permet) la pagination par clé"""
+        if not getattr(view, 'champs_curseur', None):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == 'curseur' or
+            self.curseur_query_param in request.query_params
+        )
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.curseur = self.mode_curseur(request, view)
+        if not self.curseur:
+            return super().paginate_queryset(queryset, request, view)
+        
+        self.request = request
+        self.taille = self.get_page_size(request)
+        self.champs = list(view.champs_curseur)
+        self.total = None
+        if request.query_params.get(self.total_query_param) == 'approx':
+            self.total = compte_approximatif(queryset)
+        
+        position, arriere = self.decoder_curseur(queryset.model)
+        champs = [self.inverser(champ) for champ in self.champs] if arriere else self.champs
+        
+        queryset = queryset.order_by(*champs)
+        if position is not None:
+            queryset = queryset.filter(self.filtre_apres(champs, position))
+        
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        lignes = list(queryset[:self.taille + 1])
+        encore = len(lignes) > self.taille
+        lignes = lignes[:self.taille]
+        
+        if arriere:
+            lignes.reverse()
+            self.suivant = position is not None
+            self.precedent = encore
+        else:
+            self.suivant = encore
+            self.precedent = position is not None
+        
+        self.lignes = lignes
+        return lignes
+    
+    def get_paginated_response(self, data):
+        if not self.curseur:
+            return super().get_paginated_response(data)
+        
+        reponse = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.total is not None:
+            reponse['total_approximatif'] = self.total
+        reponse['results'] = data
+        return Response(reponse)
+    
+    def get_next_link(self):
+        if not self.curseur:
+            return super().get_next_link()
+        if not self.suivant or not self.lignes:
+            return None
+        return self.lien(self.lignes[-1], arriere=False)
+    
+    def get_previous_link(self):
+        if not self.curseur:
+            return super().get_previous_link()
+        if not self.precedent or not self.lignes:
+            return None
+        return self.lien(self.lignes[0], arriere=True)
+    
+    # Curseur : valeurs de la clé de la ligne de référence et sens de lecture
+    def lien(self, ligne, arriere):
+        jeton = self.encoder_curseur(
+            [getattr(ligne, champ.lstrip('-')) for champ in self.champs],
+            arriere
+        )
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.curseur_query_param, jeton)
+    
+    @classmethod
+    def encoder_curseur(cls, valeurs, arriere=False):
+        """Jeton `?curseur=` désignant la position après (ou avant) ces valeurs de clé"""
+        return base64.urlsafe_b64encode(
+            json.dumps({'v': [cls.valeur_json(valeur) for valeur in valeurs], 'a': arriere}).encode()
+        ).decode()
+    
+    def decoder_curseur(self, model):
+        """Retourne (valeurs de la clé ou None, lecture arrière)"""
+        jeton = self.request.query_params.get(self.curseur_query_param)
+        if not jeton:
+            return None, False
+        
+        try:
+            contenu = json.loads(base64.urlsafe_b64decode(jeton.encode()).decode())
+            valeurs = contenu['v']
+            if len(valeurs) != len(self.champs):
+                raise ValueError(jeton)
+            position = [
+                model._meta.get_field(champ.lstrip('-')).to_python(valeur)
+                for champ, valeur in zip(self.champs, valeurs)
+            ]
+        except Exception:
+            raise NotFound("Curseur de pagination invalide")
+        return position, bool(contenu.get('a'))
+    
+    @staticmethod
+    def valeur_json(valeur):
+        if hasattr(valeur, 'isoformat'):
+            return valeur.isoformat()
+        if isinstance(valeur, (int, float, str)) or valeur is None:
+            return valeur
+        return str(valeur)
+    
+    @staticmethod
+    def inverser(champ):
+        return champ[1:] if champ.startswith('-') else f'-{champ}'
+    
+    @staticmethod
+    def filtre_apres(champs, position):
+        """
+        Lignes strictement après la position dans l'ordre des champs :
+        (a > x) OU (a = x ET b > y)... La borne large sur le premier champ
+        (a >= x) permet au SGBD de parcourir l'index par plage.
+        """
+        noms = [champ.lstrip('-') for champ in champs]
+        operateurs = ['lt' if champ.startswith('-') else 'gt' for champ in champs]
+        
+        condition = Q()
+        for rang in range(len(champs)):
+            egalites = {nom: valeur for nom, valeur in zip(noms[:rang], position[:rang])}
+            condition |= Q(**egalites, **{f'{noms[rang]}__{operateurs[rang]}': position[rang]})
+        
+        borne = {f"{noms[0]}__{operateurs[0]}e": position[0]}
+        return Q(**borne) & condition
@@ -0,0 +1,25 @@
+# ============================================================================
+# backend/api/planification.py
+# ============================================================================
+"""
+Planification des tâches Celery depuis les signaux et les vues
+La tâche est envoyée après la validation de la transaction en cours (les
+lignes qu'elle lira sont visibles) ; une file de tâches indisponible est
+journalisée sans faire échouer l'écriture qui l'a déclenchée.
+"""
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def planifier_tache(tache, args=(), **options):
+    """apply_async(args, **options) à la validation de la transaction, sans lever d'erreur"""
+    def envoyer():
+        try:
+            tache.apply_async(args=list(args), **options)
+        except Exception as e:
+            logger.warning(f"Tâche {tache.name} non planifiée: {str(e)}")
+    
+    transaction.on_commit(envoyer)
@@ -0,0 +1,129 @@
+# ============================================================================
+# backend/api/signals.py
+# ============================================================================
+"""
+Signaux de l'application api
+Mise à jour incrémentale des statistiques quotidiennes à chaque écriture
+des tables de faits (inscriptions aux événements et formations, quiz)
+"""
+import logging
+
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
+
+from .conditionnel import marquer_modification
+from .statistiques import SOURCES_STATISTIQUES, appliquer_contributions
+from .tableau_de_bord import ressource_participante
+
+logger = logging.getLogger(__name__)
+
+
+def _source(sender):
+    """Fonction de contribution et relations à charger pour un modèle"""
+    return SOURCES_STATISTIQUES[sender._meta.label]
+
+
+def _etat(sender, instance):
+    """Valeurs des colonnes de l'instance (None si des champs sont différés)"""
+    valeurs = instance.__dict__
+    etat = {}
+    for field in sender._meta.concrete_fields:
+        if field.attname not in valeurs:
+            return None
+        etat[field.attname] = valeurs[field.attname]
+    return etat
+
+
+def memoriser_etat(sender, instance, **kwargs):
+    """Mémorise les valeurs au chargement : la contribution d'origine se déduit sans relire la ligne"""
+    instance._etat_statistiques = _etat(sender, instance)
+
+
+def memoriser_contributions(sender, instance, **kwargs):
+    """Mémorise la contribution de la ligne telle qu'elle est en base"""
+    contributions, relations = _source(sender)
+    
+    if instance._state.adding and (instance.pk is None or sender._meta.pk.has_default()):
+        # Création : aucune contribution antérieure
+        instance._contributions_statistiques = {}
+    elif not instance._state.adding and getattr(instance, '_etat_statistiques', None) is not None:
+        # Calculée en post_save depuis l'état chargé (relations déjà en cache)
+        instance._contributions_statistiques = None
+    else:
+        # Clé primaire explicite ou champs différés : relire la ligne
+        instance._contributions_statistiques = {}
+        if instance.pk:
+            ancienne = sender._default_manager.select_related(*relations).filter(pk=instance.pk).first()
+            if ancienne is not None:
+                instance._contributions_statistiques = contributions(ancienne)
+
+
+def _contributions_chargees(sender, instance, contributions, relations):
+    """Contribution de la ligne telle qu'elle a été chargée (ou enregistrée en dernier)"""
+    ancienne = sender(**instance._etat_statistiques)
+    for relation in relations:
+        field = sender._meta.get_field(relation)
+        if getattr(ancienne, field.attname) == getattr(instance, field.attname) and field.is_cached(instance):
+            field.set_cached_value(ancienne, field.get_cached_value(instance))
+    return contributions(ancienne)
+
+
+def mettre_a_jour_statistiques(sender, instance, **kwargs):
+    """Applique la différence entre l'ancienne et la nouvelle contribution"""
+    contributions, relations = _source(sender)
+    
+    try:
+        nouvelles = contributions(instance)
+        anciennes = getattr(instance, '_contributions_statistiques', {})
+        if anciennes is None:
+            anciennes = _contributions_chargees(sender, instance, contributions, relations)
+        appliquer_contributions(anciennes, nouvelles)
+    except Exception as e:
+        # La réconciliation nocturne corrigera l'écart
+        logger.error(f"Erreur mise à jour des statistiques ({sender._meta.label}): {str(e)}")
+    
+    # Point de départ de la prochaine sauvegarde de cette instance
+    instance._etat_statistiques = _etat(sender, instance)
+
+
+def retirer_statistiques(sender, instance, **kwargs):
+    """Retire la contribution d'une ligne supprimée"""
+    contributions, relations = _source(sender)
+    
+    try:
+        appliquer_contributions(contributions(instance), {})
+    except Exception as e:
+        logger.error(f"Erreur mise à jour des statistiques ({sender._meta.label}): {str(e)}")
+
+
+for label in SOURCES_STATISTIQUES:
+    post_init.connect(memoriser_etat, sender=label, dispatch_uid=f'stats_post_init_{label}')
+    pre_save.connect(memoriser_contributions, sender=label, dispatch_uid=f'stats_pre_save_{label}')
+    post_save.connect(mettre_a_jour_statistiques, sender=label, dispatch_uid=f'stats_post_save_{label}')
+    post_delete.connect(retirer_statistiques, sender=label, dispatch_uid=f'stats_post_delete_{label}')
+
+
+# Versions des réponses conditionnelles (ETag / Last-Modified) et des
+# tableaux de bord : ressources dont les données servies changent avec
+# chaque modèle
+RESSOURCES_CONDITIONNELLES = {
+    'events.Event': lambda instance: ['events'],
+    'events.RappelEvent': lambda instance: [f'event_{instance.event_id}'],
+    'events.InscriptionEvent': lambda instance: [
+        'events', f'event_{instance.event_id}', ressource_participante(instance.participante_id)
+    ],
+    'training.InscriptionFormation': lambda instance: [
+        f'formation_{instance.formation_id}', ressource_participante(instance.participante_id)
+    ],
+    'training.ModuleFormation': lambda instance: [f'formation_{instance.formation_id}'],
+    'quiz.TentativeQuiz': lambda instance: [ressource_participante(instance.participante_id)],
+}
+
+
+def avancer_versions_http(sender, instance, **kwargs):
+    """Invalide les validateurs HTTP des ressources touchées par une écriture"""
+    marquer_modification(*RESSOURCES_CONDITIONNELLES[sender._meta.label](instance))
+
+
+for label in RESSOURCES_CONDITIONNELLES:
+    post_save.connect(avancer_versions_http, sender=label, dispatch_uid=f'http_post_save_{label}')
+    post_delete.connect(avancer_versions_http, sender=label, dispatch_uid=f'http_post_delete_{label}')
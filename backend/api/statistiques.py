@@ -0,0 +1,272 @@
+# ============================================================================
+# backend/api/statistiques.py
+# ============================================================================
+"""
+Maintenance et lecture de la table StatistiquesQuotidiennes
+Chaque ligne de fait (inscription, tentative) contribue à des compteurs
+datés ; une écriture applique la différence entre l'ancienne et la
+nouvelle contribution au lieu de tout recompter.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import StatistiquesQuotidiennes
+
+logger = logging.getLogger(__name__)
+
+
+STATUTS_PARTICIPATION_ATTENDUE = ['confirmee', 'presente', 'absente']
+
+CHAMPS_STATISTIQUES = [
+    'inscriptions_events', 'participations_attendues_events', 'presences_events',
+    'nb_evaluations_events', 'somme_evaluations_events',
+    'inscriptions_formations', 'formations_terminees',
+    'nb_evaluations_formations', 'somme_evaluations_formations',
+    'tentatives_quiz', 'tentatives_finies', 'tentatives_reussies',
+    'nb_scores_quiz', 'somme_scores_quiz', 'nb_temps_quiz', 'temps_total_quiz',
+]
+
+
+def _valeurs_nulles():
+    """Valeurs initiales d'une journée"""
+    valeurs = dict.fromkeys(CHAMPS_STATISTIQUES, 0)
+    valeurs['somme_scores_quiz'] = Decimal('0')
+    valeurs['temps_total_quiz'] = timedelta(0)
+    return valeurs
+
+
+def _jour(valeur):
+    """Date locale d'un datetime (None si absent)"""
+    return timezone.localdate(valeur) if valeur else None
+
+
+def _ajouter(contributions, jour, champ, valeur=1):
+    """Ajoute une contribution (jour, champ) en ignorant les dates absentes"""
+    if jour is None:
+        return
+    cle = (jour, champ)
+    contributions[cle] = contributions[cle] + valeur if cle in contributions else valeur
+
+
+# ----------------------------------------------------------------------------
+# Contributions d'une ligne de fait
+# ----------------------------------------------------------------------------
+
+def contributions_inscription_event(inscription):
+    """Compteurs alimentés par une inscription à un événement"""
+    contributions = {}
+    _ajouter(contributions, _jour(inscription.date_inscription), 'inscriptions_events')
+    
+    # La participation et les évaluations sont datées de la fin de l'événement
+    jour_fin = _jour(inscription.event.date_fin)
+    if inscription.statut in STATUTS_PARTICIPATION_ATTENDUE:
+        _ajouter(contributions, jour_fin, 'participations_attendues_events')
+    if inscription.statut == 'presente':
+        _ajouter(contributions, jour_fin, 'presences_events')
+    if inscription.evaluation_event is not None:
+        _ajouter(contributions, jour_fin, 'nb_evaluations_events')
+        _ajouter(contributions, jour_fin, 'somme_evaluations_events', inscription.evaluation_event)
+    return contributions
+
+
+def contributions_inscription_formation(inscription):
+    """Compteurs alimentés par une inscription à une formation"""
+    contributions = {}
+    jour = _jour(inscription.date_inscription)
+    _ajouter(contributions, jour, 'inscriptions_formations')
+    if inscription.statut == 'terminee':
+        _ajouter(contributions, jour, 'formations_terminees')
+    if inscription.evaluation_formation is not None:
+        _ajouter(contributions, jour, 'nb_evaluations_formations')
+        _ajouter(contributions, jour, 'somme_evaluations_formations', inscription.evaluation_formation)
+    return contributions
+
+
+def contributions_tentative_quiz(tentative):
+    """Compteurs alimentés par une tentative de quiz"""
+    contributions = {}
+    jour = _jour(tentative.date_debut)
+    _ajouter(contributions, jour, 'tentatives_quiz')
+    if tentative.date_fin:
+        _ajouter(contributions, jour, 'tentatives_finies')
+        if tentative.score is not None:
+            _ajouter(contributions, jour, 'nb_scores_quiz')
+            # Le score peut encore être un float avant relecture : l'aligner sur la colonne
+            score = Decimal(str(tentative.score)).quantize(Decimal('0.01'))
+            _ajouter(contributions, jour, 'somme_scores_quiz', score)
+            if tentative.score >= tentative.quiz.note_passage:
+                _ajouter(contributions, jour, 'tentatives_reussies')
+        if tentative.temps_ecoule is not None:
+            _ajouter(contributions, jour, 'nb_temps_quiz')
+            _ajouter(contributions, jour, 'temps_total_quiz', tentative.temps_ecoule)
+    return contributions
+
+
+# Modèles suivis : fonction de contribution et relations nécessaires
+SOURCES_STATISTIQUES = {
+    'events.InscriptionEvent': (contributions_inscription_event, ['event']),
+    'training.InscriptionFormation': (contributions_inscription_formation, []),
+    'quiz.TentativeQuiz': (contributions_tentative_quiz, ['quiz']),
+}
+
+
+def appliquer_contributions(anciennes, nouvelles):
+    """
+    Applique la différence entre deux contributions à la validation de la
+    transaction en cours : les lignes de StatistiquesQuotidiennes, partagées
+    par toutes les écritures du jour, ne sont pas verrouillées pendant
+    l'inscription qui les alimente.
+    """
+    valeurs_nulles = _valeurs_nulles()
+    deltas = defaultdict(dict)
+    for cle in set(anciennes) | set(nouvelles):
+        jour, champ = cle
+        zero = valeurs_nulles[champ]
+        delta = nouvelles.get(cle, zero) - anciennes.get(cle, zero)
+        if delta:
+            deltas[jour][champ] = delta
+    
+    if deltas:
+        transaction.on_commit(lambda: ecrire_deltas(deltas))
+
+
+def ecrire_deltas(deltas):
+    """
+    Incrémente les journées touchées dans une transaction courte qui commence
+    par une écriture (pas de verrou en lecture à promouvoir sous SQLite) ;
+    la journée manquante est créée puis incrémentée. En cas d'échec, la
+    réconciliation (api.tasks) corrige l'écart.
+    """
+    try:
+        with transaction.atomic():
+            # Ordre fixe des journées : pas d'interblocage entre deux écritures
+            for jour in sorted(deltas):
+                increments = {champ: F(champ) + delta for champ, delta in deltas[jour].items()}
+                if not StatistiquesQuotidiennes.objects.filter(date=jour).update(**increments):
+                    StatistiquesQuotidiennes.objects.bulk_create(
+                        [StatistiquesQuotidiennes(date=jour)],
+                        ignore_conflicts=True
+                    )
+                    StatistiquesQuotidiennes.objects.filter(date=jour).update(**increments)
+    except Exception as e:
+        logger.error(f"Erreur mise à jour des statistiques: {str(e)}")
+
+
+# ----------------------------------------------------------------------------
+# Recalcul complet (réconciliation)
+# ----------------------------------------------------------------------------
+
+def reconstruire_statistiques(date_debut=None):
+    """
+    Recalcule les lignes à partir des tables de faits (requêtes GROUP BY
+    jour). Sans date_debut, reconstruit tout l'historique. Retourne le
+    nombre de journées écrites.
+    """
+    from events.models import InscriptionEvent
+    from training.models import InscriptionFormation
+    from quiz.models import TentativeQuiz
+    
+    valeurs = defaultdict(_valeurs_nulles)
+    
+    def cumuler(queryset, champ_date, **agregats):
+        if date_debut:
+            queryset = queryset.filter(**{f'{champ_date}__date__gte': date_debut})
+        lignes = queryset.annotate(jour=TruncDate(champ_date)).values('jour').annotate(**agregats)
+        for ligne in lignes:
+            for champ in agregats:
+                if ligne[champ] is not None:
+                    valeurs[ligne['jour']][champ] = ligne[champ]
+    
+    cumuler(
+        InscriptionEvent.objects.all(), 'date_inscription',
+        inscriptions_events=Count('id'),
+    )
+    cumuler(
+        InscriptionEvent.objects.all(), 'event__date_fin',
+        participations_attendues_events=Count('id', filter=Q(statut__in=STATUTS_PARTICIPATION_ATTENDUE)),
+        presences_events=Count('id', filter=Q(statut='presente')),
+        nb_evaluations_events=Count('evaluation_event'),
+        somme_evaluations_events=Sum('evaluation_event'),
+    )
+    cumuler(
+        InscriptionFormation.objects.all(), 'date_inscription',
+        inscriptions_formations=Count('id'),
+        formations_terminees=Count('id', filter=Q(statut='terminee')),
+        nb_evaluations_formations=Count('evaluation_formation'),
+        somme_evaluations_formations=Sum('evaluation_formation'),
+    )
+    finies = Q(date_fin__isnull=False)
+    cumuler(
+        TentativeQuiz.objects.all(), 'date_debut',
+        tentatives_quiz=Count('id'),
+        tentatives_finies=Count('id', filter=finies),
+        tentatives_reussies=Count(
+            'id', filter=finies & Q(score__isnull=False, score__gte=F('quiz__note_passage'))
+        ),
+        nb_scores_quiz=Count('score', filter=finies),
+        somme_scores_quiz=Sum('score', filter=finies),
+        nb_temps_quiz=Count('temps_ecoule', filter=finies),
+        temps_total_quiz=Sum('temps_ecoule', filter=finies),
+    )
+    
+    with transaction.atomic():
+        existantes = StatistiquesQuotidiennes.objects.all()
+        if date_debut:
+            existantes = existantes.filter(date__gte=date_debut)
+        
+        # Les journées sans plus aucun fait sont remises à zéro
+        for jour in existantes.values_list('date', flat=True):
+            if jour not in valeurs:
+                valeurs[jour] = _valeurs_nulles()
+        
+        for jour, champs in valeurs.items():
+            StatistiquesQuotidiennes.objects.update_or_create(date=jour, defaults=champs)
+    
+    return len(valeurs)
+
+
+# ----------------------------------------------------------------------------
+# Lecture
+# ----------------------------------------------------------------------------
+
+def totaux(*champs, date_debut=None, date_fin=None):
+    """Somme des compteurs demandés sur une période (O(jours) lignes)"""
+    queryset = StatistiquesQuotidiennes.objects.all()
+    if date_debut:
+        queryset = queryset.filter(date__gte=date_debut)
+    if date_fin:
+        queryset = queryset.filter(date__lte=date_fin)
+    
+    valeurs_nulles = _valeurs_nulles()
+    return queryset.aggregate(**{
+        champ: Coalesce(Sum(champ), valeurs_nulles[champ])
+        for champ in champs
+    })
+
+
+def totaux_par_mois(champ, date_debut):
+    """Compteur agrégé par mois calendaire : {'AAAA-MM': total}"""
+    lignes = StatistiquesQuotidiennes.objects.filter(
+        date__gte=date_debut
+    ).annotate(
+        mois=TruncMonth('date')
+    ).values('mois').annotate(total=Sum(champ))
+    
+    return {ligne['mois'].strftime('%Y-%m'): ligne['total'] for ligne in lignes}
+
+
+def derniers_mois(nombre):
+    """Premiers jours des `nombre` derniers mois calendaires, du plus récent au plus ancien"""
+    mois = timezone.localdate().replace(day=1)
+    resultat = []
+    for _ in range(nombre):
+        resultat.append(mois)
+        mois = (mois - timedelta(days=1)).replace(day=1)
+    return resultat
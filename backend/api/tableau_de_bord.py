@@ -0,0 +1,155 @@
+# ============================================================================
+# backend/api/tableau_de_bord.py
+# ============================================================================
+"""
+Tableaux de bord en cache (UserStatsView, EventDashboardView)
+Deux agrégats : celui d'une participante (inscriptions aux formations et
+aux événements, tentatives de quiz, prochains événements : quatre
+requêtes groupées) et celui des événements publiés, commun à toutes.
+
+Mise en cache « stale-while-revalidate » : un agrégat de moins de
+DUREE_FRAICHEUR secondes est servi tel quel ; plus ancien, il est encore
+servi pendant que la tâche recalculer_tableau_de_bord le recalcule (une
+seule à la fois). L'agrégat d'une participante est rangé sous une clé
+versionnée (api.conditionnel) que les signaux avancent à chacune de ses
+inscriptions ou tentatives : après une écriture, il est recalculé.
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .conditionnel import version
+from .statistiques import derniers_mois, totaux_par_mois
+
+logger = logging.getLogger(__name__)
+
+
+# Âge (secondes) au-delà duquel un agrégat servi est recalculé en tâche
+# de fond, et durée de conservation en cache
+DUREE_FRAICHEUR = 60
+DUREE_CONSERVATION = 24 * 3600
+
+# Durée (secondes) du verrou qui évite plusieurs recalculs simultanés
+DUREE_VERROU = 30
+
+# Nombre de prochains événements et de mois affichés
+NB_PROCHAINS_EVENTS = 3
+NB_MOIS = 6
+
+
+def ressource_participante(user_id):
+    """Ressource versionnée (api.conditionnel) du tableau de bord d'une participante"""
+    return f'tableau_de_bord_{user_id}'
+
+
+def calculer_participante(user_id):
+    """Activité d'une participante : une requête groupée par table, plus ses prochains événements"""
+    from events.models import Event, InscriptionEvent
+    from events.serializers import EventSerializer
+    from quiz.models import TentativeQuiz
+    from training.models import InscriptionFormation
+    
+    formations = InscriptionFormation.objects.filter(participante_id=user_id).aggregate(
+        formations=Count('id'),
+        formations_terminees=Count('id', filter=Q(statut='terminee')),
+        formations_en_cours=Count('id', filter=Q(statut='en_cours')),
+        certifications_obtenues=Count('id', filter=Q(certificat_genere=True))
+    )
+    events = InscriptionEvent.objects.filter(participante_id=user_id).aggregate(
+        events=Count('id'),
+        events_passes=Count('id', filter=Q(statut='presente'))
+    )
+    quiz = TentativeQuiz.objects.filter(participante_id=user_id).aggregate(
+        quiz_tentatives=Count('id'),
+        quiz_reussis=Count('id', filter=Q(score__gte=F('quiz__note_passage'), date_fin__isnull=False))
+    )
+    prochains_events = Event.objects.filter(
+        inscriptions__participante_id=user_id,
+        date_debut__gt=timezone.now()
+    ).order_by('date_debut')[:NB_PROCHAINS_EVENTS]
+    
+    return {
+        **formations,
+        **events,
+        **quiz,
+        'prochains_events': [dict(event) for event in EventSerializer(prochains_events, many=True).data],
+    }
+
+
+def calculer_events():
+    """Compteurs des événements publiés, répartition par catégorie et inscriptions des derniers mois"""
+    from events.models import Event
+    
+    now = timezone.now()
+    publies = Event.objects.filter(est_publie=True)
+    compteurs = publies.aggregate(
+        total_events=Count('id'),
+        events_a_venir=Count('id', filter=Q(date_debut__gt=now)),
+        events_passes=Count('id', filter=Q(date_fin__lt=now))
+    )
+    categories = publies.values('categorie').annotate(count=Count('id')).order_by('-count')
+    
+    mois_analyses = derniers_mois(NB_MOIS)
+    par_mois = totaux_par_mois('inscriptions_events', mois_analyses[-1])
+    
+    return {
+        **compteurs,
+        'categories': list(categories),
+        'inscriptions_par_mois': {
+            mois.strftime('%Y-%m'): par_mois.get(mois.strftime('%Y-%m'), 0)
+            for mois in mois_analyses
+        },
+    }
+
+
+# Agrégats disponibles : (fonction de calcul, ressources versionnées)
+TABLEAUX = {
+    'participante': (calculer_participante, lambda user_id: [ressource_participante(user_id)]),
+    'events': (calculer_events, lambda: []),
+}
+
+
+def cle_cache(nom, *args):
+    calculer, ressources = TABLEAUX[nom]
+    versions = '_'.join(repr(version(ressource)) for ressource in ressources(*args))
+    return f"tableau_de_bord_{nom}_{'_'.join(map(str, args))}_{versions}"
+
+
+def recalculer(nom, *args):
+    """Calcule un agrégat et le range en cache ; retourne ses données"""
+    calculer, ressources = TABLEAUX[nom]
+    # Clé lue avant le calcul : une écriture pendant le calcul avance la
+    # version et le résultat, peut-être incomplet, ne sera plus servi
+    cle = cle_cache(nom, *args)
+    donnees = calculer(*args)
+    cache.set(cle, {'calcule_le': time.time(), 'donnees': donnees}, DUREE_CONSERVATION)
+    return donnees
+
+
+def tableau(nom, *args):
+    """Données d'un agrégat, depuis le cache si possible"""
+    cle = cle_cache(nom, *args)
+    entree = cache.get(cle)
+    if entree is None:
+        return recalculer(nom, *args)
+    
+    if time.time() - entree['calcule_le'] > DUREE_FRAICHEUR and cache.add(f'{cle}_verrou', True, DUREE_VERROU):
+        from .tasks import recalculer_tableau_de_bord
+        try:
+            recalculer_tableau_de_bord.delay(nom, *args)
+        except Exception as e:
+            # Sans file de tâches, l'agrégat périmé reste servi jusqu'à la
+            # prochaine écriture ; le verrou expiré, une autre requête réessaie
+            logger.warning(f"Recalcul du tableau de bord {nom} non planifié: {str(e)}")
+    return entree['donnees']
+
+
+def tableau_participante(user_id):
+    return tableau('participante', user_id)
+
+
+def tableau_events():
+    return tableau('events')
@@ -0,0 +1,53 @@
+# ============================================================================
+# backend/api/tasks.py
+# ============================================================================
+"""
+Tâches asynchrones de l'application api
+Réconciliation des statistiques quotidiennes de la plateforme
+"""
+from celery import shared_task
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .statistiques import reconstruire_statistiques
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def update_platform_statistics():
+    """
+    Recalcule les statistiques des deux derniers jours (filet de sécurité
+    horaire pour les écritures faites hors ORM, ex. QuerySet.update)
+    """
+    try:
+        depuis = timezone.localdate() - timedelta(days=1)
+        jours = reconstruire_statistiques(date_debut=depuis)
+        logger.info(f"Statistiques récentes recalculées: {jours} jour(s)")
+        return jours
+    except Exception as e:
+        logger.error(f"Erreur mise à jour des statistiques: {str(e)}")
+        return 0
+
+
+@shared_task
+def reconcilier_statistiques_plateforme():
+    """
+    Réconciliation nocturne : reconstruit toute la table des statistiques
+    quotidiennes à partir des tables de faits
+    """
+    try:
+        jours = reconstruire_statistiques()
+        logger.info(f"Statistiques réconciliées: {jours} jour(s)")
+        return jours
+    except Exception as e:
+        logger.error(f"Erreur réconciliation des statistiques: {str(e)}")
+        return 0
+
+
+@shared_task
+def recalculer_tableau_de_bord(nom, *args):
+    """Recalcule un agrégat de tableau de bord servi périmé (stale-while-revalidate)"""
+    from .tableau_de_bord import recalculer
+    recalculer(nom, *args)
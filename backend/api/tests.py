@@ -0,0 +1,221 @@
+# ============================================================================
+# backend/api/tests.py
+# ============================================================================
+"""
+Tests de l'application api
+"""
+import base64
+import json
+import smtplib
+from datetime import timedelta
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from events.models import Event, InscriptionEvent
+
+from .emails import creer_email, envoyer_emails
+from .models import StatistiquesQuotidiennes
+from .pagination import PaginationListes
+
+User = get_user_model()
+
+
+def creer_participante(numero):
+    return User.objects.create(
+        username=f'participante_{numero}',
+        email=f'participante_{numero}@test.invalid',
+        nip=f'TEST{numero:07d}',
+        first_name='Participante',
+        last_name=str(numero),
+        region='estuaire'
+    )
+
+
+class StatistiquesTests(TestCase):
+    """Mise à jour incrémentale de StatistiquesQuotidiennes (api.signals)"""
+    
+    def setUp(self):
+        organisatrice = creer_participante(0)
+        self.participante = creer_participante(1)
+        debut = timezone.now() + timedelta(days=7)
+        self.event = Event.objects.create(
+            titre='Atelier leadership',
+            description='Atelier de test',
+            date_debut=debut,
+            date_fin=debut + timedelta(hours=2),
+            lieu='Libreville',
+            max_participants=30,
+            formateur_nom='Formatrice',
+            cree_par=organisatrice,
+            statut='ouvert',
+            est_publie=True,
+            notifications_activees=False,
+            rappels_automatiques=[]
+        )
+        self.jour_fin = timezone.localdate(self.event.date_fin)
+    
+    def compteur(self, jour, champ):
+        ligne = StatistiquesQuotidiennes.objects.filter(date=jour).values_list(champ, flat=True).first()
+        return ligne or 0
+    
+    def test_deltas_appliques_a_la_validation(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            InscriptionEvent.objects.create(event=self.event, participante=self.participante, statut='confirmee')
+        
+        # Rien n'est écrit dans la transaction de l'inscription
+        self.assertEqual(self.compteur(self.jour_fin, 'participations_attendues_events'), 0)
+        
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.compteur(timezone.localdate(), 'inscriptions_events'), 1)
+        self.assertEqual(self.compteur(self.jour_fin, 'participations_attendues_events'), 1)
+    
+    def test_modification_sans_relecture_de_la_ligne(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            InscriptionEvent.objects.create(event=self.event, participante=self.participante, statut='confirmee')
+        
+        inscription = InscriptionEvent.objects.select_related('event').get(participante=self.participante)
+        inscription.statut = 'presente'
+        with CaptureQueriesContext(connection) as requetes, self.captureOnCommitCallbacks(execute=True):
+            inscription.save()
+        
+        # La contribution d'origine vient de l'état chargé, pas d'un SELECT joint
+        self.assertFalse([
+            requete['sql'] for requete in requetes.captured_queries
+            if requete['sql'].startswith('SELECT') and 'INNER JOIN "events_event"' in requete['sql']
+        ])
+        self.assertEqual(self.compteur(timezone.localdate(), 'inscriptions_events'), 1)
+        self.assertEqual(self.compteur(self.jour_fin, 'participations_attendues_events'), 1)
+        self.assertEqual(self.compteur(self.jour_fin, 'presences_events'), 1)
+    
+    def test_suppression(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription = InscriptionEvent.objects.create(
+                event=self.event, participante=self.participante, statut='presente'
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription.delete()
+        
+        self.assertEqual(self.compteur(timezone.localdate(), 'inscriptions_events'), 0)
+        self.assertEqual(self.compteur(self.jour_fin, 'presences_events'), 0)
+
+
+class ConnexionRefusant(locmem.EmailBackend):
+    """Backend locmem qui refuse définitivement une adresse"""
+    
+    def send_messages(self, messages):
+        for message in messages:
+            if 'refusee@test.invalid' in message.to:
+                raise smtplib.SMTPRecipientsRefused({'refusee@test.invalid': (550, b'Unknown user')})
+        return super().send_messages(messages)
+
+
+class EnvoiEmailsTests(TestCase):
+    """Envoi groupé (api.emails)"""
+    
+    def test_erreurs_par_message(self):
+        messages = [
+            creer_email('Sujet', 'Texte', ['a@test.invalid']),
+            creer_email('Sujet', 'Texte', ['refusee@test.invalid']),
+            creer_email('Sujet', 'Texte', ['b@test.invalid']),
+        ]
+        
+        metriques = envoyer_emails(messages, connexion=ConnexionRefusant())
+        
+        self.assertEqual(metriques['envoyes'], 2)
+        self.assertEqual(list(metriques['erreurs']), [1])
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class PaginationCurseurTests(TestCase):
+    """Pagination par clé de PaginationListes (champs_curseur)"""
+    
+    vue = SimpleNamespace(champs_curseur=('-date_debut', '-id'))
+    
+    @classmethod
+    def setUpTestData(cls):
+        organisatrice = creer_participante(0)
+        debut = timezone.now().replace(microsecond=0) + timedelta(days=7)
+        # Dix événements sur trois dates : départage sur l'identifiant
+        Event.objects.bulk_create([
+            Event(
+                titre=f'Atelier {numero}',
+                slug=f'atelier-{numero}',
+                description='Atelier de test',
+                date_debut=debut + timedelta(days=numero % 3),
+                date_fin=debut + timedelta(days=numero % 3, hours=2),
+                lieu='Libreville',
+                max_participants=30,
+                formateur_nom='Formatrice',
+                cree_par=organisatrice,
+                rappels_automatiques=[]
+            )
+            for numero in range(10)
+        ])
+        cls.ordre = list(Event.objects.order_by('-date_debut', '-id').values_list('pk', flat=True))
+    
+    def page(self, **parametres):
+        requete = Request(APIRequestFactory().get('/api/events/events/', parametres))
+        paginator = PaginationListes()
+        lignes = paginator.paginate_queryset(Event.objects.order_by('titre'), requete, self.vue)
+        return paginator, [event.pk for event in lignes]
+    
+    def suivre(self, lien):
+        return self.page(**{cle: valeurs[0] for cle, valeurs in parse_qs(urlparse(lien).query).items()})
+    
+    def test_encodage_decodage(self):
+        event = Event.objects.get(pk=self.ordre[4])
+        jeton = PaginationListes.encoder_curseur([event.date_debut, event.pk], arriere=True)
+        
+        paginator = PaginationListes()
+        paginator.request = Request(APIRequestFactory().get('/', {'curseur': jeton}))
+        paginator.champs = list(self.vue.champs_curseur)
+        
+        self.assertEqual(paginator.decoder_curseur(Event), ([event.date_debut, event.pk], True))
+    
+    def test_parcours_avec_egalites(self):
+        paginator, lignes = self.page(pagination='curseur', page_size=3)
+        pages = [lignes]
+        self.assertIsNone(paginator.get_previous_link())
+        while paginator.get_next_link():
+            paginator, lignes = self.suivre(paginator.get_next_link())
+            pages.append(lignes)
+        
+        # Chaque événement une seule fois, dans l'ordre (date, identifiant)
+        self.assertEqual([pk for lignes in pages for pk in lignes], self.ordre)
+        self.assertEqual([len(lignes) for lignes in pages], [3, 3, 3, 1])
+        
+        # Retour en arrière depuis la dernière page : mêmes pages
+        precedentes = []
+        while paginator.get_previous_link():
+            paginator, lignes = self.suivre(paginator.get_previous_link())
+            precedentes.insert(0, lignes)
+        self.assertEqual(precedentes, pages[:-1])
+    
+    def test_curseurs_invalides(self):
+        jetons = [
+            'pas-un-curseur',
+            base64.urlsafe_b64encode(b'{"v": [1]}').decode(),
+            base64.urlsafe_b64encode(json.dumps({'v': ['pas une date', 'x']}).encode()).decode(),
+        ]
+        for jeton in jetons:
+            with self.subTest(jeton=jeton), self.assertRaises(NotFound):
+                self.page(curseur=jeton)
+    
+    def test_pagination_par_numero_par_defaut(self):
+        paginator, lignes = self.page(page=2, page_size=3)
+        
+        self.assertFalse(paginator.curseur)
+        self.assertEqual(paginator.page.paginator.count, 10)
+        self.assertEqual(len(lignes), 3)
@@ -0,0 +1,36 @@
+# ============================================================================
+# backend/api/texte.py
+# ============================================================================
+"""
+Outils communs de la recherche : normalisation des textes et présence
+des tables d'index créées par les migrations (ex. tables FTS5 SQLite)
+"""
+import unicodedata
+
+from django.db import connections
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+
+# Présence des tables d'index, par (base, table) : vérifiée une fois par processus
+_tables_index = {}
+
+
+def normaliser(texte):
+    """Minuscules et suppression des accents"""
+    decompose = unicodedata.normalize('NFKD', texte.lower())
+    return ''.join(caractere for caractere in decompose if not unicodedata.combining(caractere))
+
+
+def table_index_disponible(table, alias='default'):
+    """Vrai si la table existe (introspection au premier appel seulement)"""
+    cle = (alias, table)
+    if cle not in _tables_index:
+        _tables_index[cle] = table in connections[alias].introspection.table_names()
+    return _tables_index[cle]
+
+
+@receiver(post_migrate)
+def oublier_tables_index(sender, **kwargs):
+    """Une migration peut créer ou supprimer une table d'index"""
+    _tables_index.clear()
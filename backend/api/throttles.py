@@ -0,0 +1,26 @@
+# ============================================================================
+# backend/api/throttles.py
+# ============================================================================
+"""
+Limitation de débit des points d'accès publics
+Par adresse IP, connectée ou non. Les débits se règlent dans
+REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] (portée de chaque classe), avec
+une valeur par défaut si la portée n'y figure pas.
+"""
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ThrottleParIP(SimpleRateThrottle):
+    """Base : définir scope et rythme_defaut"""
+    
+    scope = None
+    rythme_defaut = None
+    
+    def get_rate(self):
+        return self.THROTTLE_RATES.get(self.scope, self.rythme_defaut)
+    
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
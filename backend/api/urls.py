@@ -74,47 +74,52 @@ class APIStatsView(APIView):
     def get(self, request, format=None):
         """Statistiques générales publiques"""
         from django.contrib.auth import get_user_model
-        from django.db.models import Count
+        from django.db.models import Count, Q
+        
+        from .statistiques import totaux
         
         User = get_user_model()
         
         try:
+            # Volumes des tables de faits lus dans les statistiques quotidiennes
+            volumes = totaux('inscriptions_formations', 'tentatives_quiz', 'inscriptions_events')
+            
             # Importer les modèles dynamiquement pour éviter les erreurs si apps pas installées
             stats = {
-                'users': {
-                    'total': User.objects.count(),
-                    'active': User.objects.filter(is_active=True).count()
-                }
+                'users': User.objects.aggregate(
+                    total=Count('id'),
+                    active=Count('id', filter=Q(is_active=True))
+                )
             }
             
             # Ajouter stats training si disponible
             try:
-                from training.models import Formation, InscriptionFormation
+                from training.models import Formation
                 stats['training'] = {
                     'formations_total': Formation.objects.count(),
                     'formations_actives': Formation.objects.filter(status='active').count(),
-                    'inscriptions_total': InscriptionFormation.objects.count()
+                    'inscriptions_total': volumes['inscriptions_formations']
                 }
             except ImportError:
                 stats['training'] = {'status': 'not_available'}
             
             # Ajouter stats quiz si disponible
             try:
-                from quiz.models import Quiz, TentativeQuiz
+                from quiz.models import Quiz
                 stats['quiz'] = {
                     'quiz_total': Quiz.objects.count(),
-                    'tentatives_total': TentativeQuiz.objects.count()
+                    'tentatives_total': volumes['tentatives_quiz']
                 }
             except ImportError:
                 stats['quiz'] = {'status': 'not_available'}
             
             # Ajouter stats events si disponible
             try:
-                from events.models import Event, InscriptionEvent
+                from events.models import Event
                 stats['events'] = {
                     'events_total': Event.objects.count(),
                     'events_publies': Event.objects.filter(est_publie=True).count(),
-                    'inscriptions_total': InscriptionEvent.objects.count()
+                    'inscriptions_total': volumes['inscriptions_events']
                 }
             except ImportError:
                 stats['events'] = {'status': 'not_available'}
@@ -117,7 +117,16 @@ class InscriptionEventAdmin(admin.ModelAdmin):
     
     def confirmer_inscriptions(self, request, queryset):
         """Action pour confirmer plusieurs inscriptions"""
-        count = queryset.filter(statut='en_attente').update(statut='confirmee')
+        from .capacite import EvenementComplet, confirmer_inscription
+        
+        # Une par une pour réserver chaque place (pas de surréservation)
+        count = 0
+        for inscription in queryset.filter(statut='en_attente').order_by('date_inscription'):
+            try:
+                confirmer_inscription(inscription)
+                count += 1
+            except EvenementComplet:
+                continue
         self.message_user(request, f'{count} inscription(s) confirmée(s)')
     confirmer_inscriptions.short_description = 'Confirmer les inscriptions sélectionnées'
     
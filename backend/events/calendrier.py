@@ -0,0 +1,162 @@
+# ============================================================================
+# backend/events/calendrier.py
+# ============================================================================
+"""
+Calendrier des événements par mois
+Chaque mois (selon la date de début, en heure locale) est calculé en une
+requête, participantes confirmées comprises, puis mis en cache sous une
+clé (année, mois, version). Une écriture sur un événement ou une
+inscription n'avance que la version du mois concerné.
+"""
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from api.conditionnel import marquer_modification, version
+from .models import Event
+
+
+# Fenêtre maximale d'une requête calendrier (une vue mois en couvre ~6 semaines)
+FENETRE_MAX_JOURS = 93
+
+# Durée de vie (secondes) d'un mois en cache : borne le retard des écritures
+# faites sans signaux (update() en masse)
+DUREE_CACHE_MOIS = 3600
+
+COULEURS_CATEGORIES = {
+    'formation': '#3498db',
+    'conference': '#e74c3c',
+    'atelier': '#2ecc71',
+    'networking': '#f39c12',
+    'webinaire': '#9b59b6',
+    'autre': '#95a5a6'
+}
+
+
+class FenetreInvalide(ValueError):
+    """Levée pour une fenêtre de calendrier mal formée ou trop large"""
+
+
+def ressource_mois(annee, mois):
+    """Nom de la ressource versionnée d'un mois (voir api.conditionnel)"""
+    return f'calendrier_{annee}_{mois:02d}'
+
+
+def mois_de(date):
+    """(année, mois) local d'une date"""
+    locale = timezone.localtime(date)
+    return locale.year, locale.month
+
+
+def invalider_mois(*dates):
+    """Avance la version des mois contenant ces dates (None ignorées)"""
+    ressources = {ressource_mois(*mois_de(date)) for date in dates if date is not None}
+    if ressources:
+        marquer_modification(*ressources)
+
+
+def bornes_mois(annee, mois):
+    debut = timezone.make_aware(datetime(annee, mois, 1))
+    suivant = timezone.make_aware(datetime(annee + mois // 12, mois % 12 + 1, 1))
+    return debut, suivant
+
+
+def mois_couverts(debut, fin):
+    """Liste des (année, mois) locaux rencontrés entre deux dates"""
+    annee, mois = mois_de(debut)
+    derniere = mois_de(fin)
+    couverts = []
+    while (annee, mois) <= derniere:
+        couverts.append((annee, mois))
+        annee, mois = (annee + 1, 1) if mois == 12 else (annee, mois + 1)
+    return couverts
+
+
+def calculer_mois(annee, mois):
+    """Événements publiés commençant dans le mois, en une requête"""
+    debut, suivant = bornes_mois(annee, mois)
+    events = Event.objects.filter(
+        est_publie=True,
+        date_debut__gte=debut,
+        date_debut__lt=suivant
+    ).annotate(
+        nb_confirmees=Count('inscriptions', filter=Q(inscriptions__statut='confirmee'))
+    ).order_by('date_debut').values(
+        'id', 'titre', 'slug', 'date_debut', 'date_fin', 'categorie', 'lieu',
+        'est_en_ligne', 'max_participants', 'est_featured', 'nb_confirmees'
+    )
+    
+    # (début, fin, entrée calendrier) : les bornes restent des dates pour le filtrage
+    return [
+        (event['date_debut'], event['date_fin'], {
+            'id': str(event['id']),
+            'title': event['titre'],
+            'start': event['date_debut'].isoformat(),
+            'end': event['date_fin'].isoformat(),
+            'backgroundColor': COULEURS_CATEGORIES.get(event['categorie'], '#95a5a6'),
+            'borderColor': COULEURS_CATEGORIES.get(event['categorie'], '#95a5a6'),
+            'url': f"/events/{event['slug']}/",
+            'extendedProps': {
+                'categorie': event['categorie'],
+                'lieu': event['lieu'] if not event['est_en_ligne'] else 'En ligne',
+                'participants': event['nb_confirmees'],
+                'max_participants': event['max_participants'],
+                'est_featured': event['est_featured']
+            }
+        })
+        for event in events
+    ]
+
+
+def evenements_du_mois(annee, mois):
+    """Événements du mois depuis le cache, calculés à la demande"""
+    cle = f"events_{ressource_mois(annee, mois)}_v{version(ressource_mois(annee, mois))!r}"
+    events = cache.get(cle)
+    if events is None:
+        events = calculer_mois(annee, mois)
+        cache.set(cle, events, DUREE_CACHE_MOIS)
+    return events
+
+
+def fenetre(debut=None, fin=None):
+    """
+    Bornes d'une requête calendrier (chaînes ISO optionnelles).
+    Sans bornes : le mois courant. Lève FenetreInvalide au-delà de
+    FENETRE_MAX_JOURS ou pour une date illisible.
+    """
+    def lire(valeur):
+        try:
+            date = datetime.fromisoformat(valeur.replace('Z', '+00:00'))
+        except ValueError:
+            raise FenetreInvalide(f"Date invalide : {valeur}")
+        return timezone.make_aware(date) if timezone.is_naive(date) else date
+    
+    if debut:
+        debut = lire(debut)
+    if fin:
+        fin = lire(fin)
+    
+    if not debut and not fin:
+        debut, fin = bornes_mois(*mois_de(timezone.now()))
+    elif not debut:
+        debut = fin - timedelta(days=FENETRE_MAX_JOURS)
+    elif not fin:
+        fin = debut + timedelta(days=FENETRE_MAX_JOURS)
+    
+    if fin <= debut:
+        raise FenetreInvalide("La fin de la fenêtre doit suivre son début")
+    if fin - debut > timedelta(days=FENETRE_MAX_JOURS):
+        raise FenetreInvalide(f"La fenêtre du calendrier est limitée à {FENETRE_MAX_JOURS} jours")
+    return debut, fin
+
+
+def evenements_calendrier(debut, fin):
+    """Événements commençant après `debut` et finissant avant `fin`"""
+    return [
+        entree
+        for annee, mois in mois_couverts(debut, fin)
+        for date_debut, date_fin, entree in evenements_du_mois(annee, mois)
+        if date_debut >= debut and date_fin <= fin
+    ]
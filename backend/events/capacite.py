@@ -0,0 +1,152 @@
+# ============================================================================
+# backend/events/capacite.py
+# ============================================================================
+"""
+Gestion des places des événements
+Réservation atomique des places et promotion de la liste d'attente
+"""
+from django.db import transaction
+from django.db.models import F, Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Event, InscriptionEvent, STATUTS_PLACES_OCCUPEES
+
+
+class EvenementComplet(Exception):
+    """Levée quand plus aucune place n'est disponible"""
+
+
+def reserver_place(event_id):
+    """
+    Réserve une place par un UPDATE conditionnel : le compteur n'est
+    incrémenté que s'il reste de la place. Retourne True si la place
+    est obtenue.
+    """
+    return Event.objects.filter(
+        pk=event_id,
+        places_occupees__lt=F('max_participants')
+    ).update(places_occupees=F('places_occupees') + 1) == 1
+
+
+def liberer_place(event_id):
+    """Libère une place du compteur (sans jamais passer sous zéro)"""
+    return Event.objects.filter(
+        pk=event_id,
+        places_occupees__gt=0
+    ).update(places_occupees=F('places_occupees') - 1) == 1
+
+
+def inscrire_participante(event, participante, **champs):
+    """
+    Inscrit une participante en réservant sa place dans la même transaction.
+    Bascule en liste d'attente si l'événement est complet, lève
+    EvenementComplet si la liste d'attente est désactivée.
+    """
+    with transaction.atomic():
+        inscription = InscriptionEvent(event=event, participante=participante, **champs)
+        
+        if event.validation_requise:
+            # La place ne sera réservée qu'à la validation
+            places_occupees = Event.objects.values_list(
+                'places_occupees', flat=True
+            ).get(pk=event.pk)
+            if places_occupees < event.max_participants:
+                inscription.statut = 'en_attente_validation'
+            elif event.liste_attente_activee:
+                inscription.statut = 'en_attente'
+            else:
+                raise EvenementComplet()
+        elif reserver_place(event.pk):
+            inscription.statut = 'confirmee'
+            inscription._place_reservee = True
+        elif event.liste_attente_activee:
+            inscription.statut = 'en_attente'
+        else:
+            raise EvenementComplet()
+        
+        inscription.save()
+    
+    return inscription
+
+
+def confirmer_inscription(inscription, statut='confirmee'):
+    """
+    Fait passer une inscription vers un statut qui occupe une place,
+    en réservant cette place de façon atomique.
+    """
+    with transaction.atomic():
+        if inscription.statut not in STATUTS_PLACES_OCCUPEES:
+            if not reserver_place(inscription.event_id):
+                raise EvenementComplet()
+            inscription._place_reservee = True
+        
+        inscription.statut = statut
+        inscription.save()
+    
+    return inscription
+
+
+def promouvoir_liste_attente(event, limite=None):
+    """
+    Confirme les inscriptions en liste d'attente (FIFO) tant qu'il reste
+    des places. Retourne la liste des inscriptions promues.
+    """
+    promues = []
+    
+    with transaction.atomic():
+        attente = InscriptionEvent.objects.select_for_update().filter(
+            event=event,
+            statut='en_attente'
+        ).order_by('date_inscription')
+        if limite:
+            attente = attente[:limite]
+        
+        for inscription in attente:
+            if not reserver_place(event.pk):
+                break
+            inscription._place_reservee = True
+            inscription.statut = 'confirmee'
+            inscription.save()
+            promues.append(inscription)
+    
+    return promues
+
+
+def desinscrire_participante(inscription):
+    """
+    Supprime une inscription et, si une place se libère, promeut la
+    première inscription de la liste d'attente dans la même transaction.
+    """
+    event = inscription.event
+    
+    with transaction.atomic():
+        # Le signal post_delete libère la place dans le compteur
+        inscription.delete()
+        
+        if event.liste_attente_activee:
+            return promouvoir_liste_attente(event, limite=1)
+    
+    return []
+
+
+def recalculer_places_occupees(events=None):
+    """
+    Resynchronise le compteur dénormalisé avec les inscriptions réelles,
+    en un seul UPDATE corrélé : le décompte et l'écriture ont lieu dans la
+    même instruction, une inscription concurrente ne peut s'intercaler.
+    Retourne le nombre d'événements corrigés.
+    """
+    queryset = Event.objects.all() if events is None else events
+    places_reelles = Coalesce(Subquery(
+        InscriptionEvent.objects.filter(
+            event_id=OuterRef('pk'),
+            statut__in=STATUTS_PLACES_OCCUPEES
+        ).order_by().values('event_id').annotate(nombre=Count('pk')).values('nombre'),
+        output_field=IntegerField()
+    ), Value(0))
+    
+    return Event.objects.filter(
+        pk__in=queryset.values('pk')
+    ).exclude(
+        places_occupees=places_reelles
+    ).update(places_occupees=places_reelles)
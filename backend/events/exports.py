@@ -0,0 +1,117 @@
+# ============================================================================
+# backend/events/exports.py
+# ============================================================================
+"""
+Exports des événements et des participants
+Les fichiers sont produits au fil de l'eau (StreamingHttpResponse) à partir
+de querysets parcourus par paquets, sans jamais charger tout l'export en mémoire
+"""
+import csv
+import json
+import tempfile
+
+from django.http import StreamingHttpResponse, FileResponse
+
+
+# Nombre de lignes lues par paquet dans la base
+TAILLE_PAQUET = 2000
+
+
+class _TamponEcho:
+    """Pseudo-fichier dont write() renvoie la ligne au lieu de la stocker"""
+    
+    def write(self, valeur):
+        return valeur
+
+
+def reponse_csv(nom_fichier, entete, lignes, bom=False):
+    """Réponse CSV streamée à partir d'un itérable de lignes"""
+    writer = csv.writer(_TamponEcho())
+    
+    def contenu():
+        if bom:
+            # BOM pour Excel
+            yield '\ufeff'
+        yield writer.writerow(entete)
+        for ligne in lignes:
+            yield writer.writerow(ligne)
+    
+    response = StreamingHttpResponse(contenu(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}"'
+    return response
+
+
+def reponse_json(nom_fichier, cle, elements, cle_enfants=None):
+    """
+    Réponse JSON streamée de la forme {"<cle>": [...]} : chaque élément
+    est encodé dès qu'il est produit. Avec cle_enfants, les éléments sont
+    des couples (dict, itérable d'enfants) et les enfants sont eux aussi
+    encodés un par un dans la liste "<cle_enfants>" de leur parent.
+    """
+    def contenu():
+        yield '{%s: [' % json.dumps(cle)
+        for index, element in enumerate(elements):
+            separateur = ', ' if index else ''
+            if cle_enfants is None:
+                yield separateur + json.dumps(element)
+                continue
+            
+            parent, enfants = element
+            debut = json.dumps(parent)[:-1]
+            yield '%s%s%s%s: [' % (separateur, debut, ', ' if parent else '', json.dumps(cle_enfants))
+            for rang, enfant in enumerate(enfants):
+                yield (', ' if rang else '') + json.dumps(enfant)
+            yield ']}'
+        yield ']}'
+    
+    response = StreamingHttpResponse(contenu(), content_type='application/json')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}"'
+    return response
+
+
+def reponse_xlsx(nom_fichier, titre_feuille, entete, lignes):
+    """
+    Réponse XLSX écrite avec openpyxl en mode write-only (les lignes sont
+    vidées sur disque au fur et à mesure) puis servie par morceaux.
+    Retourne None si openpyxl n'est pas installé.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        return None
+    
+    classeur = Workbook(write_only=True)
+    feuille = classeur.create_sheet(title=titre_feuille[:31])
+    feuille.append(entete)
+    for ligne in lignes:
+        feuille.append(ligne)
+    
+    fichier = tempfile.TemporaryFile()
+    classeur.save(fichier)
+    fichier.seek(0)
+    
+    return FileResponse(
+        fichier,
+        as_attachment=True,
+        filename=nom_fichier,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+def events_avec_inscriptions(events, inscriptions):
+    """
+    Associe à chaque événement l'itérateur de ses inscriptions en parcourant
+    en parallèle deux querysets triés par identifiant d'événement (deux
+    requêtes au total). Chaque itérateur doit être consommé avant de passer
+    à l'événement suivant.
+    """
+    inscriptions = iter(inscriptions)
+    courante = [next(inscriptions, None)]
+    
+    def liees(event_id):
+        while courante[0] is not None and courante[0].event_id == event_id:
+            yield courante[0]
+            courante[0] = next(inscriptions, None)
+    
+    for event in events:
+        yield event, liees(event.pk)
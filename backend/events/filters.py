@@ -7,7 +7,11 @@ Filtres pour les événements
 """
 import django_filters
 from django.db.models import Q, Count, F
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
 from .models import Event
+from .recherche import rechercher_events
 
 
 class EventFilter(django_filters.FilterSet):
@@ -33,4 +37,23 @@ class EventFilter(django_filters.FilterSet):
         fields = [
             'categorie', 'date_debut_min', 'date_debut_max',
             'est_en_ligne', 'places_disponibles', 'organisateur'
-        ]
\ No newline at end of file
+        ]
+
+
+class RechercheEventFilter(filters.SearchFilter):
+    """
+    Recherche `?search=` sur l'index plein texte (events.recherche) au lieu
+    d'une chaîne de icontains. Placé après OrderingFilter : les résultats
+    sont classés par pertinence, sauf tri explicite `?ordering=`.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terme = request.query_params.get(self.search_param, '')
+        if not terme.strip():
+            return queryset
+        
+        ordre = queryset.query.order_by
+        resultats = rechercher_events(queryset, terme)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            resultats = resultats.order_by(*ordre)
+        return resultats
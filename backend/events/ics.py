@@ -0,0 +1,191 @@
+# ============================================================================
+# backend/events/ics.py
+# ============================================================================
+"""
+Génération iCalendar (RFC 5545) des événements
+Échappement et pliage des lignes, fichier d'un événement et flux
+d'abonnement d'une participante (URL à jeton), généré en flux continu et
+mis en cache jusqu'à la prochaine modification de ses inscriptions.
+"""
+import datetime
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from api.conditionnel import version
+from .models import Event, STATUTS_INSCRIPTION_ACTIVE
+
+User = get_user_model()
+
+PRODID = '-//Plateforme Femmes en Politique//Event Calendar//FR'
+
+# Domaine des UID iCalendar (identifiants stables d'un événement)
+DOMAINE_UID = 'plateforme-femmes'
+
+# Intervalle de rafraîchissement suggéré aux applications d'agenda
+INTERVALLE_RAFRAICHISSEMENT = 'PT15M'
+
+# Durée de vie (secondes) d'un flux en cache ; la version des inscriptions
+# de la participante l'invalide avant à chaque changement
+DUREE_CACHE_FLUX = 24 * 3600
+
+# Longueur maximale d'une ligne, en octets, avant pliage
+LONGUEUR_LIGNE = 75
+
+SEL_JETON = 'events.ics.flux'
+
+
+def echapper(texte):
+    """Échappe une valeur TEXT (antislash, point-virgule, virgule, retours à la ligne)"""
+    return (
+        str(texte or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+        .replace('\r', '\\n')
+    )
+
+
+def plier(ligne):
+    """Plie une ligne à 75 octets (suite préfixée d'un espace), sans couper un caractère UTF-8"""
+    morceaux = []
+    courant, taille, limite = [], 0, LONGUEUR_LIGNE
+    for caractere in ligne:
+        octets = len(caractere.encode('utf-8'))
+        if taille + octets > limite:
+            morceaux.append(''.join(courant))
+            # Les lignes de continuation commencent par un espace
+            courant, taille, limite = [' '], 1, LONGUEUR_LIGNE
+        courant.append(caractere)
+        taille += octets
+    morceaux.append(''.join(courant))
+    return '\r\n'.join(morceaux) + '\r\n'
+
+
+def date_utc(date):
+    """Date-heure iCalendar en UTC (forme AAAAMMJJTHHMMSSZ)"""
+    return date.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def lignes_entete(nom=None):
+    yield 'BEGIN:VCALENDAR'
+    yield 'VERSION:2.0'
+    yield f'PRODID:{PRODID}'
+    yield 'CALSCALE:GREGORIAN'
+    yield 'METHOD:PUBLISH'
+    if nom:
+        yield f'X-WR-CALNAME:{echapper(nom)}'
+        yield f'REFRESH-INTERVAL;VALUE=DURATION:{INTERVALLE_RAFRAICHISSEMENT}'
+        yield f'X-PUBLISHED-TTL:{INTERVALLE_RAFRAICHISSEMENT}'
+
+
+def lignes_vevent(event):
+    """Lignes (non pliées) du VEVENT d'un événement (cree_par chargé)"""
+    organisatrice = event.cree_par
+    lieu = event.lien_visioconference if event.est_en_ligne else event.lieu
+    
+    yield 'BEGIN:VEVENT'
+    yield f'UID:{event.id}@{DOMAINE_UID}'
+    yield f'DTSTAMP:{date_utc(event.date_modification)}'
+    yield f'DTSTART:{date_utc(event.date_debut)}'
+    yield f'DTEND:{date_utc(event.date_fin)}'
+    yield f'SUMMARY:{echapper(event.titre)}'
+    yield f'DESCRIPTION:{echapper(event.description_courte or event.description)}'
+    if lieu:
+        yield f'LOCATION:{echapper(lieu)}'
+    if organisatrice.email:
+        nom = organisatrice.get_full_name().replace('"', "'")
+        yield f'ORGANIZER;CN="{nom}":mailto:{organisatrice.email}'
+    yield f"STATUS:{'CANCELLED' if event.statut == 'annule' else 'CONFIRMED'}"
+    # Croît à chaque modification : les agendas remplacent leur copie
+    yield f'SEQUENCE:{int(event.date_modification.timestamp())}'
+    yield f'CREATED:{date_utc(event.date_creation)}'
+    yield f'LAST-MODIFIED:{date_utc(event.date_modification)}'
+    yield 'END:VEVENT'
+
+
+def generer_calendrier(events, nom=None):
+    """Produit le calendrier par blocs (en-tête, un VEVENT, fin) de lignes pliées en CRLF"""
+    yield ''.join(plier(ligne) for ligne in lignes_entete(nom))
+    for event in events:
+        yield ''.join(plier(ligne) for ligne in lignes_vevent(event))
+    yield plier('END:VCALENDAR')
+
+
+def calendrier_event(event):
+    """Fichier ICS complet d'un seul événement"""
+    return ''.join(generer_calendrier([event]))
+
+
+# Flux d'abonnement d'une participante
+def jeton_flux(user):
+    """
+    Jeton de l'URL du flux d'une participante. Lié à son mot de passe :
+    le changer révoque les URL déjà partagées.
+    """
+    signature = salted_hmac(SEL_JETON, f'{user.pk}:{user.password}').hexdigest()[:32]
+    return f'{user.pk}-{signature}'
+
+
+def participante_du_jeton(jeton):
+    """Participante désignée par un jeton de flux, ou None s'il est invalide"""
+    identifiant, _, signature = jeton.partition('-')
+    if not identifiant.isdigit() or not signature:
+        return None
+    
+    user = User.objects.filter(pk=identifiant, is_active=True).first()
+    if user is None or not constant_time_compare(jeton, jeton_flux(user)):
+        return None
+    return user
+
+
+def ressource_inscriptions(user_id):
+    """Ressource versionnée (api.conditionnel) des inscriptions d'une participante"""
+    return f'inscriptions_participante_{user_id}'
+
+
+def validateurs_flux(user, categorie=None):
+    """
+    (ETag, horodatage Last-Modified) du flux : ne dépendent que de son
+    contenu (participante, catégorie) et de la version de ses événements,
+    pas des en-têtes de l'agenda qui l'interroge
+    """
+    valeur = version(ressource_inscriptions(user.pk))
+    empreinte = hashlib.md5(f'{user.pk}|{categorie or ""}|{valeur!r}'.encode()).hexdigest()
+    return f'W/"{empreinte}"', int(valeur)
+
+
+def flux_participante(user, categorie=None):
+    """
+    Flux iCalendar des événements auxquels la participante est inscrite,
+    sous forme d'itérable de morceaux de texte. Depuis le cache s'il est à
+    jour ; sinon généré en continu (événements lus par paquets) et mis en
+    cache une fois complet.
+    """
+    cle = (
+        f'events_flux_ics_{user.pk}_{categorie or "tout"}'
+        f'_v{version(ressource_inscriptions(user.pk))!r}'
+    )
+    contenu = cache.get(cle)
+    if contenu is not None:
+        return [contenu]
+    
+    events = Event.objects.filter(
+        inscriptions__participante=user,
+        inscriptions__statut__in=STATUTS_INSCRIPTION_ACTIVE
+    ).select_related('cree_par').order_by('date_debut')
+    if categorie:
+        events = events.filter(categorie=categorie)
+    
+    def generer():
+        morceaux = []
+        for morceau in generer_calendrier(events.iterator(chunk_size=500), nom='Mes événements'):
+            morceaux.append(morceau)
+            yield morceau
+        cache.set(cle, ''.join(morceaux), DUREE_CACHE_FLUX)
+    
+    return generer()
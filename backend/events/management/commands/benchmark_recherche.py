@@ -0,0 +1,141 @@
+# ============================================================================
+# backend/events/management/commands/benchmark_recherche.py
+# ============================================================================
+"""
+Commande de mesure de la recherche d'événements
+Compare l'ancienne chaîne de icontains à l'index plein texte
+(events.recherche) sur un volume d'événements généré
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import Event
+from events.recherche import indexer_events, rechercher_events
+
+User = get_user_model()
+
+# Préfixe des événements créés par le benchmark (purgés avant et après)
+PREFIXE = 'benchrech_'
+
+VOCABULAIRE = [
+    'atelier', 'leadership', 'féminin', 'entrepreneuriat', 'numérique', 'santé',
+    'éducation', 'agriculture', 'finances', 'épargne', 'coopérative', 'marché',
+    'couture', 'élevage', 'informatique', 'gestion', 'prise', 'parole', 'droits',
+    'réseau', 'mentorat', 'créatrices', 'artisanat', 'pêche', 'transformation',
+    'commerce', 'crédit', 'communication', 'jeunesse', 'environnement',
+]
+LIEUX = ['Libreville', 'Port-Gentil', 'Franceville', 'Oyem', 'Moanda', 'Lambaréné']
+FORMATEURS = ['Awa Ndong', 'Élodie Mba', 'Chantal Obiang', 'Sylvie Nzé', 'Hélène Ondo']
+
+SYLLABES = ['ba', 'ko', 'mi', 'ndo', 'la', 'ze', 'tu', 'ga', 'ri', 'mbe', 'so', 'ny', 'ka', 'lo', 'vi', 'de']
+
+TERMES = ['leader', 'entrepreneuriat feminin', 'epargne', 'numer sante', 'Libreville couture', 'obiang', 'ndokami']
+
+
+def recherche_icontains(queryset, terme):
+    """Recherche historique (avant l'index plein texte)"""
+    return queryset.filter(
+        Q(titre__icontains=terme) |
+        Q(description__icontains=terme) |
+        Q(formateur_nom__icontains=terme)
+    )
+
+
+class Command(BaseCommand):
+    help = "Mesure la recherche d'événements : icontains contre index plein texte"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100000, help='Événements générés')
+        parser.add_argument('--repetitions', type=int, default=5, help='Exécutions par terme')
+        parser.add_argument(
+            '--garder',
+            action='store_true',
+            help='Conserve les événements générés après la mesure',
+        )
+    
+    def handle(self, *args, **options):
+        self.purger()
+        try:
+            duree_creation, duree_indexation = self.creer_events(options['events'])
+            self.stdout.write(
+                f"{options['events']} événements créés en {duree_creation:.1f}s, "
+                f"indexés en {duree_indexation:.1f}s"
+            )
+            
+            base = Event.objects.filter(titre__startswith=PREFIXE)
+            self.stdout.write(
+                f"{'terme':<26}{'résultats':>10}{'icontains ms':>14}{'index ms':>10}{'gain':>8}"
+            )
+            for terme in TERMES:
+                nb_contains, duree_contains = self.mesurer(
+                    lambda: recherche_icontains(base, terme).order_by('date_debut'), options['repetitions']
+                )
+                nb_index, duree_index = self.mesurer(
+                    lambda: rechercher_events(base, terme), options['repetitions']
+                )
+                self.stdout.write(
+                    f"{terme:<26}{nb_index:>10}{duree_contains:>14.1f}{duree_index:>10.1f}"
+                    f"{duree_contains / duree_index if duree_index else 0:>7.1f}x"
+                )
+        finally:
+            if not options['garder']:
+                self.purger()
+    
+    def mesurer(self, construire, repetitions):
+        """Durée médiane (ms) du comptage et de la première page de résultats"""
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            queryset = construire()
+            total = queryset.count()
+            list(queryset[:20])
+            durees.append((time.perf_counter() - debut) * 1000)
+        durees.sort()
+        return total, durees[len(durees) // 2]
+    
+    def creer_events(self, nombre):
+        aleatoire = random.Random(42)
+        # Mots de remplissage pour des descriptions au vocabulaire varié
+        remplissage = [
+            ''.join(aleatoire.choices(SYLLABES, k=aleatoire.randint(2, 4)))
+            for _ in range(20000)
+        ]
+        organisatrice = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        now = timezone.now()
+        
+        debut = time.perf_counter()
+        for depart in range(0, nombre, 5000):
+            Event.objects.bulk_create([
+                Event(
+                    titre=f"{PREFIXE}{' '.join(aleatoire.sample(VOCABULAIRE, 3)).capitalize()}",
+                    slug=f'{PREFIXE}{numero}',
+                    description=' '.join(
+                        aleatoire.sample(VOCABULAIRE, 2) + aleatoire.choices(remplissage, k=60)
+                    ),
+                    formateur_nom=aleatoire.choice(FORMATEURS),
+                    lieu=aleatoire.choice(LIEUX),
+                    date_debut=now + timedelta(hours=numero),
+                    date_fin=now + timedelta(hours=numero + 2),
+                    max_participants=30,
+                    cree_par=organisatrice,
+                    statut='ouvert',
+                    est_publie=True,
+                )
+                for numero in range(depart, min(depart + 5000, nombre))
+            ])
+        duree_creation = time.perf_counter() - debut
+        
+        # bulk_create ne déclenche pas les signaux : indexation explicite
+        debut = time.perf_counter()
+        indexer_events(list(Event.objects.filter(titre__startswith=PREFIXE).values_list('pk', flat=True)))
+        return duree_creation, time.perf_counter() - debut
+    
+    def purger(self):
+        """Supprime les événements d'un précédent benchmark"""
+        Event.objects.filter(titre__startswith=PREFIXE).delete()
@@ -0,0 +1,29 @@
+# ============================================================================
+# backend/events/management/commands/indexer_recherche_events.py
+# ============================================================================
+"""
+Commande de reconstruction de l'index de recherche plein texte des événements
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from events.models import Event
+from events.recherche import indexer_events
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des événements"
+    
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        indexer_events()
+        duree = time.perf_counter() - debut
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{Event.objects.count()} événement(s) indexé(s) en {duree:.2f}s "
+                f"(base {connection.vendor})"
+            )
+        )
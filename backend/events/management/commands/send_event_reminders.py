@@ -6,7 +6,7 @@ Commande de gestion pour envoyer les rappels d'événements
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from events.tasks import envoyer_rappels_programmes
+from events.rappels import envoyer_rappels_dus, TAILLE_LOT_RAPPELS
 
 
 class Command(BaseCommand):
@@ -18,6 +18,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Affiche les rappels qui seraient envoyés sans les envoyer',
         )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=TAILLE_LOT_RAPPELS,
+            help='Nombre de rappels réservés et envoyés par lot',
+        )
     
     def handle(self, *args, **options):
         if options['dry_run']:
@@ -37,11 +43,14 @@ class Command(BaseCommand):
                     f"({rappel.heures_avant}h avant)"
                 )
         else:
-            result = envoyer_rappels_programmes()
+            result = envoyer_rappels_dus(taille_lot=options['taille_lot'])
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"Rappels envoyés: {result['rappels_envoyes']}, "
-                    f"Échecs: {result['rappels_echec']}"
+                    f"Rappels envoyés: {result['envoyes']}, "
+                    f"Échecs: {result['echecs']}, "
+                    f"Annulés: {result['annules']} "
+                    f"({result['lots']} lot(s), {result['events']} événement(s), "
+                    f"{result['rappels_par_seconde']} rappels/s)"
                 )
             )
 
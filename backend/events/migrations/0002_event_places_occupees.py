@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:59
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def initialiser_places_occupees(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    events = Event.objects.annotate(
+        places=Count('inscriptions', filter=Q(inscriptions__statut__in=['confirmee', 'presente']))
+    ).filter(places__gt=0)
+    for event_id, places in events.values_list('pk', 'places'):
+        Event.objects.filter(pk=event_id).update(places_occupees=places)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='places_occupees',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Compteur dénormalisé des inscriptions confirmées ou présentes', verbose_name='Places occupées'),
+        ),
+        migrations.RunPython(initialiser_places_occupees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_places_occupees'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rappelevent',
+            name='date_prise_en_charge',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='rappelevent',
+            name='lot_envoi',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='rappelevent',
+            name='statut',
+            field=models.CharField(choices=[('programme', 'Programmé'), ('en_cours', "En cours d'envoi"), ('envoye', 'Envoyé'), ('echec', 'Échec'), ('annule', 'Annulé')], default='programme', max_length=20),
+        ),
+    ]
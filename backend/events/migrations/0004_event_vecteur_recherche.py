@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:42
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def creer_index_recherche(apps, schema_editor):
+    """
+    PostgreSQL : configuration française sans accents et index GIN sur le
+    vecteur ; SQLite : table virtuelle FTS5. Les index sont ensuite remplis.
+    """
+    connection = schema_editor.connection
+
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        schema_editor.execute(
+            "DO $$ BEGIN "
+            "IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'francais_sans_accents') THEN "
+            "CREATE TEXT SEARCH CONFIGURATION francais_sans_accents (COPY = french); "
+            "ALTER TEXT SEARCH CONFIGURATION francais_sans_accents "
+            "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem; "
+            "END IF; END $$"
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS events_event_vecteur_recherche_gin '
+            'ON events_event USING gin (vecteur_recherche)'
+        )
+        schema_editor.execute(
+            "UPDATE events_event SET vecteur_recherche = "
+            "setweight(to_tsvector('francais_sans_accents', coalesce(titre, '')), 'A') || "
+            "setweight(to_tsvector('francais_sans_accents', coalesce(formateur_nom, '') || ' ' || coalesce(lieu, '')), 'B') || "
+            "setweight(to_tsvector('francais_sans_accents', coalesce(description, '')), 'C')"
+        )
+    elif connection.vendor == 'sqlite':
+        # La table de clés associe à chaque événement (clé UUID) la ligne
+        # FTS5 qui l'indexe : mise à jour et suppression passent par le rowid
+        schema_editor.execute(
+            'CREATE TABLE IF NOT EXISTS events_event_fts_cles ('
+            'ligne integer NOT NULL PRIMARY KEY AUTOINCREMENT, '
+            'event_id char(32) NOT NULL UNIQUE)'
+        )
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS events_event_fts USING fts5("
+            "titre, formateur_nom, lieu, description, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute('INSERT INTO events_event_fts_cles (event_id) SELECT id FROM events_event')
+        schema_editor.execute(
+            'INSERT INTO events_event_fts (rowid, titre, formateur_nom, lieu, description) '
+            'SELECT cles.ligne, e.titre, e.formateur_nom, e.lieu, e.description '
+            'FROM events_event e JOIN events_event_fts_cles cles ON cles.event_id = e.id'
+        )
+
+
+def supprimer_index_recherche(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS events_event_vecteur_recherche_gin')
+        schema_editor.execute('DROP TEXT SEARCH CONFIGURATION IF EXISTS francais_sans_accents')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS events_event_fts')
+        schema_editor.execute('DROP TABLE IF EXISTS events_event_fts_cles')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_rappelevent_lot_envoi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='vecteur_recherche',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(creer_index_recherche, supprimer_index_recherche),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_vecteur_recherche'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date_debut', 'id'], name='events_even_date_de_5ad523_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscriptionevent',
+            index=models.Index(fields=['date_inscription', 'id'], name='events_insc_date_in_25a959_idx'),
+        ),
+    ]
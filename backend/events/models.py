@@ -5,12 +5,13 @@
 Modèles pour le module événements
 CORRECTION: Remplacement de la lambda par une fonction nommée
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.urls import reverse
 from django.core.exceptions import ValidationError
+from django.contrib.postgres.search import SearchVectorField
 import uuid
 
 User = get_user_model()
@@ -21,6 +22,92 @@ def default_rappels_automatiques():
     return [24, 2]  # 24h et 2h avant
 
 
+# Statuts d'inscription comptés comme places occupées / inscription active
+STATUTS_PLACES_OCCUPEES = ['confirmee', 'presente']
+STATUTS_INSCRIPTION_ACTIVE = ['confirmee', 'en_attente', 'en_attente_validation', 'presente']
+
+
+class EventQuerySet(models.QuerySet):
+    """QuerySet personnalisé pour précalculer les agrégats des listes"""
+    
+    def avec_statistiques(self, user=None):
+        """
+        Annote en une seule requête SQL l'évaluation moyenne et l'inscription
+        de l'utilisateur courant (le nombre de participants est porté par le
+        compteur places_occupees). Les serializers lisent ces annotations au
+        lieu d'interroger la base pour chaque événement.
+        
+        La moyenne est une sous-requête corrélée plutôt qu'un GROUP BY : elle
+        n'est calculée que pour les lignes retournées et laisse le queryset
+        combinable avec la recherche plein texte (bm25 de FTS5 est refusé
+        dans une requête agrégée).
+        """
+        from django.db.models import Avg, Exists, OuterRef, Subquery, Value
+        
+        moyennes = InscriptionEvent.objects.filter(
+            event=OuterRef('pk')
+        ).order_by().values('event').annotate(
+            moyenne=Avg('evaluation_event')
+        ).values('moyenne')
+        
+        queryset = self.annotate(
+            evaluation_moyenne_annotee=Subquery(moyennes, output_field=models.FloatField()),
+        )
+        
+        if user is not None and user.is_authenticated:
+            queryset = queryset.annotate(
+                est_inscrit_annote=Exists(
+                    InscriptionEvent.objects.filter(
+                        event=OuterRef('pk'),
+                        participante=user,
+                        statut__in=STATUTS_INSCRIPTION_ACTIVE
+                    )
+                )
+            )
+        else:
+            queryset = queryset.annotate(
+                est_inscrit_annote=Value(False, output_field=models.BooleanField())
+            )
+        
+        return queryset
+
+
+# Manager personnalisé pour les événements
+class EventManager(models.Manager.from_queryset(EventQuerySet)):
+    """Manager personnalisé pour optimiser les requêtes"""
+    
+    def publies(self):
+        """Retourne les événements publiés"""
+        return self.filter(est_publie=True, statut__in=['planifie', 'ouvert', 'en_cours'])
+    
+    def a_venir(self):
+        """Retourne les événements à venir"""
+        return self.filter(date_debut__gt=timezone.now())
+    
+    def en_cours(self):
+        """Retourne les événements en cours"""
+        now = timezone.now()
+        return self.filter(date_debut__lte=now, date_fin__gte=now)
+    
+    def passes(self):
+        """Retourne les événements passés"""
+        return self.filter(date_fin__lt=timezone.now())
+    
+    def avec_places_disponibles(self):
+        """Retourne les événements avec des places disponibles"""
+        from django.db.models import F
+        return self.filter(places_occupees__lt=F('max_participants'))
+    
+    def par_categorie(self, categorie):
+        """Filtre par catégorie"""
+        return self.filter(categorie=categorie)
+    
+    def recherche(self, terme):
+        """Recherche plein texte classée par pertinence (voir events.recherche)"""
+        from .recherche import rechercher_events
+        return rechercher_events(self.all(), terme)
+
+
 class Event(models.Model):
     """Modèle principal pour les événements"""
     
@@ -75,6 +162,12 @@ class Event(models.Model):
     date_limite_inscription = models.DateTimeField(null=True, blank=True, verbose_name="Date limite d'inscription")
     validation_requise = models.BooleanField(default=False, verbose_name="Validation requise")
     liste_attente_activee = models.BooleanField(default=True, verbose_name="Liste d'attente activée")
+    places_occupees = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Places occupées",
+        help_text="Compteur dénormalisé des inscriptions confirmées ou présentes"
+    )
     
     # Formateur/Organisateur
     formateur_nom = models.CharField(max_length=200, verbose_name="Nom du formateur")
@@ -97,6 +190,10 @@ class Event(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
     date_modification = models.DateTimeField(auto_now=True, verbose_name="Date de modification")
     
+    # Index plein texte PostgreSQL, maintenu par events.recherche
+    # (sous SQLite, l'index vit dans la table FTS5 events_event_fts)
+    vecteur_recherche = SearchVectorField(null=True, editable=False)
+    
     # Relations
     cree_par = models.ForeignKey(
         User,
@@ -113,6 +210,9 @@ class Event(models.Model):
         verbose_name="Rappels automatiques (en heures)"
     )
     
+    # Manager personnalisé (déclaré dans la classe pour devenir le manager par défaut)
+    objects = EventManager()
+    
     class Meta:
         verbose_name = "Événement"
         verbose_name_plural = "Événements"
@@ -121,6 +221,8 @@ class Event(models.Model):
             models.Index(fields=['date_debut', 'categorie']),
             models.Index(fields=['statut', 'est_publie']),
             models.Index(fields=['slug']),
+            # Clé de la pagination par curseur
+            models.Index(fields=['date_debut', 'id']),
         ]
     
     def __str__(self):
@@ -162,12 +264,21 @@ class Event(models.Model):
             from datetime import timedelta
             self.date_limite_inscription = self.date_debut - timedelta(days=1)
         
+        # Ne jamais réécrire le compteur de places avec une valeur périmée :
+        # il n'est modifié que par les UPDATE atomiques de events.capacite
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'places_occupees'
+            ]
+        
         super().save(*args, **kwargs)
     
     @property
     def nb_participants(self):
         """Nombre de participants confirmés"""
-        return self.inscriptions.filter(statut__in=['confirmee', 'presente']).count()
+        # Compteur maintenu par events.capacite
+        return self.places_occupees
     
     @property
     def places_disponibles(self):
@@ -265,18 +376,38 @@ class InscriptionEvent(models.Model):
         indexes = [
             models.Index(fields=['event', 'statut']),
             models.Index(fields=['participante', 'date_inscription']),
+            # Clé de la pagination par curseur
+            models.Index(fields=['date_inscription', 'id']),
         ]
     
     def __str__(self):
         return f"{self.participante.get_full_name()} - {self.event.titre}"
     
+    def save(self, *args, **kwargs):
+        # La place réservée par les signaux (pre_save) l'est dans la même
+        # transaction que l'écriture : un INSERT en échec la rend
+        place_reservee = getattr(self, '_place_reservee', False)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except Exception:
+            # Réservation annulée avec la transaction : à refaire au prochain essai
+            self._place_reservee = place_reservee
+            raise
+    
+    def delete(self, *args, **kwargs):
+        # La place est libérée (post_delete) avec la suppression
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+    
     def confirmer(self, validateur=None):
-        """Confirme l'inscription"""
-        self.statut = 'confirmee'
+        """Confirme l'inscription en réservant sa place"""
+        from .capacite import confirmer_inscription
+        
         if validateur:
             self.validee_par = validateur
             self.date_validation = timezone.now()
-        self.save()
+        confirmer_inscription(self)
     
     def refuser(self, validateur=None, commentaire=""):
         """Refuse l'inscription"""
@@ -290,9 +421,10 @@ class InscriptionEvent(models.Model):
     
     def marquer_presente(self):
         """Marque la participante comme présente"""
-        self.statut = 'presente'
+        from .capacite import confirmer_inscription
+        
         self.date_arrivee = timezone.now()
-        self.save()
+        confirmer_inscription(self, statut='presente')
     
     def marquer_absente(self):
         """Marque la participante comme absente"""
@@ -311,6 +443,7 @@ class RappelEvent(models.Model):
     
     STATUTS_RAPPEL = [
         ('programme', 'Programmé'),
+        ('en_cours', "En cours d'envoi"),
         ('envoye', 'Envoyé'),
         ('echec', 'Échec'),
         ('annule', 'Annulé'),
@@ -334,6 +467,10 @@ class RappelEvent(models.Model):
     date_envoi = models.DateTimeField(null=True, blank=True)
     erreur_envoi = models.TextField(blank=True)
     
+    # Prise en charge par le répartiteur (events.rappels)
+    lot_envoi = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
+    date_prise_en_charge = models.DateTimeField(null=True, blank=True, editable=False)
+    
     # Métadonnées
     date_creation = models.DateTimeField(auto_now_add=True)
     
@@ -355,51 +492,6 @@ class RappelEvent(models.Model):
         )
 
 
-# Manager personnalisé pour les événements
-class EventManager(models.Manager):
-    """Manager personnalisé pour optimiser les requêtes"""
-    
-    def publies(self):
-        """Retourne les événements publiés"""
-        return self.filter(est_publie=True, statut__in=['planifie', 'ouvert', 'en_cours'])
-    
-    def a_venir(self):
-        """Retourne les événements à venir"""
-        return self.filter(date_debut__gt=timezone.now())
-    
-    def en_cours(self):
-        """Retourne les événements en cours"""
-        now = timezone.now()
-        return self.filter(date_debut__lte=now, date_fin__gte=now)
-    
-    def passes(self):
-        """Retourne les événements passés"""
-        return self.filter(date_fin__lt=timezone.now())
-    
-    def avec_places_disponibles(self):
-        """Retourne les événements avec des places disponibles"""
-        from django.db.models import Count, F
-        return self.annotate(
-            nb_inscrits=Count('inscriptions', filter=models.Q(inscriptions__statut='confirmee'))
-        ).filter(nb_inscrits__lt=F('max_participants'))
-    
-    def par_categorie(self, categorie):
-        """Filtre par catégorie"""
-        return self.filter(categorie=categorie)
-    
-    def recherche(self, terme):
-        """Recherche dans le titre et la description"""
-        from django.db.models import Q
-        return self.filter(
-            Q(titre__icontains=terme) |
-            Q(description__icontains=terme) |
-            Q(formateur_nom__icontains=terme)
-        )
-
-
-# Ajouter le manager personnalisé au modèle Event
-Event.add_to_class('objects', EventManager())
-
 # Relations supplémentaires pour optimiser les requêtes
 Event.add_to_class(
     'participants_confirmes',
@@ -32,6 +32,10 @@ class EventPermissions(permissions.BasePermission):
                 return True
             return request.user.is_staff or obj.cree_par == request.user
         
+        # Inscription/désinscription : ouvertes à tous sur les événements publiés
+        if getattr(view, 'action', None) in ('inscrire', 'desinscrire'):
+            return obj.est_publie or request.user.is_staff
+        
         # Modification/suppression : créateur ou admin
         if request.method in ['PUT', 'PATCH', 'DELETE']:
             return request.user.is_staff or obj.cree_par == request.user
@@ -179,13 +183,8 @@ def can_user_register_to_event(user, event):
     if InscriptionEvent.objects.filter(event=event, participante=user).exists():
         return False, "Déjà inscrit à cet événement"
     
-    # Vérifier la capacité
-    inscriptions_confirmees = InscriptionEvent.objects.filter(
-        event=event, 
-        statut__in=['confirmee', 'presente']
-    ).count()
-    
-    if inscriptions_confirmees >= event.max_participants:
+    # Vérifier la capacité (compteur maintenu par events.capacite)
+    if event.places_occupees >= event.max_participants:
         if event.liste_attente_activee:
             return True, "Inscription possible en liste d'attente"
         else:
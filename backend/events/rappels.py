@@ -0,0 +1,334 @@
+# ============================================================================
+# backend/events/rappels.py
+# ============================================================================
+"""
+Planification et envoi des rappels d'événements
+Calcul ensembliste des rappels attendus, insertion groupée des manquants
+et répartiteur qui réserve puis envoie les rappels dus par lots
+"""
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import Event, InscriptionEvent, RappelEvent, STATUTS_PLACES_OCCUPEES
+from .utils import generer_fichier_ics
+from api.emails import EnvoiGroupe, ServeurEmailIndisponible, creer_email
+
+
+# Type des rappels créés automatiquement
+TYPE_RAPPEL_AUTOMATIQUE = 'email'
+
+# Templates (objet, texte, HTML) des types de rappels envoyés par email ;
+# les autres types (SMS, notification) ne sont pas réservés par le répartiteur
+TEMPLATES_RAPPEL = {
+    'email': (
+        'events/emails/rappel_subject.txt',
+        'events/emails/rappel_message.txt',
+        'events/emails/rappel_message.html',
+    ),
+    'confirmation': (
+        'events/emails/confirmation_subject.txt',
+        'events/emails/confirmation_message.txt',
+        'events/emails/confirmation_message.html',
+    ),
+}
+
+# Nombre de rappels réservés à chaque tour du répartiteur
+TAILLE_LOT_RAPPELS = 200
+
+# Au-delà de ce délai, un rappel resté 'en_cours' est considéré abandonné
+# (worker interrompu) et redevient 'programme'
+DELAI_PRISE_EN_CHARGE = timedelta(minutes=15)
+
+
+def planifier_rappels(events=None, participante=None):
+    """
+    Crée les rappels automatiques manquants.
+    
+    Calcule l'ensemble attendu (événement, destinataire, heures_avant) à
+    partir des inscriptions confirmées, le compare aux rappels existants
+    (une requête) et insère la différence avec bulk_create. `events`
+    (queryset) et `participante` restreignent le périmètre, par exemple à
+    l'événement qui vient d'être modifié. Retourne le nombre de rappels créés.
+    """
+    now = timezone.now()
+    
+    if events is None:
+        events = Event.objects.all()
+    events = events.filter(
+        notifications_activees=True,
+        rappels_automatiques__isnull=False,
+        date_debut__gt=now
+    ).exclude(rappels_automatiques=[])
+    
+    # Dates de programmation par événement, limitées au futur
+    echeances = {}
+    for event_id, date_debut, rappels_automatiques in events.values_list(
+        'pk', 'date_debut', 'rappels_automatiques'
+    ):
+        echeances[event_id] = {
+            heures_avant: date_debut - timedelta(hours=heures_avant)
+            for heures_avant in rappels_automatiques
+            if date_debut - timedelta(hours=heures_avant) > now
+        }
+    echeances = {event_id: dates for event_id, dates in echeances.items() if dates}
+    if not echeances:
+        return 0
+    
+    inscriptions = InscriptionEvent.objects.filter(
+        event_id__in=echeances.keys(),
+        statut__in=STATUTS_PLACES_OCCUPEES
+    )
+    rappels = RappelEvent.objects.filter(event_id__in=echeances.keys())
+    if participante is not None:
+        inscriptions = inscriptions.filter(participante=participante)
+        rappels = rappels.filter(destinataire=participante)
+    
+    # Clé de comparaison alignée sur l'unicité de RappelEvent (type compris)
+    attendus = {
+        (event_id, participante_id, heures_avant, TYPE_RAPPEL_AUTOMATIQUE)
+        for event_id, participante_id in inscriptions.values_list('event_id', 'participante_id')
+        for heures_avant in echeances[event_id]
+    }
+    existants = set(rappels.values_list('event_id', 'destinataire_id', 'heures_avant', 'type_rappel'))
+    manquants = attendus - existants
+    
+    RappelEvent.objects.bulk_create(
+        [
+            RappelEvent(
+                event_id=event_id,
+                destinataire_id=destinataire_id,
+                type_rappel=type_rappel,
+                heures_avant=heures_avant,
+                date_programmee=echeances[event_id][heures_avant],
+                statut='programme'
+            )
+            for event_id, destinataire_id, heures_avant, type_rappel in manquants
+        ],
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+    
+    return len(manquants)
+
+
+def replanifier_rappels(event):
+    """
+    Recale sur la nouvelle date de début les rappels encore programmés
+    d'un événement déplacé (une requête UPDATE par échéance). Les rappels
+    dont la nouvelle date est passée sont supprimés, ceux devenus possibles
+    sont créés par planifier_rappels. Retourne le nombre de rappels recalés.
+    """
+    now = timezone.now()
+    programmes = RappelEvent.objects.filter(event=event, statut='programme')
+    
+    recales = 0
+    for heures_avant in set(programmes.values_list('heures_avant', flat=True)):
+        date_programmee = event.date_debut - timedelta(hours=heures_avant)
+        rappels = programmes.filter(heures_avant=heures_avant)
+        if date_programmee > now:
+            recales += rappels.update(date_programmee=date_programmee)
+        else:
+            rappels.delete()
+    
+    planifier_rappels(Event.objects.filter(pk=event.pk))
+    return recales
+
+
+def liberer_rappels_abandonnes():
+    """Remet en file les rappels réservés par un envoi qui n'a pas abouti"""
+    return RappelEvent.objects.filter(
+        statut='en_cours',
+        date_prise_en_charge__lt=timezone.now() - DELAI_PRISE_EN_CHARGE
+    ).update(statut='programme', lot_envoi=None, date_prise_en_charge=None)
+
+
+def reserver_rappels(taille_lot=TAILLE_LOT_RAPPELS, rappel_ids=None):
+    """
+    Réserve un lot de rappels dus et retourne les rappels obtenus.
+    
+    Les rappels passent de 'programme' à 'en_cours' par un UPDATE
+    conditionnel marqué d'un identifiant de lot : un rappel ne peut être
+    réservé que par un seul répartiteur, même si deux exécutions se
+    chevauchent. Sur les bases qui le permettent, SKIP LOCKED évite en plus
+    que deux répartiteurs se disputent les mêmes lignes. Seuls les types
+    envoyés par email (TEMPLATES_RAPPEL) sont réservés.
+    """
+    now = timezone.now()
+    lot = uuid.uuid4()
+    
+    dus = RappelEvent.objects.filter(
+        statut='programme',
+        date_programmee__lte=now,
+        type_rappel__in=TEMPLATES_RAPPEL.keys()
+    )
+    if rappel_ids is not None:
+        dus = dus.filter(pk__in=rappel_ids)
+    
+    # Sans SKIP LOCKED (SQLite), la transaction n'apporterait rien : seul
+    # l'UPDATE conditionnel garantit l'unicité de la réservation
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic() if skip_locked else nullcontext():
+        if skip_locked:
+            dus = dus.select_for_update(skip_locked=True)
+        ids = list(dus.order_by('date_programmee').values_list('pk', flat=True)[:taille_lot])
+        if not ids:
+            return []
+        
+        RappelEvent.objects.filter(pk__in=ids, statut='programme').update(
+            statut='en_cours',
+            lot_envoi=lot,
+            date_prise_en_charge=now
+        )
+    
+    return list(
+        RappelEvent.objects.filter(lot_envoi=lot).select_related(
+            'event', 'event__cree_par', 'destinataire'
+        )
+    )
+
+
+def _preparer_message(rappel, rendus, ics):
+    """Construit l'email d'un rappel à partir des rendus partagés de son événement"""
+    event = rappel.event
+    
+    cle = (rappel.type_rappel, rappel.heures_avant)
+    if cle not in rendus:
+        # Les templates ne dépendent que de l'événement, du type et de l'échéance
+        context = {'event': event, 'heures_avant': rappel.heures_avant}
+        template_sujet, template_texte, template_html = TEMPLATES_RAPPEL[rappel.type_rappel]
+        rendus[cle] = (
+            get_template(template_sujet).render(context).strip(),
+            get_template(template_texte).render(context),
+            get_template(template_html).render(context),
+        )
+    sujet, texte, html = rendus[cle]
+    
+    # Contenu personnalisé : rendu propre à ce rappel
+    if rappel.objet_personnalise:
+        sujet = rappel.objet_personnalise
+    if rappel.message_personnalise:
+        texte = rappel.message_personnalise.format(
+            rappel=rappel,
+            event=event,
+            participante=rappel.destinataire,
+            heures_avant=rappel.heures_avant
+        )
+        html = None
+    
+    return creer_email(
+        sujet,
+        texte,
+        [rappel.destinataire.email],
+        html=html,
+        pieces_jointes=[(f'evenement-{event.pk}.ics', ics, 'text/calendar')]
+    )
+
+
+def _envoyer_lot(rappels, envoi):
+    """
+    Envoie un lot de rappels regroupés par événement : le fichier ICS et
+    les templates ne sont rendus qu'une fois par événement.
+    Retourne (ids envoyés, rappels en échec, ids reportés, ids annulés,
+    nombre d'événements).
+    """
+    par_event = {}
+    for rappel in rappels:
+        par_event.setdefault(rappel.event_id, []).append(rappel)
+    
+    echecs, annules = {}, []
+    
+    for rappels_event in par_event.values():
+        event = rappels_event[0].event
+        if event.est_passe:
+            annules.extend(rappel.pk for rappel in rappels_event)
+            continue
+        
+        ics = generer_fichier_ics(event)
+        rendus = {}
+        
+        for rappel in rappels_event:
+            try:
+                if not rappel.destinataire.email:
+                    raise ValueError("Adresse email manquante")
+                envoi.ajouter(_preparer_message(rappel, rendus, ics), cle=rappel.pk)
+            except Exception as e:
+                echecs[rappel.pk] = e
+    
+    envoyes, reportes = [], []
+    for rappel_id, erreur in envoi.vider().items():
+        if erreur is None:
+            envoyes.append(rappel_id)
+        elif isinstance(erreur, ServeurEmailIndisponible):
+            reportes.append(rappel_id)
+        else:
+            echecs[rappel_id] = erreur
+    
+    echecs = [
+        RappelEvent(pk=rappel_id, statut='echec', erreur_envoi=str(erreur), lot_envoi=None)
+        for rappel_id, erreur in echecs.items()
+    ]
+    return envoyes, echecs, reportes, annules, len(par_event)
+
+
+def envoyer_rappels_dus(taille_lot=TAILLE_LOT_RAPPELS, rappel_ids=None):
+    """
+    Répartiteur des rappels : réserve les rappels dus par lots, les envoie
+    via la couche d'envoi groupé (api.emails) puis met à jour les statuts
+    en masse. `rappel_ids` restreint l'envoi à certains rappels.
+    Retourne les métriques de l'exécution.
+    """
+    debut = time.monotonic()
+    metriques = {
+        'lots': 0,
+        'events': 0,
+        'reserves': 0,
+        'envoyes': 0,
+        'echecs': 0,
+        'reportes': 0,
+        'annules': 0,
+        'liberes': liberer_rappels_abandonnes(),
+    }
+    
+    envoi = EnvoiGroupe()
+    
+    # S'arrêter dès que le serveur email est injoignable : les rappels du
+    # lot sont remis en file pour la prochaine exécution
+    while not envoi.indisponible:
+        rappels = reserver_rappels(taille_lot, rappel_ids)
+        if not rappels:
+            break
+        
+        envoyes, echecs, reportes, annules, nb_events = _envoyer_lot(rappels, envoi)
+        
+        RappelEvent.objects.filter(pk__in=envoyes).update(
+            statut='envoye',
+            date_envoi=timezone.now(),
+            lot_envoi=None
+        )
+        RappelEvent.objects.filter(pk__in=reportes).update(
+            statut='programme',
+            lot_envoi=None,
+            date_prise_en_charge=None
+        )
+        RappelEvent.objects.filter(pk__in=annules).update(statut='annule', lot_envoi=None)
+        RappelEvent.objects.bulk_update(echecs, ['statut', 'erreur_envoi', 'lot_envoi'])
+        
+        metriques['lots'] += 1
+        metriques['events'] += nb_events
+        metriques['reserves'] += len(rappels)
+        metriques['envoyes'] += len(envoyes)
+        metriques['echecs'] += len(echecs)
+        metriques['reportes'] += len(reportes)
+        metriques['annules'] += len(annules)
+    
+    duree = time.monotonic() - debut
+    metriques['duree_secondes'] = round(duree, 3)
+    metriques['rappels_par_seconde'] = round(metriques['envoyes'] / duree, 1) if duree else 0
+    
+    return metriques
@@ -0,0 +1,153 @@
+# ============================================================================
+# backend/events/recherche.py
+# ============================================================================
+"""
+Recherche plein texte des événements
+PostgreSQL : colonne tsvector pondérée (configuration française sans
+accents) et index GIN ; SQLite : table virtuelle FTS5. L'index est tenu à
+jour à chaque enregistrement ou suppression d'un événement ; les autres
+bases retombent sur une recherche icontains.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from api.texte import normaliser, table_index_disponible
+from .models import Event
+
+
+# Configuration PostgreSQL créée par la migration 0004 (french + unaccent)
+CONFIG_RECHERCHE = 'francais_sans_accents'
+
+# Sous SQLite : table virtuelle FTS5 et table associant chaque événement
+# à sa ligne dans l'index
+TABLE_FTS = 'events_event_fts'
+TABLE_CLES = 'events_event_fts_cles'
+
+# Poids bm25 des colonnes indexées (titre > formateur et lieu > description)
+POIDS_SQLITE = '10.0, 4.0, 2.0, 1.0'
+
+# Événements réindexés par requête (limite de paramètres SQLite)
+TAILLE_PAQUET_INDEX = 500
+
+# Nombre maximal de mots pris en compte dans une recherche
+MOTS_MAX = 8
+
+
+def mots_recherche(terme):
+    """Mots significatifs d'une saisie, normalisés (sans syntaxe de requête)"""
+    return re.findall(r'\w+', normaliser(terme))[:MOTS_MAX]
+
+
+def vecteur_event():
+    """Expression du vecteur de recherche pondéré d'un événement"""
+    return (
+        SearchVector('titre', weight='A', config=CONFIG_RECHERCHE) +
+        SearchVector('formateur_nom', 'lieu', weight='B', config=CONFIG_RECHERCHE) +
+        SearchVector('description', weight='C', config=CONFIG_RECHERCHE)
+    )
+
+
+def _fts_disponible():
+    return connection.vendor == 'sqlite' and table_index_disponible(TABLE_FTS)
+
+
+def _indexer_sqlite(cursor, ids):
+    """Remplace les lignes FTS5 des événements donnés (supprimées s'ils n'existent plus)"""
+    marqueurs = ', '.join(['%s'] * len(ids))
+    cursor.execute(
+        f'DELETE FROM {TABLE_FTS} WHERE rowid IN '
+        f'(SELECT ligne FROM {TABLE_CLES} WHERE event_id IN ({marqueurs}))',
+        ids
+    )
+    cursor.execute(f'DELETE FROM {TABLE_CLES} WHERE event_id IN ({marqueurs})', ids)
+    cursor.execute(
+        f'INSERT INTO {TABLE_CLES} (event_id) '
+        f'SELECT id FROM {Event._meta.db_table} WHERE id IN ({marqueurs})',
+        ids
+    )
+    cursor.execute(
+        f'INSERT INTO {TABLE_FTS} (rowid, titre, formateur_nom, lieu, description) '
+        f'SELECT cles.ligne, e.titre, e.formateur_nom, e.lieu, e.description '
+        f'FROM {Event._meta.db_table} e JOIN {TABLE_CLES} cles ON cles.event_id = e.id '
+        f'WHERE e.id IN ({marqueurs})',
+        ids
+    )
+
+
+def indexer_events(event_ids=None):
+    """
+    Met à jour l'index de recherche des événements donnés (tous si None) ;
+    les événements qui n'existent plus en sont retirés. Appelé après chaque
+    enregistrement ou suppression et par la commande indexer_recherche_events.
+    """
+    if connection.vendor == 'postgresql':
+        events = Event.objects.all() if event_ids is None else Event.objects.filter(pk__in=event_ids)
+        events.update(vecteur_recherche=vecteur_event())
+    elif _fts_disponible():
+        with transaction.atomic(), connection.cursor() as cursor:
+            if event_ids is None:
+                cursor.execute(f'DELETE FROM {TABLE_FTS}')
+                cursor.execute(f'DELETE FROM {TABLE_CLES}')
+                event_ids = Event.objects.values_list('pk', flat=True)
+            
+            ids = [Event._meta.pk.get_db_prep_value(event_id, connection) for event_id in event_ids]
+            for debut in range(0, len(ids), TAILLE_PAQUET_INDEX):
+                _indexer_sqlite(cursor, ids[debut:debut + TAILLE_PAQUET_INDEX])
+
+
+def rechercher_events(queryset, terme):
+    """
+    Filtre un queryset d'événements sur une saisie libre et l'annote d'une
+    `pertinence` (plus grande = meilleure). Chaque mot est cherché en
+    préfixe, sans tenir compte des accents ; tous les mots doivent être
+    présents. Les résultats sont triés par pertinence puis par date.
+    """
+    mots = mots_recherche(terme)
+    if not mots:
+        return queryset
+    
+    if connection.vendor == 'postgresql':
+        requete = SearchQuery(
+            ' & '.join(f'{mot}:*' for mot in mots),
+            search_type='raw',
+            config=CONFIG_RECHERCHE
+        )
+        return queryset.filter(vecteur_recherche=requete).annotate(
+            pertinence=SearchRank(F('vecteur_recherche'), requete)
+        ).order_by('-pertinence', 'date_debut')
+    
+    if _fts_disponible():
+        # Correspondance et score bm25 calculés par l'index FTS5, pas par un
+        # parcours de events_event. Le score est lu dans le résultat de la
+        # requête plein texte, matérialisé une fois (index automatique sur
+        # event_id) : sans MATERIALIZED, SQLite la réévalue pour chaque ligne
+        expression = ' '.join(f'{mot}*' for mot in mots)
+        materialise = 'MATERIALIZED' if connection.Database.sqlite_version_info >= (3, 35) else ''
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT {TABLE_CLES}.event_id FROM {TABLE_FTS} '
+            f'JOIN {TABLE_CLES} ON {TABLE_CLES}.ligne = {TABLE_FTS}.rowid '
+            f'WHERE {TABLE_FTS} MATCH %s',
+            [expression]
+        )).annotate(pertinence=RawSQL(
+            f'WITH scores AS {materialise} ('
+            f'SELECT {TABLE_CLES}.event_id, -bm25({TABLE_FTS}, {POIDS_SQLITE}) AS score FROM {TABLE_FTS} '
+            f'JOIN {TABLE_CLES} ON {TABLE_CLES}.ligne = {TABLE_FTS}.rowid '
+            f'WHERE {TABLE_FTS} MATCH %s'
+            f') SELECT score FROM scores WHERE scores.event_id = {Event._meta.db_table}.id',
+            [expression],
+            output_field=FloatField()
+        )).order_by('-pertinence', 'date_debut')
+    
+    # Autres bases : recherche simple sans classement
+    for mot in mots:
+        queryset = queryset.filter(
+            Q(titre__icontains=mot) |
+            Q(description__icontains=mot) |
+            Q(formateur_nom__icontains=mot) |
+            Q(lieu__icontains=mot)
+        )
+    return queryset.order_by('date_debut')
@@ -10,7 +10,10 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.db.models import Count, Avg
 
-from .models import Event, InscriptionEvent, RappelEvent
+from .models import (
+    Event, InscriptionEvent, RappelEvent,
+    STATUTS_INSCRIPTION_ACTIVE
+)
 
 User = get_user_model()
 
@@ -53,7 +56,8 @@ class EventSerializer(serializers.ModelSerializer):
     
     def get_nb_participants(self, obj):
         """Nombre de participants confirmés"""
-        return obj.inscriptions.filter(statut__in=['confirmee', 'presente']).count()
+        # Compteur dénormalisé maintenu par events.capacite
+        return obj.places_occupees
     
     def get_places_disponibles(self, obj):
         """Nombre de places disponibles"""
@@ -86,19 +90,24 @@ class EventSerializer(serializers.ModelSerializer):
         """Vérifie si l'utilisateur connecté est inscrit"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'est_inscrit_annote'):
+                return obj.est_inscrit_annote
             return obj.inscriptions.filter(
                 participante=request.user,
-                statut__in=['confirmee', 'en_attente', 'en_attente_validation', 'presente']
+                statut__in=STATUTS_INSCRIPTION_ACTIVE
             ).exists()
         return False
     
     def get_evaluation_moyenne(self, obj):
         """Calcule l'évaluation moyenne de l'événement"""
-        evaluations = obj.inscriptions.filter(evaluation_event__isnull=False)
-        if evaluations.exists():
-            return round(evaluations.aggregate(
-                moyenne=Avg('evaluation_event')
-            )['moyenne'], 2)
+        if hasattr(obj, 'evaluation_moyenne_annotee'):
+            moyenne = obj.evaluation_moyenne_annotee
+        else:
+            moyenne = obj.inscriptions.filter(
+                evaluation_event__isnull=False
+            ).aggregate(moyenne=Avg('evaluation_event'))['moyenne']
+        if moyenne is not None:
+            return round(moyenne, 2)
         return None
     
     def validate(self, data):
@@ -198,7 +207,7 @@ class InscriptionEventSerializer(serializers.ModelSerializer):
         model = InscriptionEvent
         fields = [
             'id', 'event', 'participante', 'statut', 'date_inscription',
-            'evaluation_event', 'commentaire_evaluation', 'notes_privees',
+            'evaluation_event', 'commentaire_evaluation',
             'event_titre', 'event_date_debut', 'event_lieu', 'event_est_en_ligne',
             'event_lien_visio', 'participante_nom', 'participante_email',
             'peut_evaluer', 'peut_annuler'
@@ -10,12 +10,19 @@ from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 
-from .models import Event, InscriptionEvent, RappelEvent
+from .models import Event, InscriptionEvent, RappelEvent, STATUTS_PLACES_OCCUPEES
+from .capacite import reserver_place, liberer_place
+from .rappels import planifier_rappels, replanifier_rappels
+from .recherche import indexer_events
+from .calendrier import invalider_mois
+from .ics import ressource_inscriptions
 from .tasks import (
     creer_rappels_automatiques, 
     traiter_liste_attente,
     envoyer_notifications_nouvelles_inscriptions
 )
+from api.conditionnel import marquer_modification
+from api.planification import planifier_tache
 
 
 @receiver(post_save, sender=Event)
@@ -29,7 +36,7 @@ def event_post_save(sender, instance, created, **kwargs):
         # Programmer la création des rappels automatiques si configurés
         if instance.notifications_activees and instance.rappels_automatiques:
             # Délai de 5 minutes pour laisser le temps aux inscriptions
-            creer_rappels_automatiques.apply_async(countdown=300)
+            planifier_tache(creer_rappels_automatiques, args=[str(instance.pk)], countdown=300)
     else:
         # Événement modifié
         # Si les rappels automatiques ont été modifiés, recréer les rappels
@@ -43,7 +50,10 @@ def event_post_save(sender, instance, created, **kwargs):
                 
                 # Créer les nouveaux rappels
                 if instance.notifications_activees and instance.rappels_automatiques:
-                    creer_rappels_automatiques.apply_async(countdown=60)
+                    planifier_tache(creer_rappels_automatiques, args=[str(instance.pk)], countdown=60)
+            # Événement déplacé : les rappels non envoyés suivent la nouvelle date
+            elif getattr(instance, '_old_date_debut', None) != instance.date_debut:
+                replanifier_rappels(instance)
 
 
 @receiver(pre_save, sender=Event)
@@ -55,6 +65,7 @@ def event_pre_save(sender, instance, **kwargs):
         try:
             old_instance = Event.objects.get(pk=instance.pk)
             instance._old_rappels_automatiques = old_instance.rappels_automatiques
+            instance._old_date_debut = old_instance.date_debut
         except Event.DoesNotExist:
             pass
 
@@ -72,38 +83,40 @@ def inscription_post_save(sender, instance, created, **kwargs):
             instance.event.rappels_automatiques and
             instance.statut in ['confirmee', 'presente']):
             
-            for heures_avant in instance.event.rappels_automatiques:
-                date_programmee = instance.event.date_debut - timedelta(hours=heures_avant)
-                
-                # Ne créer que si la date est dans le futur
-                if date_programmee > timezone.now():
-                    RappelEvent.objects.get_or_create(
-                        event=instance.event,
-                        destinataire=instance.participante,
-                        type_rappel='rappel',
-                        heures_avant=heures_avant,
-                        defaults={
-                            'date_programmee': date_programmee,
-                            'statut': 'programme'
-                        }
-                    )
+            planifier_rappels(
+                Event.objects.filter(pk=instance.event_id),
+                participante=instance.participante
+            )
         
         # Envoyer une notification à l'organisateur
         if instance.event.notifications_activees:
-            envoyer_notifications_nouvelles_inscriptions.apply_async(
+            planifier_tache(
+                envoyer_notifications_nouvelles_inscriptions,
                 args=[instance.event.id],
                 countdown=300  # Délai de 5 minutes pour grouper les notifications
             )
     
     else:
         # Inscription modifiée
+        # Une inscription qui vient d'obtenir une place reçoit ses rappels
+        if (getattr(instance, '_old_statut', None) not in STATUTS_PLACES_OCCUPEES and
+            instance.statut in STATUTS_PLACES_OCCUPEES and
+            instance.event.notifications_activees and
+            instance.event.rappels_automatiques):
+            
+            planifier_rappels(
+                Event.objects.filter(pk=instance.event_id),
+                participante=instance.participante
+            )
+        
         # Si le statut change vers 'confirmee', traiter la liste d'attente
         if hasattr(instance, '_old_statut'):
             if (instance._old_statut != 'confirmee' and 
                 instance.statut == 'confirmee' and
                 instance.event.liste_attente_activee):
                 
-                traiter_liste_attente.apply_async(
+                planifier_tache(
+                    traiter_liste_attente,
                     args=[instance.event.id],
                     countdown=60
                 )
@@ -138,7 +151,8 @@ def inscription_post_delete(sender, instance, **kwargs):
     if (instance.statut in ['confirmee', 'presente'] and 
         instance.event.liste_attente_activee):
         
-        traiter_liste_attente.apply_async(
+        planifier_tache(
+            traiter_liste_attente,
             args=[instance.event.id],
             countdown=60
         )
@@ -157,7 +171,8 @@ def rappel_post_save(sender, instance, created, **kwargs):
             temps_avant_envoi = instance.date_programmee - timezone.now()
             if temps_avant_envoi.total_seconds() < 3600:  # Moins d'1 heure
                 from .tasks import envoyer_rappel_event
-                envoyer_rappel_event.apply_async(
+                planifier_tache(
+                    envoyer_rappel_event,
                     args=[instance.id],
                     eta=instance.date_programmee
                 )
@@ -166,22 +181,49 @@ def rappel_post_save(sender, instance, created, **kwargs):
 # Signaux pour la gestion des quotas et limitations
 @receiver(pre_save, sender=InscriptionEvent)
 def verifier_capacite_event(sender, instance, **kwargs):
-    """Vérifie la capacité avant d'inscrire"""
-    
-    # Seulement pour les nouvelles inscriptions avec statut confirmé
-    if not instance.pk and instance.statut == 'confirmee':
-        inscriptions_confirmees = InscriptionEvent.objects.filter(
-            event=instance.event,
-            statut__in=['confirmee', 'presente']
-        ).count()
-        
-        if inscriptions_confirmees >= instance.event.max_participants:
-            # Si liste d'attente activée, basculer en attente
-            if instance.event.liste_attente_activee:
-                instance.statut = 'en_attente'
-            else:
-                from django.core.exceptions import ValidationError
-                raise ValidationError("Événement complet")
+    """Réserve la place avant d'enregistrer une inscription qui en occupe une"""
+    
+    # Place déjà réservée par events.capacite dans la transaction courante
+    if getattr(instance, '_place_reservee', False):
+        return
+    
+    if instance.statut not in STATUTS_PLACES_OCCUPEES:
+        return
+    
+    # Une inscription qui occupait déjà une place n'en réserve pas d'autre
+    if getattr(instance, '_old_statut', None) in STATUTS_PLACES_OCCUPEES:
+        return
+    
+    if reserver_place(instance.event_id):
+        instance._place_reservee = True
+    elif not instance.pk and instance.event.liste_attente_activee:
+        # Si liste d'attente activée, basculer en attente
+        instance.statut = 'en_attente'
+    else:
+        from django.core.exceptions import ValidationError
+        raise ValidationError("Événement complet")
+
+
+@receiver(post_save, sender=InscriptionEvent)
+def synchroniser_places_occupees(sender, instance, created, **kwargs):
+    """Libère la place quand une inscription quitte un statut qui en occupe une"""
+    
+    instance._place_reservee = False
+    
+    if (not created and
+        getattr(instance, '_old_statut', None) in STATUTS_PLACES_OCCUPEES and
+        instance.statut not in STATUTS_PLACES_OCCUPEES):
+        liberer_place(instance.event_id)
+    
+    instance._old_statut = instance.statut
+
+
+@receiver(post_delete, sender=InscriptionEvent)
+def liberer_place_inscription_supprimee(sender, instance, **kwargs):
+    """Libère la place d'une inscription supprimée"""
+    
+    if instance.statut in STATUTS_PLACES_OCCUPEES:
+        liberer_place(instance.event_id)
 
 
 # Signaux pour les statistiques et logs
@@ -239,6 +281,66 @@ def valider_coherence_event(sender, instance, **kwargs):
         instance.slug = slug
 
 
+# Signaux pour l'index de recherche plein texte
+@receiver(post_save, sender=Event)
+def indexer_event_recherche(sender, instance, **kwargs):
+    """Met à jour l'index de recherche de l'événement enregistré"""
+    
+    indexer_events([instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+def desindexer_event_recherche(sender, instance, **kwargs):
+    """Retire l'événement supprimé de l'index de recherche"""
+    
+    indexer_events([instance.pk])
+
+
+# Signaux pour le calendrier mensuel en cache
+@receiver(post_save, sender=Event)
+def invalider_calendrier_event(sender, instance, **kwargs):
+    """Invalide le mois de l'événement (et son ancien mois s'il a été déplacé)"""
+    
+    invalider_mois(instance.date_debut, getattr(instance, '_old_date_debut', None))
+
+
+@receiver(post_delete, sender=Event)
+def invalider_calendrier_event_supprime(sender, instance, **kwargs):
+    """Retire l'événement supprimé du calendrier"""
+    
+    invalider_mois(instance.date_debut)
+
+
+@receiver(post_save, sender=InscriptionEvent)
+@receiver(post_delete, sender=InscriptionEvent)
+def invalider_calendrier_inscription(sender, instance, **kwargs):
+    """Le nombre de participantes affiché dans le mois de l'événement change"""
+    
+    invalider_mois(instance.event.date_debut)
+
+
+# Signaux pour les flux iCalendar des participantes
+@receiver(post_save, sender=InscriptionEvent)
+@receiver(post_delete, sender=InscriptionEvent)
+def invalider_flux_ics_inscription(sender, instance, **kwargs):
+    """Le flux de la participante change avec chacune de ses inscriptions"""
+    
+    marquer_modification(ressource_inscriptions(instance.participante_id))
+
+
+@receiver(post_save, sender=Event)
+def invalider_flux_ics_event(sender, instance, created, **kwargs):
+    """Un événement modifié change le flux de toutes ses inscrites"""
+    
+    if created:
+        return
+    
+    participantes = InscriptionEvent.objects.filter(event=instance).values_list('participante_id', flat=True)
+    ressources = [ressource_inscriptions(participante_id) for participante_id in participantes]
+    if ressources:
+        marquer_modification(*ressources)
+
+
 # Signal pour nettoyer les données orphelines
 @receiver(post_delete, sender=Event)
 def nettoyer_donnees_event(sender, instance, **kwargs):
@@ -262,7 +364,8 @@ def synchroniser_calendrier_externe(sender, instance, created, **kwargs):
     
     if hasattr(instance, 'sync_externe') and instance.sync_externe:
         from .tasks import synchroniser_calendriers_externes
-        synchroniser_calendriers_externes.apply_async(
+        planifier_tache(
+            synchroniser_calendriers_externes,
             args=[instance.id],
             countdown=60
         )
\ No newline at end of file
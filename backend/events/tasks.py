@@ -7,153 +7,59 @@ Gestion des notifications, rappels et tâches de maintenance
 """
 from celery import shared_task
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from django.conf import settings
 from datetime import datetime, timedelta
 import logging
 
 from .models import Event, InscriptionEvent, RappelEvent
-from .utils import envoyer_confirmation_inscription, generer_fichier_ics
+from .utils import email_confirmation_inscription
+from .capacite import promouvoir_liste_attente, recalculer_places_occupees
+from .rappels import planifier_rappels, envoyer_rappels_dus
+from api.emails import envoyer_email, envoyer_emails
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
-def envoyer_rappel_event(self, rappel_id):
+@shared_task
+def envoyer_rappel_event(rappel_id):
     """
-    Envoie un rappel d'événement par email
+    Envoie un rappel d'événement par email (s'il est dû et pas déjà
+    réservé par le répartiteur)
     """
-    try:
-        rappel = RappelEvent.objects.get(pk=rappel_id)
-        
-        # Vérifier si le rappel peut être envoyé
-        if not rappel.peut_etre_envoye():
-            logger.warning(f"Rappel {rappel_id} ne peut pas être envoyé")
-            return False
-        
-        # Préparer le contexte pour l'email
-        context = {
-            'rappel': rappel,
-            'event': rappel.event,
-            'participante': rappel.destinataire,
-            'heures_avant': rappel.heures_avant,
-            'ics_content': generer_fichier_ics(rappel.event)
-        }
-        
-        # Choisir le template selon le type de rappel
-        if rappel.type_rappel == 'confirmation':
-            subject_template = 'events/emails/confirmation_subject.txt'
-            message_template = 'events/emails/confirmation_message.html'
-        else:
-            subject_template = 'events/emails/rappel_subject.txt'
-            message_template = 'events/emails/rappel_message.html'
-        
-        # Générer le contenu de l'email
-        subject = render_to_string(subject_template, context).strip()
-        message = render_to_string(message_template, context)
-        
-        # Utiliser un message personnalisé si défini
-        if rappel.message_personnalise:
-            message = rappel.message_personnalise.format(**context)
-        
-        # Envoyer l'email
-        send_mail(
-            subject=subject,
-            message='',  # Version texte vide
-            html_message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[rappel.destinataire.email],
-            fail_silently=False
-        )
-        
-        # Marquer le rappel comme envoyé
-        rappel.statut = 'envoye'
-        rappel.date_envoi = timezone.now()
-        rappel.save()
-        
-        logger.info(f"Rappel {rappel_id} envoyé avec succès")
-        return True
-        
-    except RappelEvent.DoesNotExist:
-        logger.error(f"Rappel {rappel_id} introuvable")
+    metriques = envoyer_rappels_dus(rappel_ids=[rappel_id])
+    
+    if not metriques['envoyes']:
+        logger.warning(f"Rappel {rappel_id} non envoyé: {metriques}")
         return False
-    except Exception as exc:
-        logger.error(f"Erreur lors de l'envoi du rappel {rappel_id}: {str(exc)}")
-        # Réessayer avec délai exponentiel
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+    
+    logger.info(f"Rappel {rappel_id} envoyé avec succès")
+    return True
 
 
 @shared_task
 def traiter_rappels_automatiques():
     """
-    Traite tous les rappels automatiques programmés
+    Envoie tous les rappels programmés arrivés à échéance
+    (réservation par lots, un rendu par événement, une connexion SMTP)
     """
-    # Récupérer les rappels à envoyer
-    rappels_a_envoyer = RappelEvent.objects.filter(
-        statut='programme',
-        date_programmee__lte=timezone.now()
-    ).select_related('event', 'destinataire')
+    metriques = envoyer_rappels_dus()
     
-    count_envoyes = 0
-    count_erreurs = 0
-    
-    for rappel in rappels_a_envoyer:
-        try:
-            # Lancer la tâche d'envoi
-            envoyer_rappel_event.delay(rappel.id)
-            count_envoyes += 1
-        except Exception as e:
-            logger.error(f"Erreur lors du lancement du rappel {rappel.id}: {str(e)}")
-            count_erreurs += 1
-    
-    logger.info(f"Rappels traités: {count_envoyes} envoyés, {count_erreurs} erreurs")
-    return {'envoyes': count_envoyes, 'erreurs': count_erreurs}
+    logger.info(
+        f"Rappels traités: {metriques['envoyes']} envoyés, {metriques['echecs']} erreurs, "
+        f"{metriques['annules']} annulés en {metriques['duree_secondes']}s "
+        f"({metriques['rappels_par_seconde']} rappels/s)"
+    )
+    return metriques
 
 
 @shared_task
-def creer_rappels_automatiques():
+def creer_rappels_automatiques(event_id=None):
     """
     Crée automatiquement les rappels pour les événements configurés
+    (limité à un événement si event_id est fourni)
     """
-    # Événements avec rappels automatiques activés
-    events_avec_rappels = Event.objects.filter(
-        notifications_activees=True,
-        rappels_automatiques__isnull=False,
-        date_debut__gt=timezone.now()
-    ).exclude(rappels_automatiques=[])
-    
-    count_crees = 0
-    
-    for event in events_avec_rappels:
-        # Récupérer les inscriptions confirmées
-        inscriptions = InscriptionEvent.objects.filter(
-            event=event,
-            statut__in=['confirmee', 'presente']
-        ).select_related('participante')
-        
-        for inscription in inscriptions:
-            for heures_avant in event.rappels_automatiques:
-                # Calculer la date de programmation
-                date_programmee = event.date_debut - timedelta(hours=heures_avant)
-                
-                # Ne créer que si la date est dans le futur
-                if date_programmee > timezone.now():
-                    # Vérifier si le rappel n'existe pas déjà
-                    if not RappelEvent.objects.filter(
-                        event=event,
-                        destinataire=inscription.participante,
-                        heures_avant=heures_avant
-                    ).exists():
-                        RappelEvent.objects.create(
-                            event=event,
-                            destinataire=inscription.participante,
-                            type_rappel='rappel',
-                            heures_avant=heures_avant,
-                            date_programmee=date_programmee,
-                            statut='programme'
-                        )
-                        count_crees += 1
+    events = Event.objects.filter(pk=event_id) if event_id else None
+    count_crees = planifier_rappels(events)
     
     logger.info(f"Rappels automatiques créés: {count_crees}")
     return count_crees
@@ -259,14 +165,7 @@ def envoyer_notifications_nouvelles_inscriptions(event_id):
         message = render_to_string('events/emails/notification_organisateur.html', context)
         
         # Envoyer à l'organisateur
-        send_mail(
-            subject=subject,
-            message='',
-            html_message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[event.cree_par.email],
-            fail_silently=False
-        )
+        envoyer_email(subject, '', [event.cree_par.email], html=message)
         
         logger.info(f"Notification organisateur envoyée pour l'événement {event_id}")
         return True
@@ -290,31 +189,16 @@ def traiter_liste_attente(event_id):
         if not event.liste_attente_activee:
             return False
         
-        # Vérifier s'il y a des places disponibles
-        places_occupees = event.inscriptions.filter(
-            statut__in=['confirmee', 'presente']
-        ).count()
-        
-        places_disponibles = event.max_participants - places_occupees
-        
-        if places_disponibles <= 0:
-            return False
-        
-        # Récupérer les inscriptions en attente (FIFO)
-        inscriptions_attente = InscriptionEvent.objects.filter(
-            event=event,
-            statut='en_attente'
-        ).order_by('date_inscription')[:places_disponibles]
-        
-        count_confirmees = 0
+        # Promotion FIFO avec réservation atomique de chaque place
+        inscriptions_promues = promouvoir_liste_attente(event)
         
-        for inscription in inscriptions_attente:
-            inscription.statut = 'confirmee'
-            inscription.save()
-            
-            # Envoyer une notification de confirmation
-            envoyer_confirmation_inscription(inscription)
-            count_confirmees += 1
+        # Notifier les personnes confirmées sur une seule connexion
+        metriques = envoyer_emails(
+            email_confirmation_inscription(inscription) for inscription in inscriptions_promues
+        )
+        count_confirmees = len(inscriptions_promues)
+        if metriques['echecs'] or metriques['reportes']:
+            logger.warning(f"Confirmations liste d'attente non envoyées pour {event_id}: {metriques}")
         
         logger.info(f"Liste d'attente traitée pour {event_id}: {count_confirmees} confirmées")
         return count_confirmees
@@ -327,6 +211,42 @@ def traiter_liste_attente(event_id):
         return False
 
 
+@shared_task
+def envoyer_confirmations_inscription(inscription_ids):
+    """
+    Envoie les emails de confirmation des inscriptions (confirmées) sur une
+    seule connexion, hors de la requête d'inscription : les réessais SMTP
+    n'y bloquent pas la réponse
+    """
+    inscriptions = InscriptionEvent.objects.filter(
+        pk__in=inscription_ids,
+        statut='confirmee'
+    ).select_related('event', 'participante')
+    
+    metriques = envoyer_emails(
+        email_confirmation_inscription(inscription) for inscription in inscriptions
+    )
+    if metriques['echecs'] or metriques['reportes']:
+        logger.warning(f"Confirmations d'inscription non envoyées ({inscription_ids}): {metriques}")
+    return metriques
+
+
+@shared_task
+def resynchroniser_places_occupees():
+    """
+    Réaligne le compteur de places des événements sur les inscriptions
+    (filet de sécurité pour les modifications hors ORM)
+    """
+    try:
+        corriges = recalculer_places_occupees()
+        if corriges:
+            logger.warning(f"Compteur de places corrigé pour {corriges} événement(s)")
+        return corriges
+    except Exception as e:
+        logger.error(f"Erreur resynchronisation des places: {str(e)}")
+        return 0
+
+
 @shared_task
 def generer_rapport_mensuel_events():
     """
@@ -0,0 +1,393 @@
+# ============================================================================
+# backend/events/tests.py
+# ============================================================================
+"""
+Tests du module événements
+"""
+import csv
+import json
+import threading
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import IntegrityError, connection, connections
+from django.http import StreamingHttpResponse
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .capacite import EvenementComplet, inscrire_participante
+from .exports import TAILLE_PAQUET
+from .models import Event, InscriptionEvent, RappelEvent
+from .rappels import envoyer_rappels_dus, planifier_rappels
+from .tasks import envoyer_confirmations_inscription
+
+User = get_user_model()
+
+
+def creer_participante(numero, **champs):
+    return User.objects.create(
+        username=f'participante_{numero}',
+        email=f'participante_{numero}@test.invalid',
+        nip=f'TEST{numero:07d}',
+        first_name='Participante',
+        last_name=str(numero),
+        region='estuaire',
+        **champs
+    )
+
+
+def creer_event(organisatrice, **champs):
+    debut = timezone.now() + timedelta(days=7)
+    valeurs = {
+        'titre': 'Atelier leadership',
+        'description': 'Atelier de test',
+        'date_debut': debut,
+        'date_fin': debut + timedelta(hours=2),
+        'lieu': 'Libreville',
+        'max_participants': 30,
+        'formateur_nom': 'Formatrice',
+        'cree_par': organisatrice,
+        'statut': 'ouvert',
+        'est_publie': True,
+        # Pas de tâches Celery planifiées par les signaux
+        'notifications_activees': False,
+        'rappels_automatiques': [],
+    }
+    valeurs.update(champs)
+    return Event.objects.create(**valeurs)
+
+
+class CapaciteTests(TestCase):
+    """Compteur de places (events.capacite et signaux d'InscriptionEvent)"""
+    
+    def setUp(self):
+        self.organisatrice = creer_participante(0)
+        self.event = creer_event(self.organisatrice, max_participants=3, liste_attente_activee=False)
+        self.participantes = [creer_participante(numero) for numero in range(1, 5)]
+    
+    def places_occupees(self):
+        self.event.refresh_from_db(fields=['places_occupees'])
+        return self.event.places_occupees
+    
+    def test_inscription_en_double_ne_consomme_pas_de_place(self):
+        InscriptionEvent.objects.create(event=self.event, participante=self.participantes[0], statut='confirmee')
+        
+        with self.assertRaises(IntegrityError):
+            InscriptionEvent.objects.create(event=self.event, participante=self.participantes[0], statut='confirmee')
+        
+        self.assertEqual(self.places_occupees(), 1)
+    
+    def test_evenement_complet(self):
+        for participante in self.participantes[:3]:
+            inscrire_participante(self.event, participante)
+        
+        with self.assertRaises(EvenementComplet):
+            inscrire_participante(self.event, self.participantes[3])
+        self.assertEqual(self.places_occupees(), 3)
+    
+    def test_suppression_libere_la_place(self):
+        inscription = inscrire_participante(self.event, self.participantes[0])
+        inscription.delete()
+        
+        self.assertEqual(self.places_occupees(), 0)
+
+
+class RappelsTests(TestCase):
+    """Planification des rappels automatiques (events.rappels)"""
+    
+    def setUp(self):
+        organisatrice = creer_participante(0)
+        self.participante = creer_participante(1)
+        self.event = creer_event(organisatrice, notifications_activees=True, rappels_automatiques=[24, 2])
+        InscriptionEvent.objects.create(event=self.event, participante=self.participante, statut='confirmee')
+    
+    def dates_programmees(self):
+        return dict(
+            RappelEvent.objects.filter(event=self.event, statut='programme').values_list('heures_avant', 'date_programmee')
+        )
+    
+    def test_rappels_crees_a_l_inscription(self):
+        self.assertEqual(self.dates_programmees(), {
+            24: self.event.date_debut - timedelta(hours=24),
+            2: self.event.date_debut - timedelta(hours=2),
+        })
+    
+    def test_evenement_deplace(self):
+        self.event.date_debut += timedelta(days=3)
+        self.event.date_fin += timedelta(days=3)
+        self.event.save()
+        
+        self.assertEqual(self.dates_programmees(), {
+            24: self.event.date_debut - timedelta(hours=24),
+            2: self.event.date_debut - timedelta(hours=2),
+        })
+    
+    def test_evenement_avance_supprime_les_rappels_passes(self):
+        self.event.date_debut = timezone.now() + timedelta(hours=12)
+        self.event.date_fin = self.event.date_debut + timedelta(hours=2)
+        self.event.date_limite_inscription = timezone.now()
+        self.event.save()
+        
+        self.assertEqual(self.dates_programmees(), {2: self.event.date_debut - timedelta(hours=2)})
+    
+    def test_rappel_d_un_autre_type_ne_remplace_pas_l_email(self):
+        RappelEvent.objects.filter(event=self.event).delete()
+        RappelEvent.objects.create(
+            event=self.event,
+            destinataire=self.participante,
+            type_rappel='sms',
+            heures_avant=24,
+            date_programmee=self.event.date_debut - timedelta(hours=24)
+        )
+        
+        self.assertEqual(planifier_rappels(Event.objects.filter(pk=self.event.pk)), 2)
+        self.assertEqual(
+            RappelEvent.objects.filter(event=self.event, type_rappel='email').count(),
+            2
+        )
+
+    
+    def test_envoi_selon_le_type(self):
+        RappelEvent.objects.filter(event=self.event).delete()
+        for type_rappel in ['email', 'confirmation', 'sms']:
+            RappelEvent.objects.create(
+                event=self.event,
+                destinataire=self.participante,
+                type_rappel=type_rappel,
+                heures_avant=1,
+                date_programmee=timezone.now() - timedelta(minutes=1)
+            )
+        
+        metriques = envoyer_rappels_dus()
+        
+        self.assertEqual(metriques['envoyes'], 2)
+        self.assertEqual(
+            sorted(message.subject for message in mail.outbox),
+            ["Confirmation d'inscription - Atelier leadership", 'Rappel - Atelier leadership dans 1h']
+        )
+        # Pas de canal SMS : le rappel reste programmé
+        self.assertEqual(RappelEvent.objects.get(event=self.event, type_rappel='sms').statut, 'programme')
+
+
+class ConfirmationInscriptionTests(TestCase):
+    """Email de confirmation envoyé hors de la requête d'inscription"""
+    
+    def setUp(self):
+        organisatrice = creer_participante(0)
+        self.participante = creer_participante(1, statut_validation='validee')
+        self.event = creer_event(organisatrice, notifications_activees=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.participante)
+    
+    def test_inscription_planifie_la_confirmation(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            reponse = self.client.post(f'/api/events/events/{self.event.pk}/inscrire/')
+        
+        self.assertEqual(reponse.status_code, 201, reponse.content)
+        # Aucun envoi SMTP pendant la requête : la tâche est publiée à la validation
+        self.assertEqual(mail.outbox, [])
+        self.assertTrue(callbacks)
+        
+        inscription = InscriptionEvent.objects.get(event=self.event, participante=self.participante)
+        metriques = envoyer_confirmations_inscription([inscription.pk])
+        self.assertEqual(metriques['envoyes'], 1)
+        self.assertEqual(mail.outbox[0].to, [self.participante.email])
+
+
+class ListeEventsTests(TestCase):
+    """Nombre de requêtes de la liste des événements (annotations, pas de N+1)"""
+    
+    def setUp(self):
+        organisatrice = creer_participante(0)
+        participantes = [creer_participante(numero) for numero in range(1, 4)]
+        for numero in range(10):
+            event = creer_event(organisatrice, titre=f'Atelier {numero}')
+            for participante in participantes:
+                InscriptionEvent.objects.create(event=event, participante=participante, statut='confirmee')
+        
+        self.client = APIClient()
+        self.client.force_authenticate(participantes[0])
+        # Première requête : écriture de last_activity (suivi de présence)
+        self.client.get('/api/events/events/')
+    
+    def test_nombre_de_requetes(self):
+        # COUNT de la pagination puis une seule requête annotée (places, inscription)
+        with self.assertNumQueries(2):
+            reponse = self.client.get('/api/events/events/')
+        
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.data['count'], 10)
+        self.assertTrue(all(event['est_inscrit'] for event in reponse.data['results']))
+
+
+class ExportEventsTests(TestCase):
+    """Exports streamés : rien n'est lu ni encodé avant la consommation du corps"""
+    
+    # Plus d'un paquet de lecture (iterator(chunk_size=TAILLE_PAQUET))
+    NOMBRE_EVENTS = TAILLE_PAQUET + 500
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = creer_participante(0, is_staff=True)
+        participante = creer_participante(1)
+        debut = timezone.now() + timedelta(days=7)
+        Event.objects.bulk_create([
+            Event(
+                titre=f'Atelier {numero}',
+                slug=f'atelier-{numero}',
+                description='Atelier de test',
+                date_debut=debut,
+                date_fin=debut + timedelta(hours=2),
+                lieu='Libreville',
+                max_participants=30,
+                formateur_nom='Formatrice',
+                cree_par=cls.admin,
+                statut='ouvert',
+                est_publie=True,
+                rappels_automatiques=[]
+            )
+            for numero in range(cls.NOMBRE_EVENTS)
+        ], batch_size=1000)
+        InscriptionEvent.objects.bulk_create([
+            InscriptionEvent(event=event, participante=participante, statut='confirmee')
+            for event in Event.objects.all()
+        ], batch_size=1000)
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+    
+    def exporter(self, format_export):
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = self.client.get('/api/events/export/', {'format': format_export})
+        
+        self.assertEqual(reponse.status_code, 200)
+        self.assertIsInstance(reponse, StreamingHttpResponse)
+        # Corps non matérialisé : pas de .content, événements pas encore lus
+        with self.assertRaises(AttributeError):
+            reponse.content
+        self.assertFalse([
+            requete for requete in requetes.captured_queries
+            if 'FROM "events_event"' in requete['sql']
+        ])
+        return reponse
+    
+    def test_export_csv(self):
+        reponse = self.exporter('csv')
+        morceaux = [morceau.decode() for morceau in reponse.streaming_content]
+        
+        # Un morceau par ligne : l'export est produit au fil de l'eau
+        self.assertEqual(len(morceaux), self.NOMBRE_EVENTS + 1)
+        lignes = list(csv.reader(''.join(morceaux).splitlines()))
+        self.assertEqual(len(lignes), self.NOMBRE_EVENTS + 1)
+        self.assertEqual({ligne[8] for ligne in lignes[1:]}, {'1'})
+    
+    def test_export_json(self):
+        reponse = self.exporter('json')
+        morceaux = list(reponse.streaming_content)
+        
+        self.assertGreater(len(morceaux), self.NOMBRE_EVENTS)
+        events = json.loads(b''.join(morceaux))['events']
+        self.assertEqual(len(events), self.NOMBRE_EVENTS)
+        self.assertTrue(all(len(event['inscriptions']) == 1 for event in events))
+
+
+class AnalyticsEventTests(TestCase):
+    """Nombre de requêtes des analytiques d'un événement (agrégats SQL)"""
+    
+    def setUp(self):
+        self.organisatrice = creer_participante(0)
+        self.event = creer_event(self.organisatrice)
+        creer_event(self.organisatrice, titre='Atelier similaire')
+        self.ajouter_inscriptions(1, 6)
+        
+        self.client = APIClient()
+        self.client.force_authenticate(self.organisatrice)
+        self.url = f'/api/events/analytics/{self.event.pk}/'
+        # Première requête : écriture de last_activity (suivi de présence)
+        self.client.get(self.url)
+    
+    def ajouter_inscriptions(self, debut, fin):
+        for numero in range(debut, fin):
+            InscriptionEvent.objects.create(
+                event=self.event,
+                participante=creer_participante(numero),
+                statut='presente' if numero % 2 else 'confirmee',
+                evaluation_event=numero % 5 + 1
+            )
+    
+    def test_nombre_de_requetes_independant_des_inscriptions(self):
+        # Événement, compteurs, satisfaction, répartition par jour et par
+        # heure, comparaison avec la catégorie
+        with self.assertNumQueries(6):
+            reponse = self.client.get(self.url)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.data['inscriptions']['total'], 5)
+        
+        self.ajouter_inscriptions(6, 26)
+        with self.assertNumQueries(6):
+            reponse = self.client.get(self.url)
+        
+        self.assertEqual(reponse.data['inscriptions']['total'], 25)
+        self.assertEqual(reponse.data['inscriptions']['presentes'], 13)
+        self.assertEqual(reponse.data['taux_presence'], 52.0)
+        self.assertEqual(sum(reponse.data['satisfaction'].values()), 25)
+        self.assertEqual(reponse.data['repartition_temporelle'][timezone.localdate().strftime('%Y-%m-%d')], 25)
+        self.assertEqual(reponse.data['comparaison']['moyenne_categorie'], 0)
+
+
+class InscriptionsConcurrentesTests(TransactionTestCase):
+    """Inscriptions simultanées sur un événement presque complet"""
+    
+    PLACES = 5
+    CANDIDATES = 20
+    
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Base SQLite en mémoire : une seule connexion (TEST NAME vers un fichier)")
+        organisatrice = creer_participante(0)
+        self.event = creer_event(organisatrice, max_participants=self.PLACES, liste_attente_activee=False)
+        self.participantes = [creer_participante(numero) for numero in range(1, self.CANDIDATES + 1)]
+    
+    def test_pas_de_surreservation(self):
+        depart = threading.Barrier(self.CANDIDATES)
+        resultats = []
+        
+        def inscrire(participante):
+            try:
+                depart.wait()
+                # SQLite n'accepte qu'une écriture à la fois : la réservation
+                # refusée (base verrouillée) est rejouée
+                for essai in range(50):
+                    try:
+                        inscrire_participante(self.event, participante)
+                        resultats.append('inscrite')
+                        return
+                    except EvenementComplet:
+                        resultats.append('complet')
+                        return
+                    except Exception as e:
+                        if connection.vendor != 'sqlite' or 'locked' not in str(e):
+                            resultats.append(e)
+                            return
+                resultats.append('abandon')
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=inscrire, args=[participante]) for participante in self.participantes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(resultats.count('inscrite'), self.PLACES, resultats)
+        self.assertEqual(resultats.count('complet'), self.CANDIDATES - self.PLACES, resultats)
+        self.event.refresh_from_db(fields=['places_occupees'])
+        self.assertEqual(self.event.places_occupees, self.PLACES)
+        self.assertEqual(
+            InscriptionEvent.objects.filter(event=self.event, statut='confirmee').count(),
+            self.PLACES
+        )
@@ -25,8 +25,11 @@ urlpatterns = [
     path('recommendations/', views.EventRecommendationView.as_view(), name='recommendations'),
     path('analytics/<uuid:event_id>/', views.EventAnalyticsView.as_view(), name='analytics'),
     path('metrics/<uuid:event_id>/', views.EventMetricsView.as_view(), name='metrics'),
+    path('export/', views.EventExportView.as_view(), name='export'),
+    path('export/<uuid:event_id>/', views.EventExportView.as_view(), name='export-event'),
     path('export/<uuid:event_id>/participants/', views.EventExportParticipantsView.as_view(), name='export-participants'),
     path('clone/<uuid:event_id>/', views.EventCloneView.as_view(), name='clone'),
     path('templates/', views.EventTemplatesView.as_view(), name='templates'),
     path('calendar/', views.EventCalendrierView.as_view(), name='calendar'),
+    path('flux/<str:jeton>.ics', views.EventFluxIcsView.as_view(), name='flux-ics'),
 ]
\ No newline at end of file
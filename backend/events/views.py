@@ -9,9 +9,13 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
+from django.db import IntegrityError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.db.models import Count, Avg, Q, F
+from django.db.models.functions import TruncDate, TruncHour
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
@@ -28,25 +32,49 @@ from .serializers import (
     EventStatsSerializer
 )
 from .permissions import EventPermissions, InscriptionPermissions
-from .utils import generer_fichier_ics, envoyer_confirmation_inscription
+from .filters import RechercheEventFilter
+from .recherche import rechercher_events
+from .ics import flux_participante, jeton_flux, participante_du_jeton, validateurs_flux
+from .calendrier import (
+    FenetreInvalide, evenements_calendrier, fenetre, mois_couverts, ressource_mois
+)
+from .utils import generer_fichier_ics
+from .tasks import envoyer_confirmations_inscription
+from .capacite import EvenementComplet, inscrire_participante, desinscrire_participante
+from .exports import (
+    TAILLE_PAQUET, reponse_csv, reponse_json, reponse_xlsx, events_avec_inscriptions
+)
+from api.conditionnel import (
+    RetrieveConditionnelMixin, appliquer_validateurs, reponse_non_modifiee, validateurs
+)
+from api.pagination import PaginationListes
+from api.planification import planifier_tache
+from api.statistiques import derniers_mois, totaux, totaux_par_mois
+from api.tableau_de_bord import tableau_events, tableau_participante
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(RetrieveConditionnelMixin, viewsets.ModelViewSet):
     """ViewSet principal pour la gestion des événements"""
     
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, EventPermissions]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, RechercheEventFilter]
     filterset_fields = ['categorie', 'statut', 'est_en_ligne', 'est_featured']
     search_fields = ['titre', 'description', 'formateur_nom', 'lieu']
     ordering_fields = ['date_debut', 'date_creation', 'titre']
     ordering = ['-date_debut']
+    pagination_class = PaginationListes
+    # Clé de la pagination par curseur (?pagination=curseur)
+    champs_curseur = ('-date_debut', '-id')
     
     def get_queryset(self):
         """Optimise les requêtes selon le contexte"""
-        queryset = Event.objects.select_related('cree_par').prefetch_related(
-            'inscriptions', 'rappels'
-        )
+        queryset = Event.objects.select_related('cree_par')
+        
+        # En lecture, les compteurs sont calculés en une passe SQL au lieu
+        # d'une série de requêtes par événement dans le serializer
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.avec_statistiques(self.request.user)
         
         # Filtrer selon les permissions
         if not self.request.user.is_staff:
@@ -72,6 +100,20 @@ class EventViewSet(viewsets.ModelViewSet):
             return EventDetailSerializer
         return EventSerializer
     
+    def ressources_conditionnelles(self, event):
+        """Les inscriptions de l'événement entrent dans ses validateurs HTTP"""
+        return [f'event_{event.pk}']
+    
+    def contenu_publie(self, event):
+        return event.est_publie and event.statut != 'brouillon'
+    
+    def echeances_conditionnelles(self, event):
+        """Début, fin, date limite d'inscription et rappels programmés (prochains_rappels)"""
+        echeances = [event.date_debut, event.date_fin, event.date_limite_inscription]
+        if event.notifications_activees:
+            echeances += event.rappels.filter(statut='programme').values_list('date_programmee', flat=True)
+        return echeances
+    
     def perform_create(self, serializer):
         """Définit automatiquement le créateur"""
         serializer.save(cree_par=self.request.user)
@@ -101,40 +143,30 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Vérifier la capacité
-        inscriptions_confirmees = InscriptionEvent.objects.filter(
-            event=event, 
-            statut__in=['confirmee', 'presente']
-        ).count()
-        
-        if inscriptions_confirmees >= event.max_participants:
-            # Ajouter à la liste d'attente si possible
-            if event.liste_attente_activee:
-                inscription = InscriptionEvent.objects.create(
-                    event=event,
-                    participante=request.user,
-                    statut='en_attente'
-                )
-                return Response({
-                    'message': 'Ajoutée à la liste d\'attente',
-                    'inscription': InscriptionEventSerializer(inscription).data
-                })
-            else:
-                return Response(
-                    {'error': 'Événement complet'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        # Réservation atomique de la place (ou liste d'attente) ; la
+        # contrainte unique (event, participante) couvre les doubles clics
+        try:
+            inscription = inscrire_participante(event, request.user)
+        except EvenementComplet:
+            return Response(
+                {'error': 'Événement complet'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except IntegrityError:
+            return Response(
+                {'error': 'Vous êtes déjà inscrite à cet événement'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Créer l'inscription
-        inscription = InscriptionEvent.objects.create(
-            event=event,
-            participante=request.user,
-            statut='confirmee' if not event.validation_requise else 'en_attente_validation'
-        )
+        if inscription.statut == 'en_attente':
+            return Response({
+                'message': 'Ajoutée à la liste d\'attente',
+                'inscription': InscriptionEventSerializer(inscription).data
+            })
         
-        # Envoyer confirmation si configuré
+        # Envoyer confirmation si configuré (tâche Celery : pas d'attente SMTP)
         if event.notifications_activees:
-            envoyer_confirmation_inscription(inscription)
+            planifier_tache(envoyer_confirmations_inscription, args=[[inscription.pk]])
         
         return Response({
             'message': 'Inscription réussie',
@@ -152,31 +184,23 @@ class EventViewSet(viewsets.ModelViewSet):
                 participante=request.user,
                 statut__in=['confirmee', 'en_attente', 'en_attente_validation']
             )
-            inscription.delete()
-            
-            # Traiter la liste d'attente si applicable
-            if event.liste_attente_activee:
-                prochaine_inscription = InscriptionEvent.objects.filter(
-                    event=event,
-                    statut='en_attente'
-                ).order_by('date_inscription').first()
-                
-                if prochaine_inscription:
-                    prochaine_inscription.statut = 'confirmee'
-                    prochaine_inscription.save()
-                    
-                    # Notifier l'utilisateur
-                    if event.notifications_activees:
-                        # Logique de notification à implémenter
-                        pass
-            
-            return Response({'message': 'Désinscription réussie'})
-            
         except InscriptionEvent.DoesNotExist:
             return Response(
                 {'error': 'Inscription non trouvée'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        # Suppression et promotion de la liste d'attente dans la même transaction
+        promues = desinscrire_participante(inscription)
+        
+        # Notifier les personnes promues depuis la liste d'attente
+        if event.notifications_activees and promues:
+            planifier_tache(
+                envoyer_confirmations_inscription,
+                args=[[prochaine_inscription.pk for prochaine_inscription in promues]]
+            )
+        
+        return Response({'message': 'Désinscription réussie'})
     
     @action(detail=True, methods=['get'])
     def calendrier_ics(self, request, pk=None):
@@ -184,10 +208,25 @@ class EventViewSet(viewsets.ModelViewSet):
         event = self.get_object()
         ics_content = generer_fichier_ics(event)
         
-        response = Response(ics_content, content_type='text/calendar')
+        # HttpResponse : le renderer JSON de DRF encoderait le texte en chaîne JSON
+        response = HttpResponse(ics_content, content_type='text/calendar; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="{event.slug}.ics"'
         return response
     
+    @action(detail=False, methods=['get'])
+    def flux_ics(self, request):
+        """URL d'abonnement au flux iCalendar des inscriptions de l'utilisatrice"""
+        url = request.build_absolute_uri(
+            reverse('events:flux-ics', kwargs={'jeton': jeton_flux(request.user)})
+        )
+        return Response({
+            'url': url,
+            'par_categorie': {
+                categorie: f'{url}?categorie={categorie}'
+                for categorie, libelle in Event.CATEGORIES
+            }
+        })
+    
     @action(detail=True, methods=['get'])
     def participants(self, request, pk=None):
         """Liste des participants (réservé aux organisateurs)"""
@@ -260,6 +299,8 @@ class InscriptionEventViewSet(viewsets.ModelViewSet):
     
     serializer_class = InscriptionEventSerializer
     permission_classes = [IsAuthenticated, InscriptionPermissions]
+    pagination_class = PaginationListes
+    champs_curseur = ('-date_inscription', '-id')
     
     def get_queryset(self):
         """Filtre les inscriptions selon l'utilisateur"""
@@ -404,51 +445,62 @@ class EventCalendrierView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Retourne les événements formatés pour un calendrier"""
-        # Paramètres de date
-        date_debut = request.query_params.get('start')
-        date_fin = request.query_params.get('end')
-        
-        queryset = Event.objects.filter(est_publie=True)
+        """Retourne les événements formatés pour un calendrier (mois en cache)"""
+        try:
+            debut, fin = fenetre(request.query_params.get('start'), request.query_params.get('end'))
+        except FenetreInvalide as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Réponse conditionnelle : versions des seuls mois de la fenêtre
+        etag, derniere_modification = validateurs(
+            request,
+            ressources=[ressource_mois(annee, mois) for annee, mois in mois_couverts(debut, fin)]
+        )
+        non_modifiee = reponse_non_modifiee(request, etag, derniere_modification)
+        if non_modifiee is not None:
+            return non_modifiee
         
-        if date_debut:
-            queryset = queryset.filter(date_debut__gte=date_debut)
-        if date_fin:
-            queryset = queryset.filter(date_fin__lte=date_fin)
+        return appliquer_validateurs(
+            Response(evenements_calendrier(debut, fin)), etag, derniere_modification
+        )
+
+
+class EventFluxIcsView(APIView):
+    """Flux iCalendar d'une participante, authentifié par le jeton de l'URL"""
+    
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def perform_content_negotiation(self, request, force=False):
+        """Les agendas demandent text/calendar, qu'aucun renderer DRF ne produit"""
+        return super().perform_content_negotiation(request, force=True)
+    
+    def get(self, request, jeton):
+        participante = participante_du_jeton(jeton)
+        if participante is None:
+            return Response({'error': 'Flux introuvable'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Format spécial pour calendrier
-        events_calendrier = []
-        for event in queryset:
-            events_calendrier.append({
-                'id': str(event.id),
-                'title': event.titre,
-                'start': event.date_debut.isoformat(),
-                'end': event.date_fin.isoformat(),
-                'backgroundColor': self._get_color_by_category(event.categorie),
-                'borderColor': self._get_color_by_category(event.categorie),
-                'url': f'/events/{event.slug}/',
-                'extendedProps': {
-                    'categorie': event.categorie,
-                    'lieu': event.lieu if not event.est_en_ligne else 'En ligne',
-                    'participants': event.inscriptions.filter(statut='confirmee').count(),
-                    'max_participants': event.max_participants,
-                    'est_featured': event.est_featured
-                }
-            })
+        categorie = request.query_params.get('categorie')
+        if categorie and categorie not in dict(Event.CATEGORIES):
+            return Response({'error': 'Catégorie inconnue'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Les agendas interrogent le flux toutes les 15 minutes : 304 tant
+        # que les événements de la participante n'ont pas changé (ni ses inscriptions)
+        etag, derniere_modification = validateurs_flux(participante, categorie)
+        non_modifiee = reponse_non_modifiee(request, etag, derniere_modification)
+        
+        if non_modifiee is None:
+            reponse = StreamingHttpResponse(
+                flux_participante(participante, categorie),
+                content_type='text/calendar; charset=utf-8'
+            )
+            reponse['Content-Disposition'] = 'inline; filename="mes-evenements.ics"'
+        else:
+            reponse = non_modifiee
         
-        return Response(events_calendrier)
-    
-    def _get_color_by_category(self, categorie):
-        """Retourne une couleur selon la catégorie"""
-        colors = {
-            'formation': '#3498db',
-            'conference': '#e74c3c',
-            'atelier': '#2ecc71',
-            'networking': '#f39c12',
-            'webinaire': '#9b59b6',
-            'autre': '#95a5a6'
-        }
-        return colors.get(categorie, '#95a5a6')
+        appliquer_validateurs(reponse, etag, derniere_modification)
+        reponse['Cache-Control'] = 'private, max-age=900'
+        return reponse
 
 
 class EventExportView(APIView):
@@ -456,18 +508,18 @@ class EventExportView(APIView):
     
     permission_classes = [IsAuthenticated]
     
+    def perform_content_negotiation(self, request, force=False):
+        """Le paramètre ?format= désigne le format d'export, pas un renderer DRF"""
+        return super().perform_content_negotiation(request, force=True)
+    
     def get(self, request, event_id=None):
         """Exporte les données d'un ou plusieurs événements"""
-        from django.http import HttpResponse
-        import csv
-        import json
-        
         # Vérifier les permissions
         if event_id:
             event = get_object_or_404(Event, pk=event_id)
             if not (request.user.is_staff or event.cree_par == request.user):
                 raise PermissionDenied("Accès non autorisé")
-            events = [event]
+            events = Event.objects.filter(pk=event.pk)
         else:
             if not request.user.is_staff:
                 events = Event.objects.filter(cree_par=request.user)
@@ -487,23 +539,16 @@ class EventExportView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    def _events_annotes(self, events):
+        """Événements triés par identifiant avec le nombre d'inscrits confirmés"""
+        return events.select_related('cree_par').annotate(
+            nb_inscrits=Count('inscriptions', filter=Q(inscriptions__statut='confirmee'))
+        ).order_by('pk')
+    
     def _export_csv(self, events):
-        """Export en format CSV"""
-        from django.http import HttpResponse
-        import csv
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="events_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'ID', 'Titre', 'Catégorie', 'Date début', 'Date fin',
-            'Lieu', 'En ligne', 'Max participants', 'Inscrits',
-            'Statut', 'Publié', 'Créé par', 'Date création'
-        ])
-        
-        for event in events:
-            writer.writerow([
+        """Export en format CSV (streamé)"""
+        lignes = (
+            [
                 str(event.id),
                 event.titre,
                 event.get_categorie_display(),
@@ -512,35 +557,49 @@ class EventExportView(APIView):
                 event.lieu if not event.est_en_ligne else 'En ligne',
                 'Oui' if event.est_en_ligne else 'Non',
                 event.max_participants,
-                event.inscriptions.filter(statut='confirmee').count(),
+                event.nb_inscrits,
                 event.get_statut_display(),
                 'Oui' if event.est_publie else 'Non',
                 event.cree_par.get_full_name(),
                 event.date_creation.strftime('%Y-%m-%d %H:%M')
-            ])
+            ]
+            for event in self._events_annotes(events).iterator(chunk_size=TAILLE_PAQUET)
+        )
         
-        return response
+        return reponse_csv('events_export.csv', [
+            'ID', 'Titre', 'Catégorie', 'Date début', 'Date fin',
+            'Lieu', 'En ligne', 'Max participants', 'Inscrits',
+            'Statut', 'Publié', 'Créé par', 'Date création'
+        ], lignes)
     
     def _export_json(self, events):
-        """Export en format JSON"""
-        from django.http import JsonResponse
+        """Export en format JSON (streamé, inscriptions imbriquées)"""
+        inscriptions = InscriptionEvent.objects.filter(
+            event__in=events.values('pk')
+        ).select_related('participante').order_by('event_id', 'date_inscription')
         
-        data = []
-        for event in events:
-            data.append({
-                'id': str(event.id),
-                'titre': event.titre,
-                'categorie': event.categorie,
-                'date_debut': event.date_debut.isoformat(),
-                'date_fin': event.date_fin.isoformat(),
-                'lieu': event.lieu,
-                'est_en_ligne': event.est_en_ligne,
-                'max_participants': event.max_participants,
-                'nb_inscrits': event.inscriptions.filter(statut='confirmee').count(),
-                'statut': event.statut,
-                'est_publie': event.est_publie,
-                'cree_par': event.cree_par.get_full_name(),
-                'inscriptions': [
+        paires = events_avec_inscriptions(
+            self._events_annotes(events).iterator(chunk_size=TAILLE_PAQUET),
+            inscriptions.iterator(chunk_size=TAILLE_PAQUET)
+        )
+        
+        elements = (
+            (
+                {
+                    'id': str(event.id),
+                    'titre': event.titre,
+                    'categorie': event.categorie,
+                    'date_debut': event.date_debut.isoformat(),
+                    'date_fin': event.date_fin.isoformat(),
+                    'lieu': event.lieu,
+                    'est_en_ligne': event.est_en_ligne,
+                    'max_participants': event.max_participants,
+                    'nb_inscrits': event.nb_inscrits,
+                    'statut': event.statut,
+                    'est_publie': event.est_publie,
+                    'cree_par': event.cree_par.get_full_name(),
+                },
+                (
                     {
                         'participante': inscription.participante.get_full_name(),
                         'email': inscription.participante.email,
@@ -548,13 +607,13 @@ class EventExportView(APIView):
                         'date_inscription': inscription.date_inscription.isoformat(),
                         'evaluation': inscription.evaluation_event
                     }
-                    for inscription in event.inscriptions.select_related('participante')
-                ]
-            })
+                    for inscription in inscriptions_event
+                )
+            )
+            for event, inscriptions_event in paires
+        )
         
-        response = JsonResponse({'events': data}, safe=False)
-        response['Content-Disposition'] = 'attachment; filename="events_export.json"'
-        return response
+        return reponse_json('events_export.json', 'events', elements, cle_enfants='inscriptions')
 
 
 class EventDuplicationView(APIView):
@@ -687,69 +746,48 @@ class EventStatistiquesAvanceesView(APIView):
             'tendances': {}
         }
         
-        # Events par statut
+        # Events par statut et par catégorie (GROUP BY)
+        events_periode = Event.objects.filter(date_creation__gte=date_limite)
+        
+        par_statut = dict(
+            events_periode.values('statut').annotate(count=Count('id')).values_list('statut', 'count')
+        )
         for statut_code, statut_label in Event.STATUTS:
-            count = Event.objects.filter(
-                date_creation__gte=date_limite,
-                statut=statut_code
-            ).count()
-            stats['events_par_statut'][statut_label] = count
+            stats['events_par_statut'][statut_label] = par_statut.get(statut_code, 0)
         
-        # Events par catégorie
+        par_categorie = dict(
+            events_periode.values('categorie').annotate(count=Count('id')).values_list('categorie', 'count')
+        )
         for cat_code, cat_label in Event.CATEGORIES:
-            count = Event.objects.filter(
-                date_creation__gte=date_limite,
-                categorie=cat_code
-            ).count()
-            stats['events_par_categorie'][cat_label] = count
-        
-        # Inscriptions par mois (12 derniers mois)
-        for i in range(12):
-            mois = timezone.now().replace(day=1) - timedelta(days=30*i)
-            mois_suivant = (mois + timedelta(days=32)).replace(day=1)
-            
-            count = InscriptionEvent.objects.filter(
-                date_inscription__gte=mois,
-                date_inscription__lt=mois_suivant
-            ).count()
-            
-            stats['inscriptions_par_mois'][mois.strftime('%Y-%m')] = count
-        
-        # Taux de participation moyen
-        events_termines = Event.objects.filter(
-            statut='termine',
-            date_fin__gte=date_limite
+            stats['events_par_categorie'][cat_label] = par_categorie.get(cat_code, 0)
+        
+        # Inscriptions par mois (12 derniers mois) depuis les statistiques quotidiennes
+        mois_analyses = derniers_mois(12)
+        par_mois = totaux_par_mois('inscriptions_events', mois_analyses[-1])
+        for mois in mois_analyses:
+            cle = mois.strftime('%Y-%m')
+            stats['inscriptions_par_mois'][cle] = par_mois.get(cle, 0)
+        
+        # Taux de participation moyen et évaluation moyenne des événements
+        # terminés sur la période (compteurs datés du jour de fin)
+        participation = totaux(
+            'presences_events', 'participations_attendues_events',
+            date_debut=timezone.localdate(date_limite),
+            date_fin=timezone.localdate()
         )
+        if participation['participations_attendues_events'] > 0:
+            stats['taux_participation_moyen'] = round(
+                (participation['presences_events'] /
+                 participation['participations_attendues_events']) * 100, 2
+            )
         
-        if events_termines.exists():
-            total_presents = 0
-            total_inscrits = 0
-            
-            for event in events_termines:
-                presents = event.inscriptions.filter(statut='presente').count()
-                inscrits = event.inscriptions.filter(
-                    statut__in=['confirmee', 'presente', 'absente']
-                ).count()
-                
-                total_presents += presents
-                total_inscrits += inscrits
-            
-            if total_inscrits > 0:
-                stats['taux_participation_moyen'] = round(
-                    (total_presents / total_inscrits) * 100, 2
-                )
-        
-        # Évaluation moyenne globale
-        evaluations = InscriptionEvent.objects.filter(
-            event__date_fin__gte=date_limite,
-            evaluation_event__isnull=False
+        evaluations = totaux(
+            'somme_evaluations_events', 'nb_evaluations_events',
+            date_debut=timezone.localdate(date_limite)
         )
-        
-        if evaluations.exists():
+        if evaluations['nb_evaluations_events'] > 0:
             stats['evaluation_moyenne_globale'] = round(
-                evaluations.aggregate(
-                    moyenne=Avg('evaluation_event')
-                )['moyenne'], 2
+                evaluations['somme_evaluations_events'] / evaluations['nb_evaluations_events'], 2
             )
         
         # Top organisateurs
@@ -845,56 +883,21 @@ class EventDashboardView(APIView):
     
     def get(self, request):
         """Retourne les statistiques du dashboard"""
-        now = timezone.now()
+        # Agrégats en cache (api.tableau_de_bord) : événements publiés,
+        # communs à toutes, et activité de la participante
+        events = tableau_events()
+        activite = tableau_participante(request.user.pk)
         
-        # Statistiques générales
         stats = {
-            'total_events': Event.objects.filter(est_publie=True).count(),
-            'events_a_venir': Event.objects.filter(
-                est_publie=True, 
-                date_debut__gt=now
-            ).count(),
-            'mes_inscriptions': InscriptionEvent.objects.filter(
-                participante=request.user
-            ).count(),
-            'events_passes': Event.objects.filter(
-                est_publie=True,
-                date_fin__lt=now
-            ).count()
+            'total_events': events['total_events'],
+            'events_a_venir': events['events_a_venir'],
+            'mes_inscriptions': activite['events'],
+            'events_passes': events['events_passes'],
+            'prochains_events': activite['prochains_events'],
+            'categories': events['categories'],
+            'inscriptions_par_mois': events['inscriptions_par_mois'],
         }
         
-        # Événements à venir pour l'utilisateur
-        prochains_events = Event.objects.filter(
-            inscriptions__participante=request.user,
-            date_debut__gt=now
-        ).order_by('date_debut')[:3]
-        
-        stats['prochains_events'] = EventSerializer(prochains_events, many=True).data
-        
-        # Statistiques par catégorie
-        categories_stats = Event.objects.filter(
-            est_publie=True
-        ).values('categorie').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        stats['categories'] = list(categories_stats)
-        
-        # Évolution des inscriptions (6 derniers mois)
-        inscriptions_par_mois = {}
-        for i in range(6):
-            mois = now.replace(day=1) - timedelta(days=30*i)
-            mois_suivant = (mois + timedelta(days=32)).replace(day=1)
-            
-            count = InscriptionEvent.objects.filter(
-                date_inscription__gte=mois,
-                date_inscription__lt=mois_suivant
-            ).count()
-            
-            inscriptions_par_mois[mois.strftime('%Y-%m')] = count
-        
-        stats['inscriptions_par_mois'] = inscriptions_par_mois
-        
         return Response(stats)
 
 
@@ -902,10 +905,13 @@ class EventSearchView(APIView):
     """Vue de recherche avancée d'événements"""
     
     permission_classes = [IsAuthenticated]
+    champs_curseur = ('-date_debut', '-id')
     
     def get(self, request):
         """Recherche avancée avec filtres multiples"""
-        queryset = Event.objects.filter(est_publie=True)
+        queryset = Event.objects.filter(est_publie=True).select_related(
+            'cree_par'
+        ).avec_statistiques(request.user)
         
         # Paramètres de recherche
         terme = request.query_params.get('q', '')
@@ -917,11 +923,8 @@ class EventSearchView(APIView):
         
         # Application des filtres
         if terme:
-            queryset = queryset.filter(
-                Q(titre__icontains=terme) |
-                Q(description__icontains=terme) |
-                Q(formateur_nom__icontains=terme)
-            )
+            # Index plein texte : préfixes, sans accents, classé par pertinence
+            queryset = rechercher_events(queryset, terme)
         
         if categorie:
             queryset = queryset.filter(categorie=categorie)
@@ -936,9 +939,14 @@ class EventSearchView(APIView):
             queryset = queryset.filter(est_en_ligne=en_ligne.lower() == 'true')
         
         if places_dispo:
-            queryset = queryset.annotate(
-                places_prises=Count('inscriptions', filter=Q(inscriptions__statut='confirmee'))
-            ).filter(places_prises__lt=F('max_participants'))
+            queryset = queryset.filter(places_occupees__lt=F('max_participants'))
+        
+        # Pagination par curseur (?pagination=curseur) : sans OFFSET ni COUNT(*)
+        paginator = PaginationListes()
+        if paginator.mode_curseur(request, self):
+            events = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = EventSerializer(events, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         
         # Pagination et tri
         page_size = min(int(request.query_params.get('page_size', 20)), 100)
@@ -949,7 +957,7 @@ class EventSearchView(APIView):
         end = start + page_size
         
         events = queryset[start:end]
-        serializer = EventSerializer(events, many=True)
+        serializer = EventSerializer(events, many=True, context={'request': request})
         
         return Response({
             'results': serializer.data,
@@ -1018,24 +1026,55 @@ class EventAnalyticsView(APIView):
     
     def get(self, request, event_id):
         """Retourne les analytiques d'un événement"""
-        event = get_object_or_404(Event, pk=event_id)
+        event = get_object_or_404(
+            Event.objects.select_related('cree_par').avec_statistiques(),
+            pk=event_id
+        )
         
         # Vérifier les permissions
         if not (request.user.is_staff or event.cree_par == request.user):
             raise PermissionDenied("Accès non autorisé aux analytiques")
         
-        # Statistiques d'inscription
         inscriptions = InscriptionEvent.objects.filter(event=event)
+        now = timezone.now()
+        
+        # Tous les compteurs en une seule requête (Count conditionnels)
+        compteurs = inscriptions.aggregate(
+            total=Count('id'),
+            confirmees=Count('id', filter=Q(statut='confirmee')),
+            presentes=Count('id', filter=Q(statut='presente')),
+            absentes=Count('id', filter=Q(statut='absente')),
+            en_attente=Count('id', filter=Q(statut='en_attente')),
+            annulees=Count('id', filter=Q(statut='annulee')),
+            total_attendu=Count('id', filter=Q(statut__in=['confirmee', 'presente', 'absente'])),
+            nb_evaluations=Count('id', filter=Q(evaluation_event__isnull=False)),
+            evaluation_moyenne=Avg('evaluation_event'),
+            commentaires_evaluation=Count(
+                'id', filter=Q(commentaire_evaluation__isnull=False) & ~Q(commentaire_evaluation='')
+            ),
+            inscriptions_derniere_semaine=Count(
+                'id', filter=Q(date_inscription__gte=now - timedelta(days=7))
+            ),
+            total_participants=Count(
+                'participante', distinct=True, filter=Q(statut__in=['confirmee', 'presente'])
+            ),
+            nouveaux_participants=Count(
+                'participante', distinct=True,
+                filter=Q(statut__in=['confirmee', 'presente'],
+                         participante__date_joined__gte=event.date_creation)
+            ),
+        )
+        total = compteurs['total']
         
         analytics = {
             'event_info': EventSerializer(event).data,
             'inscriptions': {
-                'total': inscriptions.count(),
-                'confirmees': inscriptions.filter(statut='confirmee').count(),
-                'presentes': inscriptions.filter(statut='presente').count(),
-                'absentes': inscriptions.filter(statut='absente').count(),
-                'en_attente': inscriptions.filter(statut='en_attente').count(),
-                'annulees': inscriptions.filter(statut='annulee').count(),
+                'total': total,
+                'confirmees': compteurs['confirmees'],
+                'presentes': compteurs['presentes'],
+                'absentes': compteurs['absentes'],
+                'en_attente': compteurs['en_attente'],
+                'annulees': compteurs['annulees'],
             },
             'taux_presence': 0,
             'evaluation_moyenne': 0,
@@ -1046,102 +1085,89 @@ class EventAnalyticsView(APIView):
         }
         
         # Calcul du taux de présence
-        total_attendu = inscriptions.filter(statut__in=['confirmee', 'presente', 'absente']).count()
-        presents = inscriptions.filter(statut='presente').count()
-        
-        if total_attendu > 0:
-            analytics['taux_presence'] = round((presents / total_attendu) * 100, 2)
-        
-        # Évaluation moyenne
-        evaluations = inscriptions.filter(evaluation_event__isnull=False)
-        if evaluations.exists():
-            analytics['evaluation_moyenne'] = round(
-                evaluations.aggregate(moyenne=Avg('evaluation_event'))['moyenne'], 2
+        if compteurs['total_attendu'] > 0:
+            analytics['taux_presence'] = round(
+                (compteurs['presentes'] / compteurs['total_attendu']) * 100, 2
             )
         
-        # Répartition des inscriptions dans le temps (7 derniers jours)
-        for i in range(7):
-            jour = timezone.now().date() - timedelta(days=i)
-            jour_suivant = jour + timedelta(days=1)
+        # Évaluation moyenne et satisfaction par note (GROUP BY evaluation_event)
+        if compteurs['nb_evaluations']:
+            analytics['evaluation_moyenne'] = round(compteurs['evaluation_moyenne'], 2)
             
-            count = inscriptions.filter(
-                date_inscription__date=jour
-            ).count()
-            
-            analytics['repartition_temporelle'][jour.strftime('%Y-%m-%d')] = count
-        
-        # Analyse de satisfaction par note
-        if evaluations.exists():
-            satisfaction_data = evaluations.values('evaluation_event').annotate(
+            satisfaction_data = inscriptions.filter(
+                evaluation_event__isnull=False
+            ).values('evaluation_event').annotate(
                 count=Count('id')
             ).order_by('evaluation_event')
             
             analytics['satisfaction'] = {
-                str(item['evaluation_event']): item['count'] 
+                str(item['evaluation_event']): item['count']
                 for item in satisfaction_data
             }
         
-        # Données démographiques (si disponibles)
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        participants = User.objects.filter(
-            inscriptions_events__event=event,
-            inscriptions_events__statut__in=['confirmee', 'presente']
-        ).distinct()
+        # Répartition des inscriptions dans le temps (7 derniers jours, GROUP BY jour)
+        aujourd_hui = timezone.localdate()
+        debut_periode = aujourd_hui - timedelta(days=6)
+        par_jour = dict(
+            inscriptions.filter(date_inscription__date__gte=debut_periode)
+            .annotate(jour=TruncDate('date_inscription'))
+            .values('jour')
+            .annotate(count=Count('id'))
+            .values_list('jour', 'count')
+        )
+        for i in range(7):
+            jour = aujourd_hui - timedelta(days=i)
+            analytics['repartition_temporelle'][jour.strftime('%Y-%m-%d')] = par_jour.get(jour, 0)
         
+        # Données démographiques
         analytics['demographics'] = {
-            'total_participants': participants.count(),
-            'nouveaux_participants': participants.filter(
-                date_joined__gte=event.date_creation
-            ).count()
+            'total_participants': compteurs['total_participants'],
+            'nouveaux_participants': compteurs['nouveaux_participants']
         }
         
         # Métriques d'engagement
         analytics['engagement'] = {
             'taux_inscription': round(
-                (inscriptions.count() / event.max_participants) * 100, 2
+                (total / event.max_participants) * 100, 2
             ) if event.max_participants > 0 else 0,
-            'commentaires_evaluation': inscriptions.filter(
-                commentaire_evaluation__isnull=False
-            ).exclude(commentaire_evaluation='').count(),
-            'inscriptions_derniere_semaine': inscriptions.filter(
-                date_inscription__gte=timezone.now() - timedelta(days=7)
-            ).count()
+            'commentaires_evaluation': compteurs['commentaires_evaluation'],
+            'inscriptions_derniere_semaine': compteurs['inscriptions_derniere_semaine']
         }
         
-        # Tendances temporelles (inscriptions par heure pour les dernières 24h)
-        if event.date_creation >= timezone.now() - timedelta(days=1):
-            tendances_horaires = {}
-            for h in range(24):
-                heure_debut = timezone.now().replace(hour=h, minute=0, second=0, microsecond=0)
-                heure_fin = heure_debut + timedelta(hours=1)
-                
-                count = inscriptions.filter(
-                    date_inscription__gte=heure_debut,
-                    date_inscription__lt=heure_fin
-                ).count()
-                
-                tendances_horaires[f"{h:02d}:00"] = count
-            
-            analytics['tendances_horaires'] = tendances_horaires
+        # Tendances temporelles (inscriptions par heure de la journée, GROUP BY heure)
+        if event.date_creation >= now - timedelta(days=1):
+            debut_journee = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            par_heure = dict(
+                inscriptions.filter(
+                    date_inscription__gte=debut_journee,
+                    date_inscription__lt=debut_journee + timedelta(days=1)
+                )
+                .annotate(heure=TruncHour('date_inscription', tzinfo=now.tzinfo))
+                .values('heure')
+                .annotate(count=Count('id'))
+                .values_list('heure', 'count')
+            )
+            analytics['tendances_horaires'] = {
+                f"{h:02d}:00": par_heure.get(debut_journee + timedelta(hours=h), 0)
+                for h in range(24)
+            }
         
         # Comparaison avec événements similaires
-        events_similaires = Event.objects.filter(
+        similaires = Event.objects.filter(
             categorie=event.categorie,
             est_publie=True
         ).exclude(id=event.id).annotate(
             nb_inscriptions=Count('inscriptions')
+        ).aggregate(
+            nb_events=Count('id'),
+            moyenne=Avg('nb_inscriptions')
         )
         
-        if events_similaires.exists():
-            moyenne_similaires = events_similaires.aggregate(
-                moyenne=Avg('nb_inscriptions')
-            )['moyenne']
-            
+        if similaires['nb_events']:
+            moyenne_similaires = similaires['moyenne']
             analytics['comparaison'] = {
                 'moyenne_categorie': round(moyenne_similaires, 2),
-                'performance_relative': 'supérieure' if inscriptions.count() > moyenne_similaires else 'inférieure'
+                'performance_relative': 'supérieure' if total > moyenne_similaires else 'inférieure'
             }
         
         return Response(analytics)
@@ -1211,11 +1237,21 @@ class EventMetricsView(APIView):
         return Response(metrics)
 
 
+ENTETE_PARTICIPANTS = [
+    'Nom complet', 'Email', 'Statut', 'Date inscription',
+    'Évaluation', 'Commentaire'
+]
+
+
 class EventExportParticipantsView(APIView):
     """Vue pour exporter la liste des participants"""
     
     permission_classes = [IsAuthenticated]
     
+    def perform_content_negotiation(self, request, force=False):
+        """Le paramètre ?format= désigne le format d'export, pas un renderer DRF"""
+        return super().perform_content_negotiation(request, force=True)
+    
     def get(self, request, event_id):
         """Exporte la liste des participants"""
         event = get_object_or_404(Event, pk=event_id)
@@ -1244,41 +1280,40 @@ class EventExportParticipantsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
-    def _export_csv_participants(self, event, inscriptions):
-        """Export CSV des participants"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="participants_{event.slug}.csv"'
-        
-        # BOM pour Excel
-        response.write('\ufeff')
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Nom complet', 'Email', 'Statut', 'Date inscription',
-            'Évaluation', 'Commentaire', 'Notes privées'
-        ])
-        
-        for inscription in inscriptions:
-            writer.writerow([
+    def _lignes_participants(self, inscriptions):
+        """Lignes de l'export des participants, lues par paquets"""
+        for inscription in inscriptions.iterator(chunk_size=TAILLE_PAQUET):
+            yield [
                 inscription.participante.get_full_name(),
                 inscription.participante.email,
                 inscription.get_statut_display(),
                 inscription.date_inscription.strftime('%d/%m/%Y %H:%M'),
                 inscription.evaluation_event or '',
-                inscription.commentaire_evaluation or '',
-                inscription.notes_privees or ''
-            ])
-        
-        return response
+                inscription.commentaire_evaluation or ''
+            ]
+    
+    def _export_csv_participants(self, event, inscriptions):
+        """Export CSV des participants (streamé)"""
+        return reponse_csv(
+            f'participants_{event.slug}.csv',
+            ENTETE_PARTICIPANTS,
+            self._lignes_participants(inscriptions),
+            bom=True
+        )
     
     def _export_excel_participants(self, event, inscriptions):
         """Export Excel des participants"""
-        # Cette méthode nécessiterait openpyxl
-        # Pour l'instant, rediriger vers CSV
-        return self._export_csv_participants(event, inscriptions)
+        response = reponse_xlsx(
+            f'participants_{event.slug}.xlsx',
+            'Participants',
+            ENTETE_PARTICIPANTS,
+            self._lignes_participants(inscriptions)
+        )
+        
+        # Sans openpyxl, se rabattre sur le CSV
+        if response is None:
+            return self._export_csv_participants(event, inscriptions)
+        return response
 
 
 class EventCloneView(APIView):
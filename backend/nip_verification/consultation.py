@@ -0,0 +1,121 @@
+# ============================================================================
+# backend/nip_verification/consultation.py
+# ============================================================================
+"""
+Consultation du référentiel des NIP (users.NipReference)
+Un NIP absent du filtre de Bloom du processus est inconnu, sans requête ;
+les autres sont lus en cache (lecture au travers, y compris les faux
+positifs du filtre). Le filtre et les clés de cache suivent la version
+partagée du référentiel, avancée par l'import et par chaque écriture d'un
+NIP de référence : un processus la relit au plus toutes les
+INTERVALLE_VERSION secondes et reconstruit alors son filtre.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+from api.bloom import FiltreBloom
+from api.conditionnel import version
+from users.models import NipReference
+from users.referentiel_nip import RESSOURCE_NIP, nip_valide, normaliser_nip
+
+
+# Durées de vie (secondes) des recherches en cache
+DUREE_CACHE_NIP = 3600
+DUREE_CACHE_INCONNU = 300
+
+# Délai maximal (secondes) avant qu'un processus voie un nouvel import
+INTERVALLE_VERSION = 5
+
+# Taux de faux positifs du filtre (recherches inutiles en cache)
+TAUX_FAUX_POSITIFS = 0.001
+
+# Nombre maximal de NIP par vérification groupée
+LOT_MAX = 1000
+
+_etat = {'filtre': None, 'version': None, 'verifie': 0.0}
+_verrou = threading.Lock()
+
+
+def construire_filtre():
+    """Filtre de Bloom de tous les NIP de référence (actifs ou non)"""
+    # Marge pour les NIP ajoutés avant la prochaine reconstruction
+    filtre = FiltreBloom(NipReference.objects.count() * 1.1 + 1000, TAUX_FAUX_POSITIFS)
+    for nip in NipReference.objects.values_list('nip', flat=True).iterator(chunk_size=10000):
+        filtre.ajouter(nip)
+    return filtre
+
+
+def etat_courant():
+    """(filtre, version) du processus, reconstruit si la version partagée a avancé"""
+    if _etat['filtre'] is not None and time.monotonic() - _etat['verifie'] < INTERVALLE_VERSION:
+        return _etat['filtre'], _etat['version']
+    
+    with _verrou:
+        if _etat['filtre'] is None or time.monotonic() - _etat['verifie'] >= INTERVALLE_VERSION:
+            # Version lue avant la construction : une écriture pendant celle-ci
+            # l'avance à nouveau et provoque une nouvelle reconstruction
+            courante = version(RESSOURCE_NIP)
+            if _etat['filtre'] is None or courante != _etat['version']:
+                _etat['filtre'] = construire_filtre()
+                _etat['version'] = courante
+            _etat['verifie'] = time.monotonic()
+        return _etat['filtre'], _etat['version']
+
+
+def reinitialiser():
+    """Oublie le filtre du processus (reconstruit à la prochaine recherche)"""
+    with _verrou:
+        _etat.update({'filtre': None, 'version': None, 'verifie': 0.0})
+
+
+def cle_cache(nip, version_referentiel):
+    return f'nip_reference_{version_referentiel!r}_{nip}'
+
+
+def rechercher_nips(nips):
+    """
+    Recherche une liste de NIP. Retourne {nip demandé: données du NIP de
+    référence, ou None si inconnu}. Une requête au plus, pour les NIP
+    passant le filtre et absents du cache.
+    """
+    filtre, version_referentiel = etat_courant()
+    
+    demandes = {nip: normaliser_nip(nip) for nip in nips}
+    candidats = {
+        normalise for normalise in set(demandes.values())
+        if nip_valide(normalise) and normalise in filtre
+    }
+    
+    trouves = {}
+    if candidats:
+        cles = {cle_cache(nip, version_referentiel): nip for nip in candidats}
+        for cle, donnees in cache.get_many(list(cles)).items():
+            trouves[cles[cle]] = donnees
+        
+        manquants = candidats - set(trouves)
+        if manquants:
+            lus = {
+                reference['nip']: reference
+                for reference in NipReference.objects.filter(nip__in=manquants).values(
+                    'nip', 'nom', 'prenom', 'region', 'is_active'
+                )
+            }
+            # Faux positifs du filtre mémorisés (False) moins longtemps
+            nouveaux = {nip: lus.get(nip, False) for nip in manquants}
+            cache.set_many(
+                {cle_cache(nip, version_referentiel): donnees for nip, donnees in nouveaux.items() if donnees},
+                DUREE_CACHE_NIP
+            )
+            cache.set_many(
+                {cle_cache(nip, version_referentiel): donnees for nip, donnees in nouveaux.items() if not donnees},
+                DUREE_CACHE_INCONNU
+            )
+            trouves.update(nouveaux)
+    
+    return {nip: trouves.get(normalise) or None for nip, normalise in demandes.items()}
+
+
+def rechercher_nip(nip):
+    return rechercher_nips([nip])[nip]
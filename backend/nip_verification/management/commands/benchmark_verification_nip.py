@@ -0,0 +1,111 @@
+# ============================================================================
+# backend/nip_verification/management/commands/benchmark_verification_nip.py
+# ============================================================================
+"""
+Commande de mesure de la vérification des NIP
+Génère un référentiel de NIP puis compare la requête directe à la
+consultation (nip_verification.consultation) : NIP inconnus écartés par
+le filtre de Bloom, NIP connus lus en base puis en cache. Affiche les
+latences médiane, p95 et p99 en millisecondes.
+"""
+import random
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from api.conditionnel import marquer_modification
+from nip_verification import consultation
+from users.models import NipReference
+from users.referentiel_nip import RESSOURCE_NIP
+
+# Préfixe des NIP créés par le benchmark (purgés avant et après)
+PREFIXE = 'BNIP'
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence de vérification des NIP (filtre de Bloom et cache)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--references', type=int, default=100000, help='NIP de référence générés')
+        parser.add_argument(
+            '--recherches',
+            type=int,
+            default=500,
+            help='Recherches par scénario (NIP distincts : à garder sous la capacité du cache)',
+        )
+        parser.add_argument(
+            '--garder',
+            action='store_true',
+            help='Conserve les NIP générés après la mesure',
+        )
+    
+    def handle(self, *args, **options):
+        self.purger()
+        try:
+            nombre = options['references']
+            debut = time.perf_counter()
+            NipReference.objects.bulk_create([
+                NipReference(nip=f'{PREFIXE}{numero:010d}', nom=f'Nom{numero}', prenom='Bench', region='estuaire')
+                for numero in range(nombre)
+            ], batch_size=5000)
+            # bulk_create n'envoie pas de signal : nouvelle version comme après un import
+            marquer_modification(RESSOURCE_NIP)
+            self.stdout.write(f"{nombre} NIP créés en {time.perf_counter() - debut:.1f}s")
+            
+            consultation.reinitialiser()
+            debut = time.perf_counter()
+            filtre, version_referentiel = consultation.etat_courant()
+            self.stdout.write(
+                f"Filtre de Bloom : {len(filtre)} NIP, {len(filtre.bits) / 1024:.0f} ko, "
+                f"{filtre.nb_hachages} hachages, construit en {(time.perf_counter() - debut) * 1000:.0f} ms"
+            )
+            
+            total = NipReference.objects.count()
+            connus = [f'{PREFIXE}{numero:010d}' for numero in random.sample(range(nombre), min(options['recherches'], nombre))]
+            inconnus = [f'XNIP{numero:010d}' for numero in range(options['recherches'])]
+            faux_positifs = sum(1 for nip in inconnus if nip in filtre)
+            
+            self.stdout.write(f"\n{total} NIP de référence, {len(connus)} recherches par scénario")
+            self.stdout.write(f"{'scénario':<36}{'médiane ms':>12}{'p95 ms':>10}{'p99 ms':>10}")
+            
+            def requete_directe(nip):
+                return NipReference.objects.filter(nip=nip).values('nip', 'nom', 'prenom', 'region', 'is_active').first()
+            
+            cache.delete_many([consultation.cle_cache(nip, version_referentiel) for nip in connus])
+            scenarios = [
+                ('requête directe, NIP inconnu', requete_directe, inconnus),
+                ('requête directe, NIP connu', requete_directe, connus),
+                ('consultation, NIP inconnu (filtre)', consultation.rechercher_nip, inconnus),
+                ('consultation, NIP connu (base)', consultation.rechercher_nip, connus),
+                ('consultation, NIP connu (cache)', consultation.rechercher_nip, connus),
+            ]
+            for libelle, recherche, nips in scenarios:
+                self.afficher(libelle, self.mesurer(recherche, nips))
+            
+            self.stdout.write(
+                f"\nFaux positifs du filtre : {faux_positifs}/{len(inconnus)} "
+                f"(cible {consultation.TAUX_FAUX_POSITIFS:.1%})"
+            )
+        finally:
+            if not options['garder']:
+                self.purger()
+    
+    def mesurer(self, recherche, nips):
+        durees = []
+        for nip in nips:
+            debut = time.perf_counter()
+            recherche(nip)
+            durees.append((time.perf_counter() - debut) * 1000)
+        return durees
+    
+    def afficher(self, libelle, durees):
+        centiles = statistics.quantiles(durees, n=100)
+        self.stdout.write(
+            f"{libelle:<36}{statistics.median(durees):>12.3f}{centiles[94]:>10.3f}{centiles[98]:>10.3f}"
+        )
+    
+    def purger(self):
+        if NipReference.objects.filter(nip__startswith=PREFIXE).delete()[0]:
+            marquer_modification(RESSOURCE_NIP)
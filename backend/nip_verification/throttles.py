@@ -0,0 +1,21 @@
+# ============================================================================
+# backend/nip_verification/throttles.py
+# ============================================================================
+"""
+Limitation de débit de la vérification des NIP
+"""
+from api.throttles import ThrottleParIP
+
+
+class VerificationNIPThrottle(ThrottleParIP):
+    """Formulaire d'inscription : une vérification par saisie (anti-rebond côté client)"""
+    
+    scope = 'verification_nip'
+    rythme_defaut = '60/minute'
+
+
+class VerificationNIPLotThrottle(ThrottleParIP):
+    """Vérifications groupées par l'administration"""
+    
+    scope = 'verification_nip_lot'
+    rythme_defaut = '30/minute'
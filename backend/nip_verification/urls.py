@@ -1,7 +1,8 @@
 
 from django.urls import path
-from .views import VerifyNIPView
+from .views import VerifyNIPLotView, VerifyNIPView
 
 urlpatterns = [
     path('', VerifyNIPView.as_view(), name='verify-nip'),
+    path('lot/', VerifyNIPLotView.as_view(), name='verify-nip-lot'),
 ]
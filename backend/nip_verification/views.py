@@ -1,23 +1,63 @@
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from users.models import Participante
-from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import permissions, status
+
+from .consultation import LOT_MAX, rechercher_nip, rechercher_nips
+from .throttles import VerificationNIPLotThrottle, VerificationNIPThrottle
+
+
+def resultat_nip(reference):
+    """Réponse publique d'une recherche (None : NIP inconnu)"""
+    if reference is None:
+        return {'valid': False, 'error': 'NIP non trouvé'}
+    if not reference['is_active']:
+        return {'valid': False, 'error': 'NIP désactivé'}
+    return {
+        'valid': True,
+        'nom': reference['nom'],
+        'prenom': reference['prenom'],
+        'region': reference['region'],
+    }
+
 
 class VerifyNIPView(APIView):
+    """Vérification d'un NIP dans le référentiel officiel (formulaire d'inscription)"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [VerificationNIPThrottle]
+
     def post(self, request):
         nip = request.data.get('nip')
         if not nip:
             return Response({'error': 'NIP requis'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            user = Participante.objects.get(nip=nip)
-            return Response({
-                'valid': True,
-                'nom': user.last_name,
-                'prenom': user.first_name,
-                'statut_validation': user.statut_validation
-            })
-        except ObjectDoesNotExist:
-            return Response({'valid': False, 'error': 'NIP non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+        resultat = resultat_nip(rechercher_nip(nip))
+        if not resultat['valid']:
+            return Response(resultat, status=status.HTTP_404_NOT_FOUND)
+        return Response(resultat)
+
+
+class VerifyNIPLotView(APIView):
+    """Vérification groupée : {"nips": [...]} (administration, au plus LOT_MAX)"""
+    permission_classes = [permissions.IsAdminUser]
+    throttle_classes = [VerificationNIPLotThrottle]
+
+    def post(self, request):
+        nips = request.data.get('nips')
+        if not isinstance(nips, list) or not nips:
+            return Response({'error': 'nips : liste de NIP requise'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(nips) > LOT_MAX:
+            return Response(
+                {'error': f'{LOT_MAX} NIP au plus par requête'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not all(isinstance(nip, str) and nip.strip() for nip in nips):
+            return Response({'error': 'Chaque NIP doit être une chaîne non vide'}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultats = rechercher_nips(nips)
+        reponses = [{'nip': nip, **resultat_nip(reference)} for nip, reference in resultats.items()]
+        return Response({
+            'total': len(reponses),
+            'valides': sum(1 for reponse in reponses if reponse['valid']),
+            'resultats': reponses
+        })
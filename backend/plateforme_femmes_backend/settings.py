@@ -26,9 +26,11 @@ INSTALLED_APPS = [
     
     # Apps locales - CORRECTION: ajout des apps manquantes
     'users',
+    'nip_verification',  # Vérification des NIP (référentiel officiel)
     'training',    # Ajouté
     'quiz',        # Ajouté
     'events',      # Nouveau module créé
+    'api',         # Statistiques agrégées de la plateforme
 ]
 
 # CORRECTION: Utilisation correcte du modèle utilisateur personnalisé
@@ -43,6 +45,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'users.middleware.PresenceMiddleware',  # Dernier passage des participantes
 ]
 
 ROOT_URLCONF = 'plateforme_femmes_backend.urls'
@@ -55,6 +58,10 @@ DATABASES = {
     }
 }
 
+# Lookups trigrammes de la recherche des participantes (users.recherche)
+if DATABASES['default']['ENGINE'].startswith('django.db.backends.postgresql'):
+    INSTALLED_APPS += ['django.contrib.postgres']
+
 LANGUAGE_CODE = 'fr-fr'
 TIME_ZONE = 'Africa/Libreville'
 USE_I18N = True
@@ -66,6 +73,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Certificats PDF : téléchargement délégué à nginx (location interne
+# /media/certificats/) et polices TrueType optionnelles du rendu
+CERTIFICATS_X_ACCEL_REDIRECT = os.environ.get('CERTIFICATS_X_ACCEL_REDIRECT', '').lower() in ('1', 'true', 'yes', 'on')
+CERTIFICAT_POLICES = None  # ex. {'normale': '/chemin/DejaVuSans.ttf', 'grasse': '/chemin/DejaVuSans-Bold.ttf'}
+
 # Configuration CORS
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -90,6 +102,13 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    # Rythmes des vues publiques limitées par IP (api.throttles)
+    'DEFAULT_THROTTLE_RATES': {
+        'verification_certificats': '120/minute',  # Vérification publique des certificats
+        'verification_certificats_lot': '20/minute',
+        'verification_nip': '60/minute',  # Vérification du NIP à l'inscription
+        'verification_nip_lot': '30/minute',
+    },
     # CORRECTION: ajout du gestionnaire d'exceptions personnalisé
     'EXCEPTION_HANDLER': 'api.exceptions.custom_exception_handler',
 }
@@ -155,17 +174,26 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 # Configuration cache
+# Le cache doit être partagé par tous les processus (workers, Celery) : il
+# porte les versions des réponses conditionnelles (api.conditionnel) et les
+# invalidations (corrigés des quiz, calendrier, tableaux de bord). Un
+# LocMemCache, propre à chaque processus, servirait des données périmées.
+# Fichiers sur ce serveur ici, Redis en production (cf. settings/base.py)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
         'TIMEOUT': 300,
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+            'MAX_ENTRIES': 10000,
         }
     }
 }
 
+# Suivi de présence : last_activity en base, partagé par les processus (Redis en production, cf. settings/base.py)
+PRESENCE_STOCKAGE = 'users.presence.PresenceBaseDonnees'
+PRESENCE_INTERVALLE_ECRITURE = 5 * 60  # last_activity écrit au plus une fois par intervalle (secondes)
+
 # Configuration logging
 LOGGING = {
     'version': 1,
@@ -71,6 +71,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'users.middleware.PresenceMiddleware',  # Dernier passage des participantes
     'axes.middleware.AxesMiddleware',  # Protection brute force
     'django_ratelimit.middleware.RatelimitMiddleware',  # Rate limiting global
 ]
@@ -102,6 +103,10 @@ DATABASES = {
     'default': env.db()
 }
 
+# Lookups trigrammes de la recherche des participantes (users.recherche)
+if DATABASES['default']['ENGINE'].startswith('django.db.backends.postgresql'):
+    INSTALLED_APPS += ['django.contrib.postgres']
+
 # Configuration du cache Redis
 CACHES = {
     'default': {
@@ -120,6 +125,10 @@ CACHES = {
     }
 }
 
+# Suivi de présence des participantes : ensemble trié dans le Redis du cache
+PRESENCE_STOCKAGE = 'users.presence.PresenceRedis'
+PRESENCE_INTERVALLE_ECRITURE = 5 * 60  # last_activity écrit au plus une fois par intervalle (secondes)
+
 # Session configuration avec Redis
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
@@ -204,6 +213,11 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Certificats PDF : téléchargement délégué à nginx (location interne
+# /media/certificats/) et polices TrueType optionnelles du rendu
+CERTIFICATS_X_ACCEL_REDIRECT = env.bool('CERTIFICATS_X_ACCEL_REDIRECT', default=False)
+CERTIFICAT_POLICES = None  # ex. {'normale': '/chemin/DejaVuSans.ttf', 'grasse': '/chemin/DejaVuSans-Bold.ttf'}
+
 # Limite de taille des uploads
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5 MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5 MB
@@ -247,6 +261,10 @@ REST_FRAMEWORK = {
         'anon': '100/hour',
         'user': '1000/hour',
         'login': '5/minute',  # Protection login
+        'verification_certificats': '120/minute',  # Vérification publique des certificats
+        'verification_certificats_lot': '20/minute',
+        'verification_nip': '60/minute',  # Vérification du NIP à l'inscription
+        'verification_nip_lot': '30/minute',
     },
     'EXCEPTION_HANDLER': 'api.exceptions.custom_exception_handler',
 }
@@ -39,6 +39,7 @@ urlpatterns = [
     path('api/', include([
         # Authentification et utilisateurs
         path('auth/', include('users.urls')),
+        path('verify-nip/', include('nip_verification.urls')),
         
         # Modules principaux
         path('training/', include('training.urls')),
@@ -0,0 +1,4 @@
+# ============================================================================
+# backend/quiz/__init__.py
+# ============================================================================
+default_app_config = 'quiz.apps.QuizConfig'
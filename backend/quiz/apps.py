@@ -0,0 +1,20 @@
+# ============================================================================
+# backend/quiz/apps.py
+# ============================================================================
+"""
+Configuration de l'application quiz
+"""
+from django.apps import AppConfig
+
+
+class QuizConfig(AppConfig):
+    """Configuration de l'application quiz"""
+    
+    # Clés primaires des migrations existantes
+    default_auto_field = 'django.db.models.AutoField'
+    name = 'quiz'
+    verbose_name = 'Quiz'
+    
+    def ready(self):
+        """Connexion des signaux de l'application"""
+        import quiz.correction  # Invalidation du corrigé des quiz
@@ -0,0 +1,142 @@
+# ============================================================================
+# backend/quiz/correction.py
+# ============================================================================
+"""
+Corrigé compilé des quiz
+Le barème et les bonnes réponses d'un quiz sont chargés une fois (deux
+requêtes), mis en cache et invalidés à chaque modification d'une question
+ou d'une réponse ; la notation se fait ensuite en Python pur.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+
+from .models import Question, Reponse
+
+
+# Durée de vie du corrigé en cache (secondes), l'invalidation reste la règle
+DUREE_CACHE_CORRIGE = 3600
+
+TYPES_CHOIX = ('qcm', 'vrai_faux')
+
+
+def cle_cache_corrige(quiz_id):
+    return f'quiz_{quiz_id}_corrige'
+
+
+class CorrigeQuiz:
+    """
+    Corrigé d'un quiz : pour chaque question (dans l'ordre), son type, ses
+    points, les identifiants des réponses correctes et, pour une question
+    numérique, la valeur attendue.
+    """
+    
+    def __init__(self, quiz_id, questions):
+        self.quiz_id = quiz_id
+        self.questions = questions
+        self.points_total = sum(question['points'] for question in questions)
+    
+    @classmethod
+    def compiler(cls, quiz_id):
+        """Construit le corrigé depuis la base (deux requêtes)"""
+        correctes = {}
+        for question_id, reponse_id, texte in Reponse.objects.filter(
+            question__quiz_id=quiz_id,
+            est_correcte=True
+        ).order_by('ordre').values_list('question_id', 'id', 'texte'):
+            correctes.setdefault(question_id, []).append((reponse_id, texte))
+        
+        questions = []
+        for question_id, type_question, points in Question.objects.filter(
+            quiz_id=quiz_id
+        ).order_by('ordre').values_list('id', 'type_question', 'points'):
+            reponses = correctes.get(question_id, [])
+            
+            valeur = None
+            if type_question == 'numerique' and reponses:
+                try:
+                    valeur = float(reponses[0][1])
+                except (ValueError, TypeError):
+                    pass
+            
+            questions.append({
+                'id': question_id,
+                'type': type_question,
+                'points': points,
+                'reponses_correctes': frozenset(str(reponse_id) for reponse_id, texte in reponses),
+                'valeur': valeur,
+            })
+        
+        return cls(quiz_id, questions)
+    
+    @staticmethod
+    def est_correcte(question, reponse_donnee):
+        """Indique si la réponse donnée à une question du corrigé est juste"""
+        if reponse_donnee is None:
+            return False
+        
+        if question['type'] in TYPES_CHOIX:
+            return str(reponse_donnee) in question['reponses_correctes']
+        
+        if question['type'] == 'numerique' and question['valeur'] is not None:
+            try:
+                return float(reponse_donnee) == question['valeur']
+            except (ValueError, TypeError):
+                return False
+        
+        # Réponses libres : correction manuelle
+        return False
+    
+    def noter(self, reponses):
+        """
+        Note une soumission {id question: réponse} sans requête.
+        Retourne (points obtenus, points total, détails par question).
+        """
+        points_obtenus = 0
+        details = {}
+        
+        for question in self.questions:
+            reponse_donnee = reponses.get(str(question['id']))
+            correcte = self.est_correcte(question, reponse_donnee)
+            if correcte:
+                points_obtenus += question['points']
+            
+            details[str(question['id'])] = {
+                'reponse_donnee': reponse_donnee,
+                'est_correcte': correcte,
+                'points_obtenus': question['points'] if correcte else 0
+            }
+        
+        return points_obtenus, self.points_total, details
+
+
+def obtenir_corrige(quiz_id):
+    """Corrigé du quiz, depuis le cache ou compilé à la demande"""
+    cle = cle_cache_corrige(quiz_id)
+    corrige = cache.get(cle)
+    if corrige is None:
+        corrige = CorrigeQuiz.compiler(quiz_id)
+        cache.set(cle, corrige, DUREE_CACHE_CORRIGE)
+    return corrige
+
+
+def invalider_corrige(quiz_id):
+    cache.delete(cle_cache_corrige(quiz_id))
+
+
+def invalider_corrige_question(sender, instance, **kwargs):
+    """Invalide le corrigé après modification d'une question"""
+    invalider_corrige(instance.quiz_id)
+
+
+def invalider_corrige_reponse(sender, instance, **kwargs):
+    """Invalide le corrigé après modification d'une réponse"""
+    quiz_id = Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        invalider_corrige(quiz_id)
+
+
+# Signaux branchés à l'import de ce module (quiz.apps.QuizConfig.ready)
+post_save.connect(invalider_corrige_question, sender=Question, dispatch_uid='quiz_corrige_question_save')
+post_delete.connect(invalider_corrige_question, sender=Question, dispatch_uid='quiz_corrige_question_delete')
+post_save.connect(invalider_corrige_reponse, sender=Reponse, dispatch_uid='quiz_corrige_reponse_save')
+post_delete.connect(invalider_corrige_reponse, sender=Reponse, dispatch_uid='quiz_corrige_reponse_delete')
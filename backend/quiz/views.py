@@ -13,6 +13,8 @@ from django.db.models import Count, Avg, Q
 from datetime import timedelta
 
 from .models import Quiz, TentativeQuiz, Question, Reponse
+from .correction import obtenir_corrige
+from api.statistiques import totaux
 from .serializers import (
     QuizSerializer, 
     QuizDetailSerializer, 
@@ -114,38 +116,8 @@ class QuizViewSet(viewsets.ReadOnlyModelViewSet):
             # Marquer comme invalide si temps dépassé
             tentative.est_valide = False
         
-        # Calculer le score
-        score = 0
-        points_total = 0
-        details_reponses = {}
-        
-        for question in quiz.questions.all():
-            points_total += question.points
-            reponse_donnee = reponses.get(str(question.id))
-            question_correcte = False
-            
-            if question.type_question in ['qcm', 'vrai_faux']:
-                reponse_correcte = question.reponses.filter(est_correcte=True).first()
-                if reponse_correcte and str(reponse_correcte.id) == str(reponse_donnee):
-                    score += question.points
-                    question_correcte = True
-            elif question.type_question == 'numerique':
-                # Pour les questions numériques, comparer les valeurs
-                try:
-                    reponse_correcte = question.reponses.filter(est_correcte=True).first()
-                    if reponse_correcte:
-                        if float(reponse_donnee) == float(reponse_correcte.texte):
-                            score += question.points
-                            question_correcte = True
-                except (ValueError, TypeError):
-                    pass
-            
-            # Stocker les détails pour correction
-            details_reponses[str(question.id)] = {
-                'reponse_donnee': reponse_donnee,
-                'est_correcte': question_correcte,
-                'points_obtenus': question.points if question_correcte else 0
-            }
+        # Calculer le score avec le corrigé compilé (aucune requête par question)
+        score, points_total, details_reponses = obtenir_corrige(quiz.pk).noter(reponses)
         
         # Calculer le pourcentage
         score_pourcentage = (score / points_total * 100) if points_total > 0 else 0
@@ -305,34 +277,28 @@ class TentativeQuizViewSet(viewsets.ModelViewSet):
         # Construire les détails de correction
         corrections = []
         reponses_donnees = tentative.reponses_donnees
+        corrige = obtenir_corrige(tentative.quiz_id)
+        questions = {
+            question.id: question
+            for question in tentative.quiz.questions.prefetch_related('reponses')
+        }
         
-        for question in tentative.quiz.questions.all():
+        for question_corrigee in corrige.questions:
+            question = questions.get(question_corrigee['id'])
+            if question is None:
+                continue
+            
             reponse_donnee = reponses_donnees.get(str(question.id))
-            reponses_correctes = question.reponses.filter(est_correcte=True)
+            est_correcte = corrige.est_correcte(question_corrigee, reponse_donnee)
+            reponses_correctes = [reponse for reponse in question.reponses.all() if reponse.est_correcte]
             
-            correction = {
+            corrections.append({
                 'question': QuestionSerializer(question).data,
                 'reponse_donnee': reponse_donnee,
                 'reponses_correctes': ReponseSerializer(reponses_correctes, many=True).data,
-                'est_correcte': False,
-                'points_obtenus': 0
-            }
-            
-            # Vérifier si la réponse est correcte
-            if question.type_question in ['qcm', 'vrai_faux']:
-                if reponses_correctes.filter(id=reponse_donnee).exists():
-                    correction['est_correcte'] = True
-                    correction['points_obtenus'] = question.points
-            elif question.type_question == 'numerique':
-                try:
-                    reponse_correcte = reponses_correctes.first()
-                    if reponse_correcte and float(reponse_donnee) == float(reponse_correcte.texte):
-                        correction['est_correcte'] = True
-                        correction['points_obtenus'] = question.points
-                except (ValueError, TypeError):
-                    pass
-            
-            corrections.append(correction)
+                'est_correcte': est_correcte,
+                'points_obtenus': question.points if est_correcte else 0
+            })
         
         return Response({
             'tentative': TentativeQuizSerializer(tentative).data,
@@ -348,26 +314,24 @@ class TentativeQuizViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        # Compteurs lus dans les statistiques quotidiennes (api.statistiques)
+        compteurs = totaux(
+            'tentatives_quiz', 'tentatives_finies', 'tentatives_reussies',
+            'somme_scores_quiz', 'nb_scores_quiz', 'temps_total_quiz', 'nb_temps_quiz'
+        )
+        
         stats = {
-            'total_tentatives': TentativeQuiz.objects.count(),
-            'tentatives_finies': TentativeQuiz.objects.filter(
-                date_fin__isnull=False
-            ).count(),
-            'tentatives_reussies': TentativeQuiz.objects.filter(
-                score__gte=models.F('quiz__note_passage'),
-                date_fin__isnull=False
-            ).count(),
-            'score_moyen': TentativeQuiz.objects.filter(
-                date_fin__isnull=False
-            ).aggregate(
-                moyenne=Avg('score')
-            )['moyenne'],
-            'temps_moyen': TentativeQuiz.objects.filter(
-                date_fin__isnull=False,
-                temps_ecoule__isnull=False
-            ).aggregate(
-                moyenne=Avg('temps_ecoule')
-            )['moyenne']
+            'total_tentatives': compteurs['tentatives_quiz'],
+            'tentatives_finies': compteurs['tentatives_finies'],
+            'tentatives_reussies': compteurs['tentatives_reussies'],
+            'score_moyen': (
+                compteurs['somme_scores_quiz'] / compteurs['nb_scores_quiz']
+                if compteurs['nb_scores_quiz'] else None
+            ),
+            'temps_moyen': (
+                compteurs['temps_total_quiz'] / compteurs['nb_temps_quiz']
+                if compteurs['nb_temps_quiz'] else None
+            )
         }
         
         # Quiz les plus populaires
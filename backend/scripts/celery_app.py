@@ -32,12 +32,24 @@ app.conf.beat_schedule = {
         'schedule': crontab(minute=0),
     },
     
-    # Envoyer les rappels d'événements tous les jours à 9h
+    # Réconcilier les statistiques quotidiennes toutes les nuits à 1h
+    'reconcile-platform-stats': {
+        'task': 'api.tasks.reconcilier_statistiques_plateforme',
+        'schedule': crontab(hour=1, minute=0),
+    },
+    
+    # Envoyer les rappels d'événements arrivés à échéance toutes les 5 minutes
     'send-event-reminders': {
-        'task': 'events.tasks.send_event_reminders',
-        'schedule': crontab(hour=9, minute=0),
+        'task': 'events.tasks.traiter_rappels_automatiques',
+        'schedule': crontab(minute='*/5'),
     },
     
+    # Resynchroniser les compteurs de places des événements tous les jours à 4h
+    'resync-event-seats': {
+        'task': 'events.tasks.resynchroniser_places_occupees',
+        'schedule': crontab(hour=4, minute=0),
+    },
+
     # Nettoyer les fichiers temporaires tous les jours à 3h
     'clean-temp-files': {
         'task': 'document_upload.tasks.clean_temporary_files',
@@ -50,6 +62,12 @@ app.conf.beat_schedule = {
         'schedule': crontab(day_of_month=1, hour=0, minute=0),
     },
     
+    # Enregistrer en base la dernière activité des participantes chaque minute
+    'flush-participant-activity': {
+        'task': 'users.tasks.enregistrer_activites_participantes',
+        'schedule': crontab(),
+    },
+    
     # Vérifier les utilisateurs inactifs tous les lundis
     'check-inactive-users': {
         'task': 'users.tasks.check_inactive_users',
@@ -61,8 +79,12 @@ app.conf.beat_schedule = {
 app.conf.task_routes = {
     'users.tasks.send_email': {'queue': 'email'},
     'users.tasks.process_avatar': {'queue': 'media'},
-    'events.tasks.send_event_reminders': {'queue': 'notifications'},
+    'events.tasks.traiter_rappels_automatiques': {'queue': 'notifications'},
+    'events.tasks.envoyer_rappel_event': {'queue': 'notifications'},
+    'events.tasks.envoyer_confirmations_inscription': {'queue': 'notifications'},
     'api.tasks.generate_report': {'queue': 'reports'},
+    'training.tasks.generer_certificat_pdf': {'queue': 'media'},
+    'training.tasks.generer_certificats_formation': {'queue': 'media'},
 }
 
 # Configuration des priorités
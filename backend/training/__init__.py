@@ -0,0 +1,4 @@
+# ============================================================================
+# backend/training/__init__.py
+# ============================================================================
+default_app_config = 'training.apps.TrainingConfig'
@@ -0,0 +1,21 @@
+# ============================================================================
+# backend/training/apps.py
+# ============================================================================
+"""
+Configuration de l'application training
+"""
+from django.apps import AppConfig
+
+
+class TrainingConfig(AppConfig):
+    """Configuration de l'application formations"""
+    
+    # Clés primaires des migrations existantes
+    default_auto_field = 'django.db.models.AutoField'
+    name = 'training'
+    verbose_name = 'Formations'
+    
+    def ready(self):
+        """Connexion des signaux de l'application"""
+        import training.compteurs  # Compteurs dénormalisés des formations
+        import training.verification  # Invalidation des vérifications de certificats
@@ -0,0 +1,305 @@
+# ============================================================================
+# backend/training/certificats.py
+# ============================================================================
+"""
+Certificats de formation : création en lot, rendu PDF et téléchargement
+Les polices sont enregistrées une fois par processus et la partie commune
+d'un certificat (en-tête, textes et détails de la formation, mesures) est
+préparée une fois par formation : chaque PDF ne dessine en propre que la
+participante, la note, la date et le numéro. Les fichiers sont produits par
+les tâches de training.tasks (rendus sur place si la file de tâches est
+indisponible), stockés dans Certificat.fichier_pdf et servis sans être lus
+par Django (FileResponse ou X-Accel-Redirect).
+"""
+import io
+import logging
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .models import Certificat, InscriptionFormation
+from .verification import invalider_verifications
+
+logger = logging.getLogger(__name__)
+
+LARGEUR, HAUTEUR = landscape(A4)
+
+# Couleurs
+BLEU_GABON = (0 / 255, 113 / 255, 188 / 255)
+VERT_GABON = (0 / 255, 150 / 255, 57 / 255)
+OR_GABON = (255 / 255, 193 / 255, 7 / 255)
+NOIR = (0, 0, 0)
+GRIS = (0.5, 0.5, 0.5)
+
+# Largeur utile des textes centrés (les titres trop longs sont réduits)
+LARGEUR_TEXTE = LARGEUR - 200
+
+# Gabarits de formation gardés en mémoire par processus
+GABARITS_MAX = 128
+
+# Certificats lus par paquet lors d'une génération en lot
+TAILLE_LOT = 200
+
+# Durée (secondes) du verrou d'un rendu en attente : les téléchargements
+# répétés d'un certificat sans PDF ne planifient qu'une tâche
+DUREE_VERROU_RENDU = 300
+
+_polices = None
+_gabarits = OrderedDict()
+
+
+def polices():
+    """
+    (normale, grasse) : polices TrueType de settings.CERTIFICAT_POLICES
+    ({'normale': chemin, 'grasse': chemin}), enregistrées une seule fois par
+    processus ; Helvetica (police standard PDF) si le réglage est absent.
+    """
+    global _polices
+    if _polices is None:
+        chemins = getattr(settings, 'CERTIFICAT_POLICES', None)
+        if chemins:
+            pdfmetrics.registerFont(TTFont('CertificatNormale', chemins['normale']))
+            pdfmetrics.registerFont(TTFont('CertificatGrasse', chemins['grasse']))
+            _polices = ('CertificatNormale', 'CertificatGrasse')
+        else:
+            _polices = ('Helvetica', 'Helvetica-Bold')
+    return _polices
+
+
+def vider_caches():
+    """Oublie polices et gabarits (prochain rendu : enregistrement et préparation à nouveau)"""
+    global _polices
+    _polices = None
+    _gabarits.clear()
+
+
+def taille_ajustee(texte, police, taille, largeur=LARGEUR_TEXTE):
+    """Taille de police réduite jusqu'à ce que le texte tienne dans la largeur"""
+    while taille > 8 and pdfmetrics.stringWidth(texte, police, taille) > largeur:
+        taille -= 1
+    return taille
+
+
+def gabarit(formation):
+    """
+    Partie commune des certificats d'une formation : liste de textes centrés
+    (police, taille, couleur, y, texte). Mise en cache par formation et date
+    de modification.
+    """
+    cle = (formation.pk, formation.date_modification)
+    if cle in _gabarits:
+        _gabarits.move_to_end(cle)
+        return _gabarits[cle]
+    
+    normale, grasse = polices()
+    titre = f'"{formation.titre}"'
+    textes = [
+        (grasse, 24, BLEU_GABON, HAUTEUR - 80, "RÉPUBLIQUE GABONAISE"),
+        (normale, 16, VERT_GABON, HAUTEUR - 110, "Plateforme Femmes en Politique"),
+        (grasse, 32, NOIR, HAUTEUR - 180, "CERTIFICAT DE FORMATION"),
+        (normale, 18, NOIR, HAUTEUR - 250, "Il est certifié que"),
+        (normale, 18, NOIR, HAUTEUR - 330, "a suivi avec succès la formation"),
+        (grasse, taille_ajustee(titre, grasse, 20), VERT_GABON, HAUTEUR - 370, titre),
+    ]
+    details = [
+        f"Durée: {formation.duree_heures} heures",
+        f"Niveau: {formation.get_niveau_display()}",
+        f"Catégorie: {formation.get_categorie_display()}",
+    ]
+    for rang, detail in enumerate(details):
+        textes.append((normale, 14, NOIR, HAUTEUR - 420 - 25 * rang, detail))
+    
+    modele = {'textes': textes, 'y_note': HAUTEUR - 420 - 25 * len(details)}
+    _gabarits[cle] = modele
+    if len(_gabarits) > GABARITS_MAX:
+        _gabarits.popitem(last=False)
+    return modele
+
+
+def rendre_certificat(certificat):
+    """Contenu PDF (bytes) d'un certificat (inscription, formation et participante chargées)"""
+    inscription = certificat.inscription
+    modele = gabarit(inscription.formation)
+    normale, grasse = polices()
+    
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=landscape(A4), pageCompression=1)
+    p.setTitle(f"Certificat {certificat.numero_certificat}")
+    
+    for police, taille, couleur, y, texte in modele['textes']:
+        p.setFont(police, taille)
+        p.setFillColorRGB(*couleur)
+        p.drawCentredString(LARGEUR / 2, y, texte)
+    
+    # Ligne décorative
+    p.setStrokeColorRGB(*OR_GABON)
+    p.setLineWidth(3)
+    p.line(150, HAUTEUR - 200, LARGEUR - 150, HAUTEUR - 200)
+    
+    # Nom de la participante
+    nom_complet = inscription.participante.get_full_name().upper()
+    p.setFont(grasse, taille_ajustee(nom_complet, grasse, 24))
+    p.setFillColorRGB(*BLEU_GABON)
+    p.drawCentredString(LARGEUR / 2, HAUTEUR - 290, nom_complet)
+    
+    p.setFillColorRGB(*NOIR)
+    if inscription.note_finale:
+        p.setFont(normale, 14)
+        p.drawCentredString(LARGEUR / 2, modele['y_note'], f"Note obtenue: {inscription.note_finale}/100")
+    
+    # Date, numéro et signature
+    date_generation = timezone.localtime(certificat.date_generation or timezone.now())
+    p.setFont(normale, 12)
+    p.drawString(100, 120, f"Fait à Libreville, le {date_generation.strftime('%d/%m/%Y')}")
+    p.drawString(100, 100, f"Numéro: {certificat.numero_certificat}")
+    p.drawString(LARGEUR - 300, 120, "Directrice de la Formation")
+    p.drawString(LARGEUR - 300, 100, "Plateforme Femmes en Politique")
+    
+    # Zone de vérification
+    p.setStrokeColorRGB(*GRIS)
+    p.setLineWidth(1)
+    p.rect(LARGEUR - 150, 50, 100, 100)
+    p.setFont(normale, 8)
+    p.drawCentredString(LARGEUR - 100, 95, "Vérification")
+    p.drawCentredString(LARGEUR - 100, 85, certificat.hash_verification[:16])
+    
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def nom_fichier(certificat):
+    return f"{certificat.numero_certificat}.pdf"
+
+
+def stocker_pdf(certificat, contenu):
+    """Enregistre le PDF dans fichier_pdf (remplace un fichier précédent)"""
+    if certificat.fichier_pdf:
+        certificat.fichier_pdf.delete(save=False)
+    certificat.fichier_pdf.save(nom_fichier(certificat), ContentFile(contenu), save=False)
+    Certificat.objects.filter(pk=certificat.pk).update(fichier_pdf=certificat.fichier_pdf.name)
+
+
+def generer_pdfs(certificats, forcer=False):
+    """
+    Rend et stocke les PDF d'un queryset de certificats (ceux qui n'ont pas
+    encore de fichier, ou tous si forcer). Retourne des métriques.
+    """
+    if not forcer:
+        certificats = certificats.filter(fichier_pdf='')
+    certificats = certificats.filter(est_valide=True).select_related(
+        'inscription__formation', 'inscription__participante'
+    ).order_by('inscription__formation_id', 'pk')
+    
+    debut = time.perf_counter()
+    generes = echecs = 0
+    for certificat in certificats.iterator(chunk_size=TAILLE_LOT):
+        try:
+            stocker_pdf(certificat, rendre_certificat(certificat))
+            generes += 1
+        except Exception as e:
+            # Un certificat en échec n'interrompt pas le lot
+            echecs += 1
+            logger.error(f"Erreur génération PDF du certificat {certificat.numero_certificat}: {str(e)}")
+    duree = time.perf_counter() - debut
+    
+    return {
+        'generes': generes,
+        'echecs': echecs,
+        'duree_secondes': round(duree, 3),
+        'certificats_par_seconde': round(generes / duree, 1) if duree else 0,
+    }
+
+
+def cle_verrou_rendu(certificat_id):
+    return f'certificat_pdf_{certificat_id}_verrou'
+
+
+def planifier_pdf(certificat_id):
+    """
+    Lance le rendu du PDF d'un certificat en tâche de fond, sauf si un
+    rendu est déjà en attente. Sans file de tâches, le PDF est rendu sur
+    place. Retourne vrai si le PDF a été rendu sur place.
+    """
+    verrou = cle_verrou_rendu(certificat_id)
+    if not cache.add(verrou, True, DUREE_VERROU_RENDU):
+        return False
+    
+    from .tasks import generer_certificat_pdf
+    try:
+        generer_certificat_pdf.delay(certificat_id)
+        return False
+    except Exception as e:
+        logger.warning(f"Rendu du certificat {certificat_id} non planifié, rendu sur place: {str(e)}")
+        try:
+            generer_pdfs(Certificat.objects.filter(pk=certificat_id))
+        finally:
+            cache.delete(verrou)
+        return True
+
+
+def planifier_pdfs_formation(formation_id, forcer=False):
+    """Lance le rendu des PDF d'une formation en tâche de fond ; sans file de tâches, les rend sur place"""
+    from .tasks import generer_certificats_formation
+    try:
+        generer_certificats_formation.delay(formation_id, forcer=forcer)
+    except Exception as e:
+        logger.warning(f"Rendu des certificats de la formation {formation_id} non planifié, rendu sur place: {str(e)}")
+        generer_pdfs(Certificat.objects.filter(inscription__formation_id=formation_id), forcer=forcer)
+
+
+def creer_certificats(formation):
+    """
+    Crée en un INSERT groupé les certificats manquants des inscriptions
+    terminées qui y ont droit. Retourne les certificats créés.
+    """
+    inscriptions = InscriptionFormation.objects.filter(
+        formation=formation,
+        statut='terminee',
+        certificat__isnull=True
+    ).select_related('formation', 'participante')
+    
+    certificats = []
+    for inscription in inscriptions:
+        if not inscription.peut_obtenir_certificat():
+            continue
+        # Date fixée avant le hash, qui l'inclut (auto_now_add n'intervient qu'à l'INSERT)
+        certificat = Certificat(inscription=inscription, est_valide=True, date_generation=timezone.now())
+        certificat.generer_numero()
+        certificat.generer_hash()
+        certificats.append(certificat)
+    
+    crees = Certificat.objects.bulk_create(certificats, batch_size=500)
+    # bulk_create n'envoie pas post_save : oublier d'éventuels « introuvable » en cache
+    invalider_verifications(crees)
+    return crees
+
+
+def reponse_telechargement(certificat):
+    """
+    Réponse de téléchargement du PDF sans le charger en mémoire : déléguée
+    au serveur web (X-Accel-Redirect vers l'URL media interne) si
+    settings.CERTIFICATS_X_ACCEL_REDIRECT est actif, sinon FileResponse.
+    """
+    if getattr(settings, 'CERTIFICATS_X_ACCEL_REDIRECT', False):
+        reponse = HttpResponse(content_type='application/pdf')
+        reponse['X-Accel-Redirect'] = certificat.fichier_pdf.url
+        reponse['Content-Disposition'] = content_disposition_header(True, nom_fichier(certificat))
+        return reponse
+    
+    return FileResponse(
+        certificat.fichier_pdf.open('rb'),
+        as_attachment=True,
+        filename=nom_fichier(certificat),
+        content_type='application/pdf'
+    )
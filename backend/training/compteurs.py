@@ -0,0 +1,136 @@
+# ============================================================================
+# backend/training/compteurs.py
+# ============================================================================
+"""
+Compteurs dénormalisés des formations
+Places occupées, nombre de modules et somme / nombre des évaluations sont
+ajustés par des UPDATE ... SET champ = champ + delta (expressions F) dans
+la transaction de l'écriture de l'inscription ou du module.
+"""
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import Formation, InscriptionFormation, ModuleFormation, STATUTS_PLACES_OCCUPEES
+
+
+# Champs d'une inscription dont dépendent les compteurs
+CHAMPS_INSCRIPTION = {'formation', 'formation_id', 'statut', 'evaluation_formation'}
+
+
+def contributions_inscription(inscription):
+    """{formation_id: {compteur: valeur}} apporté par une inscription"""
+    return {inscription.formation_id: {
+        'places_occupees': int(inscription.statut in STATUTS_PLACES_OCCUPEES),
+        'somme_evaluations': inscription.evaluation_formation or 0,
+        'nb_evaluations': int(inscription.evaluation_formation is not None),
+    }}
+
+
+def contributions_module(module):
+    return {module.formation_id: {'nb_modules': 1}}
+
+
+def appliquer_deltas(anciennes, nouvelles):
+    """Applique la différence entre deux contributions, un UPDATE par formation touchée"""
+    for formation_id in set(anciennes) | set(nouvelles):
+        avant = anciennes.get(formation_id, {})
+        apres = nouvelles.get(formation_id, {})
+        deltas = {
+            champ: apres.get(champ, 0) - avant.get(champ, 0)
+            for champ in set(avant) | set(apres)
+        }
+        valeurs = {
+            # Greatest : un compteur désynchronisé ne passe jamais sous zéro
+            champ: Greatest(F(champ) + delta, 0) if delta < 0 else F(champ) + delta
+            for champ, delta in deltas.items() if delta
+        }
+        if valeurs:
+            Formation.objects.filter(pk=formation_id).update(**valeurs)
+
+
+def memoriser_inscription(sender, instance, update_fields=None, **kwargs):
+    """Mémorise la contribution de l'inscription telle qu'elle est en base"""
+    if update_fields is not None and not CHAMPS_INSCRIPTION.intersection(update_fields):
+        # Sauvegarde partielle sans effet sur les compteurs (ex. progression)
+        instance._contributions_compteurs = None
+        return
+    
+    instance._contributions_compteurs = {}
+    if instance.pk and not instance._state.adding:
+        ancienne = InscriptionFormation.objects.filter(pk=instance.pk).values(
+            'formation_id', 'statut', 'evaluation_formation'
+        ).first()
+        if ancienne is not None:
+            instance._contributions_compteurs = contributions_inscription(
+                InscriptionFormation(**ancienne)
+            )
+
+
+def maj_compteurs_inscription(sender, instance, **kwargs):
+    anciennes = getattr(instance, '_contributions_compteurs', None)
+    if anciennes is None:
+        return
+    appliquer_deltas(anciennes, contributions_inscription(instance))
+    instance._contributions_compteurs = None
+
+
+def retirer_inscription(sender, instance, **kwargs):
+    appliquer_deltas(contributions_inscription(instance), {})
+
+
+def memoriser_module(sender, instance, **kwargs):
+    instance._contributions_compteurs = {}
+    if instance.pk and not instance._state.adding:
+        formation_id = ModuleFormation.objects.filter(pk=instance.pk).values_list(
+            'formation_id', flat=True
+        ).first()
+        if formation_id is not None:
+            instance._contributions_compteurs = {formation_id: {'nb_modules': 1}}
+
+
+def maj_compteurs_module(sender, instance, **kwargs):
+    appliquer_deltas(getattr(instance, '_contributions_compteurs', {}), contributions_module(instance))
+    instance._contributions_compteurs = {}
+
+
+def retirer_module(sender, instance, **kwargs):
+    appliquer_deltas(contributions_module(instance), {})
+
+
+def recalculer_compteurs(formations=None):
+    """
+    Recalcule les compteurs depuis les inscriptions et modules réels.
+    Retourne le nombre de formations corrigées.
+    """
+    queryset = Formation.objects.all() if formations is None else formations
+    reels = {
+        'places_occupees': queryset.annotate(
+            valeur=Count('inscriptions', filter=Q(inscriptions__statut__in=STATUTS_PLACES_OCCUPEES))
+        ),
+        'nb_modules': queryset.annotate(valeur=Count('modules')),
+        'somme_evaluations': queryset.annotate(
+            valeur=Coalesce(Sum('inscriptions__evaluation_formation'), 0)
+        ),
+        'nb_evaluations': queryset.annotate(valeur=Count('inscriptions__evaluation_formation')),
+    }
+    
+    # Un agrégat par compteur : les jointures inscriptions x modules multiplieraient les lignes
+    corrections = {}
+    for champ, annotes in reels.items():
+        ecarts = annotes.exclude(**{champ: F('valeur')}).values_list('pk', 'valeur')
+        for formation_id, valeur in ecarts:
+            corrections.setdefault(formation_id, {})[champ] = valeur
+    
+    for formation_id, valeurs in corrections.items():
+        Formation.objects.filter(pk=formation_id).update(**valeurs)
+    
+    return len(corrections)
+
+
+pre_save.connect(memoriser_inscription, sender=InscriptionFormation, dispatch_uid='training_compteurs_inscription_pre_save')
+post_save.connect(maj_compteurs_inscription, sender=InscriptionFormation, dispatch_uid='training_compteurs_inscription_save')
+post_delete.connect(retirer_inscription, sender=InscriptionFormation, dispatch_uid='training_compteurs_inscription_delete')
+pre_save.connect(memoriser_module, sender=ModuleFormation, dispatch_uid='training_compteurs_module_pre_save')
+post_save.connect(maj_compteurs_module, sender=ModuleFormation, dispatch_uid='training_compteurs_module_save')
+post_delete.connect(retirer_module, sender=ModuleFormation, dispatch_uid='training_compteurs_module_delete')
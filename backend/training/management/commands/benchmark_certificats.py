@@ -0,0 +1,139 @@
+# ============================================================================
+# backend/training/management/commands/benchmark_certificats.py
+# ============================================================================
+"""
+Commande de mesure du débit de génération des certificats PDF
+Crée une cohorte de participantes ayant terminé une formation, crée leurs
+certificats en lot puis mesure le rendu (certificats/s), avec et sans
+réutilisation des polices et du gabarit de la formation
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from training import certificats as rendu
+from training.models import Certificat, Formation, InscriptionFormation
+
+User = get_user_model()
+
+# Préfixe des données créées par le benchmark (purgées avant et après)
+PREFIXE = 'benchcert_'
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit de génération des certificats PDF d'une cohorte (certificats/s)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--cohorte', type=int, default=300, help='Participantes de la cohorte')
+        parser.add_argument(
+            '--polices',
+            nargs=2,
+            metavar=('NORMALE', 'GRASSE'),
+            help='Fichiers TrueType à enregistrer (sinon Helvetica)',
+        )
+        parser.add_argument(
+            '--garder',
+            action='store_true',
+            help='Conserve la cohorte et les PDF générés après la mesure',
+        )
+    
+    def handle(self, *args, **options):
+        if options['polices']:
+            normale, grasse = options['polices']
+            settings.CERTIFICAT_POLICES = {'normale': normale, 'grasse': grasse}
+        
+        self.purger()
+        try:
+            formation = self.creer_cohorte(options['cohorte'])
+            
+            debut = time.perf_counter()
+            crees = rendu.creer_certificats(formation)
+            self.stdout.write(
+                f"{len(crees)} certificats créés en {(time.perf_counter() - debut) * 1000:.0f} ms"
+            )
+            
+            certificats = list(
+                Certificat.objects.filter(inscription__formation=formation).select_related(
+                    'inscription__formation', 'inscription__participante'
+                )
+            )
+            
+            # Rendu seul : polices et gabarit réinitialisés à chaque certificat
+            # (comportement d'un rendu synchrone par requête) puis réutilisés
+            self.stdout.write(f"{'mode':<40}{'certificats/s':>14}{'ko/PDF':>9}")
+            for libelle, reutiliser in [('rendu, sans réutilisation', False), ('rendu, polices et gabarit réutilisés', True)]:
+                taille = 0
+                debut = time.perf_counter()
+                for certificat in certificats:
+                    if not reutiliser:
+                        rendu.vider_caches()
+                    taille += len(rendu.rendre_certificat(certificat))
+                duree = time.perf_counter() - debut
+                self.stdout.write(
+                    f"{libelle:<40}{len(certificats) / duree:>14.1f}{taille / len(certificats) / 1024:>9.1f}"
+                )
+            
+            # Chaîne complète de la tâche : lecture par paquets, rendu et stockage
+            metriques = rendu.generer_pdfs(Certificat.objects.filter(inscription__formation=formation))
+            self.stdout.write(
+                f"{'tâche (rendu + stockage)':<40}{metriques['certificats_par_seconde']:>14.1f}"
+                f"   {metriques['generes']} générés, {metriques['echecs']} erreurs"
+            )
+        finally:
+            if not options['garder']:
+                self.purger()
+    
+    def creer_cohorte(self, nombre):
+        now = timezone.now()
+        
+        User.objects.bulk_create([
+            User(
+                username=f'{PREFIXE}{numero}',
+                email=f'{PREFIXE}{numero}@benchmark.invalid',
+                nip=f'BCERT{numero:07d}',
+                first_name='Bench',
+                last_name=str(numero),
+                region='estuaire',
+                statut_validation='validee',
+                password='!'
+            )
+            for numero in range(nombre)
+        ], batch_size=1000)
+        participantes = list(User.objects.filter(username__startswith=PREFIXE).order_by('pk'))
+        
+        formation = Formation.objects.create(
+            titre=f'{PREFIXE}formation',
+            description='Formation de mesure des certificats',
+            categorie='leadership',
+            duree_heures=12,
+            max_participants=nombre,
+            date_debut=now - timedelta(days=30),
+            date_fin=now - timedelta(days=1),
+            lieu='Libreville',
+            formateur_nom='Benchmark',
+            status='active',
+            created_by=participantes[0]
+        )
+        InscriptionFormation.objects.bulk_create([
+            InscriptionFormation(
+                formation=formation,
+                participante=participante,
+                statut='terminee',
+                progression=100,
+                date_completion=now
+            )
+            for participante in participantes
+        ], batch_size=1000)
+        return formation
+    
+    def purger(self):
+        """Supprime les données et fichiers d'un précédent benchmark"""
+        certificats = Certificat.objects.filter(inscription__formation__titre__startswith=PREFIXE)
+        for certificat in certificats.exclude(fichier_pdf=''):
+            certificat.fichier_pdf.delete(save=False)
+        Formation.objects.filter(titre__startswith=PREFIXE).delete()
+        User.objects.filter(username__startswith=PREFIXE).delete()
@@ -0,0 +1,28 @@
+# ============================================================================
+# backend/training/management/commands/recalculer_compteurs_formations.py
+# ============================================================================
+"""
+Commande de reconstruction des compteurs dénormalisés des formations
+(places occupées, modules, évaluations)
+"""
+from django.core.management.base import BaseCommand
+
+from training.compteurs import recalculer_compteurs
+from training.models import Formation
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs dénormalisés des formations depuis les inscriptions et modules"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--formation', action='append', help='Limite à une formation (id, répétable)')
+    
+    def handle(self, *args, **options):
+        formations = Formation.objects.all()
+        if options['formation']:
+            formations = formations.filter(pk__in=options['formation'])
+        
+        corrigees = recalculer_compteurs(formations)
+        self.stdout.write(
+            self.style.SUCCESS(f"{corrigees} formation(s) corrigée(s) sur {formations.count()}")
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:56
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def initialiser_compteurs(apps, schema_editor):
+    Formation = apps.get_model('training', 'Formation')
+    reels = {
+        'places_occupees': Count('inscriptions', filter=Q(inscriptions__statut__in=['confirmee', 'en_cours', 'terminee'])),
+        'nb_modules': Count('modules'),
+        'somme_evaluations': Sum('inscriptions__evaluation_formation'),
+        'nb_evaluations': Count('inscriptions__evaluation_formation'),
+    }
+    for champ, agregat in reels.items():
+        formations = Formation.objects.annotate(valeur=agregat).filter(valeur__gt=0)
+        for formation_id, valeur in formations.values_list('pk', 'valeur'):
+            Formation.objects.filter(pk=formation_id).update(**{champ: valeur})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formation',
+            name='nb_evaluations',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'évaluations"),
+        ),
+        migrations.AddField(
+            model_name='formation',
+            name='nb_modules',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de modules'),
+        ),
+        migrations.AddField(
+            model_name='formation',
+            name='places_occupees',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Inscriptions confirmées, en cours ou terminées', verbose_name='Places occupées'),
+        ),
+        migrations.AddField(
+            model_name='formation',
+            name='somme_evaluations',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Somme des évaluations'),
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0002_formation_compteurs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certificat',
+            name='hash_verification',
+            field=models.CharField(max_length=64, unique=True, verbose_name='Hash de vérification'),
+        ),
+    ]
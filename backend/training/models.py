@@ -5,7 +5,7 @@
 Modèles pour le module de formation
 CORRECTION: Remplacement des lambdas par des fonctions nommées
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.utils import timezone
@@ -16,6 +16,12 @@ import uuid
 
 User = get_user_model()
 
+# Statuts d'inscription qui occupent une place dans une formation
+STATUTS_PLACES_OCCUPEES = ['confirmee', 'en_cours', 'terminee']
+
+# Compteurs dénormalisés de Formation, maintenus par training.compteurs
+CHAMPS_COMPTEURS = ['places_occupees', 'nb_modules', 'somme_evaluations', 'nb_evaluations']
+
 
 def default_empty_list():
     """Fonction pour générer une liste vide par défaut"""
@@ -120,6 +126,17 @@ class Formation(models.Model):
     status = models.CharField(max_length=20, choices=STATUTS, default='brouillon', verbose_name="Statut")
     est_featured = models.BooleanField(default=False, verbose_name="Formation mise en avant")
     
+    # Compteurs dénormalisés (training.compteurs)
+    places_occupees = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Places occupées",
+        help_text="Inscriptions confirmées, en cours ou terminées"
+    )
+    nb_modules = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre de modules")
+    somme_evaluations = models.PositiveIntegerField(default=0, editable=False, verbose_name="Somme des évaluations")
+    nb_evaluations = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'évaluations")
+    
     # Relations
     created_by = models.ForeignKey(
         User, 
@@ -166,15 +183,32 @@ class Formation(models.Model):
         if not self.date_limite_inscription:
             self.date_limite_inscription = self.date_debut - timedelta(days=1)
         
+        # Ne jamais réécrire les compteurs avec des valeurs périmées :
+        # ils ne sont modifiés que par les UPDATE de training.compteurs
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in CHAMPS_COMPTEURS
+            ]
+        
         super().save(*args, **kwargs)
     
+    @property
+    def nb_participants(self):
+        """Nombre de participants confirmés, en cours ou ayant terminé"""
+        return self.places_occupees
+    
     @property
     def places_disponibles(self):
         """Nombre de places disponibles"""
-        inscriptions_confirmees = self.inscriptions.filter(
-            statut__in=['confirmee', 'en_cours', 'terminee']
-        ).count()
-        return max(0, self.max_participants - inscriptions_confirmees)
+        return max(0, self.max_participants - self.places_occupees)
+    
+    @property
+    def evaluation_moyenne(self):
+        """Évaluation moyenne (1-5) ou None sans évaluation"""
+        if not self.nb_evaluations:
+            return None
+        return round(self.somme_evaluations / self.nb_evaluations, 2)
     
     @property
     def est_complete(self):
@@ -253,6 +287,15 @@ class ModuleFormation(models.Model):
     
     def __str__(self):
         return f"{self.formation.titre} - Module {self.ordre}: {self.titre}"
+    
+    def save(self, *args, **kwargs):
+        # Le compteur de modules de la formation est mis à jour dans la même transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
 
 # Alias pour compatibilité avec l'ancien nom
@@ -345,13 +388,20 @@ class InscriptionFormation(models.Model):
         return f"{self.participante.get_full_name()} - {self.formation.titre}"
     
     def calculer_progression(self):
-        """Calcule la progression basée sur les modules complétés"""
-        total_modules = self.formation.modules.count()
+        """
+        Calcule la progression basée sur les modules complétés
+        (même règle que training.progression, qui la recalcule en masse)
+        """
+        total_modules = self.formation.nb_modules
         if total_modules == 0:
             return 100 if self.statut == 'terminee' else 0
         
-        modules_completes = self.modules_completes.count()
-        return round((modules_completes / total_modules) * 100, 2)
+        # Une inscription pas encore enregistrée n'a aucun module complété
+        if self._state.adding:
+            return 0
+        
+        modules_completes = self.modules_completes.filter(formation_id=self.formation_id).count()
+        return modules_completes * 100 // total_modules
     
     def peut_obtenir_certificat(self):
         """Vérifie si l'inscription peut obtenir un certificat"""
@@ -367,12 +417,20 @@ class InscriptionFormation(models.Model):
         return True
     
     def save(self, *args, **kwargs):
-        # Calculer automatiquement la progression
-        super().save(*args, **kwargs)
-        nouvelle_progression = self.calculer_progression()
-        if nouvelle_progression != self.progression:
-            self.progression = nouvelle_progression
-            super().save(update_fields=['progression'])
+        # Les compteurs de la formation sont mis à jour dans la même transaction
+        with transaction.atomic():
+            # Calculer automatiquement la progression, écrite avec le reste de la ligne
+            # (les changements de modules_completes passent par training.progression)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or 'statut' in update_fields:
+                self.progression = self.calculer_progression()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'progression'}
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
 
 class Certificat(models.Model):
@@ -387,7 +445,7 @@ class Certificat(models.Model):
     
     # Identification
     numero_certificat = models.CharField(max_length=50, unique=True, verbose_name="Numéro de certificat")
-    hash_verification = models.CharField(max_length=64, verbose_name="Hash de vérification")
+    hash_verification = models.CharField(max_length=64, unique=True, verbose_name="Hash de vérification")
     
     # Dates
     date_generation = models.DateTimeField(auto_now_add=True, verbose_name="Date de génération")
@@ -413,8 +471,11 @@ class Certificat(models.Model):
         if not self.numero_certificat:
             self.generer_numero()
         
-        # Générer le hash de vérification
+        # Générer le hash de vérification (la date de génération en fait partie :
+        # fixée avant, auto_now_add ne la renseignant qu'à l'INSERT)
         if not self.hash_verification:
+            if not self.date_generation:
+                self.date_generation = timezone.now()
             self.generer_hash()
         
         super().save(*args, **kwargs)
@@ -423,9 +484,11 @@ class Certificat(models.Model):
         """Génère un numéro de certificat unique"""
         timestamp = timezone.now().strftime('%Y%m%d')
         formation_code = self.inscription.formation.categorie.upper()[:3]
-        user_id = str(self.inscription.participante.id)[:4].zfill(4)
+        # L'inscription (un certificat au plus) rend le numéro unique ; un
+        # identifiant de participante tronqué produisait des doublons
+        inscription_id = str(self.inscription_id).zfill(6)
         
-        self.numero_certificat = f"CERT-{formation_code}-{timestamp}-{user_id}"
+        self.numero_certificat = f"CERT-{formation_code}-{timestamp}-{inscription_id}"
     
     def generer_hash(self):
         """Génère un hash de vérification"""
@@ -0,0 +1,91 @@
+# ============================================================================
+# backend/training/progression.py
+# ============================================================================
+"""
+Progression des inscriptions aux formations
+La progression (pourcentage de modules complétés) d'une ou de plusieurs
+inscriptions est recalculée par un seul UPDATE, les modules complétés
+étant comptés par sous-requête sur la table de liaison.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+
+from api.conditionnel import marquer_modification
+from .models import Formation, InscriptionFormation
+
+# Table de liaison inscription <-> modules complétés
+ModuleComplete = InscriptionFormation.modules_completes.through
+
+
+def expression_progression():
+    """
+    Progression d'une inscription en expression SQL : modules complétés de
+    sa formation * 100 / nombre de modules (division entière, comme la
+    colonne), ou 100 / 0 selon le statut pour une formation sans module.
+    """
+    completes = ModuleComplete.objects.filter(
+        inscriptionformation_id=OuterRef('pk'),
+        moduleformation__formation_id=OuterRef('formation_id')
+    ).order_by().values('inscriptionformation_id').annotate(
+        nombre=Count('pk')
+    ).values('nombre')
+    total = Formation.objects.filter(pk=OuterRef('formation_id')).values('nb_modules')
+    
+    nb_completes = Coalesce(Subquery(completes, output_field=IntegerField()), Value(0))
+    nb_modules = Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+    
+    return Case(
+        When(
+            Exact(nb_modules, 0),
+            then=Case(When(statut='terminee', then=Value(100)), default=Value(0))
+        ),
+        default=nb_completes * 100 / nb_modules,
+        output_field=IntegerField()
+    )
+
+
+def recalculer_progression(inscriptions):
+    """
+    Recalcule la progression d'un queryset d'inscriptions en un UPDATE.
+    Retourne le nombre d'inscriptions mises à jour.
+    """
+    formations = set(inscriptions.values_list('formation_id', flat=True).distinct())
+    nombre = InscriptionFormation.objects.filter(
+        pk__in=inscriptions.values('pk')
+    ).update(progression=expression_progression())
+    
+    # update() ne déclenche pas les signaux : invalider les validateurs HTTP
+    if formations:
+        marquer_modification(*[f'formation_{formation_id}' for formation_id in formations])
+    return nombre
+
+
+def completer_module(module, inscriptions):
+    """
+    Marque un module complété pour un ensemble d'inscriptions de sa
+    formation (un INSERT groupé, les liaisons existantes sont ignorées),
+    puis recalcule leur progression. Retourne le nombre d'inscriptions
+    pour lesquelles le module vient d'être complété.
+    """
+    inscriptions = inscriptions.filter(formation_id=module.formation_id)
+    
+    with transaction.atomic():
+        deja = set(
+            ModuleComplete.objects.filter(
+                moduleformation_id=module.pk,
+                inscriptionformation_id__in=inscriptions.values('pk')
+            ).values_list('inscriptionformation_id', flat=True)
+        )
+        nouvelles = [
+            ModuleComplete(inscriptionformation_id=inscription_id, moduleformation_id=module.pk)
+            for inscription_id in inscriptions.values_list('pk', flat=True)
+            if inscription_id not in deja
+        ]
+        ModuleComplete.objects.bulk_create(nouvelles, batch_size=500, ignore_conflicts=True)
+        
+        if nouvelles:
+            recalculer_progression(inscriptions)
+    
+    return len(nouvelles)
@@ -7,6 +7,7 @@ CORRECTION: Création des serializers manquants
 """
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from django.utils import timezone
 from django.db.models import Count, Avg
 
@@ -86,10 +87,8 @@ class FormationSerializer(serializers.ModelSerializer):
         ]
     
     def get_nb_participants(self, obj):
-        """Nombre de participants inscrits"""
-        return obj.inscriptions.filter(
-            statut__in=['confirmee', 'en_cours', 'terminee']
-        ).count()
+        """Nombre de participants inscrits (compteur dénormalisé)"""
+        return obj.nb_participants
     
     def get_places_disponibles(self, obj):
         """Nombre de places disponibles"""
@@ -114,17 +113,12 @@ class FormationSerializer(serializers.ModelSerializer):
         return False
     
     def get_evaluation_moyenne(self, obj):
-        """Calcule l'évaluation moyenne de la formation"""
-        evaluations = obj.inscriptions.filter(evaluation_formation__isnull=False)
-        if evaluations.exists():
-            return round(evaluations.aggregate(
-                moyenne=Avg('evaluation_formation')
-            )['moyenne'], 2)
-        return None
+        """Évaluation moyenne de la formation (compteurs dénormalisés)"""
+        return obj.evaluation_moyenne
     
     def get_nb_modules(self, obj):
-        """Nombre de modules dans la formation"""
-        return obj.modules.count()
+        """Nombre de modules dans la formation (compteur dénormalisé)"""
+        return obj.nb_modules
     
     def validate(self, data):
         """Validation personnalisée"""
@@ -314,7 +308,7 @@ class CertificatSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request:
             return request.build_absolute_uri(
-                f'/api/training/certificats/{obj.id}/verifier/'
+                reverse('training:verification-certificat', args=[obj.numero_certificat])
             )
         return None
 
@@ -338,11 +332,11 @@ class FormationListSerializer(serializers.ModelSerializer):
     
     def get_nb_participants(self, obj):
         """Nombre de participants"""
-        return getattr(obj, 'nb_participants', 0)
+        return obj.nb_participants
     
     def get_evaluation_moyenne(self, obj):
         """Évaluation moyenne"""
-        return getattr(obj, 'evaluation_moyenne', None)
+        return obj.evaluation_moyenne
 
 
 class FormationStatsSerializer(serializers.Serializer):
@@ -0,0 +1,45 @@
+# ============================================================================
+# backend/training/tasks.py
+# ============================================================================
+"""
+Tâches asynchrones pour le module formation
+Rendu des certificats PDF
+"""
+from celery import shared_task
+from django.core.cache import cache
+import logging
+
+from .models import Certificat
+from .certificats import cle_verrou_rendu, generer_pdfs
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generer_certificat_pdf(certificat_id, forcer=False):
+    """Rend et stocke le PDF d'un certificat"""
+    try:
+        metriques = generer_pdfs(Certificat.objects.filter(pk=certificat_id), forcer=forcer)
+    finally:
+        # Un nouveau rendu peut être planifié (ex. après un échec)
+        cache.delete(cle_verrou_rendu(certificat_id))
+    
+    if metriques['echecs']:
+        logger.warning(f"Certificat {certificat_id}: PDF non généré")
+    return metriques
+
+
+@shared_task
+def generer_certificats_formation(formation_id, forcer=False):
+    """Rend les PDF manquants (ou tous si forcer) des certificats d'une formation"""
+    metriques = generer_pdfs(
+        Certificat.objects.filter(inscription__formation_id=formation_id),
+        forcer=forcer
+    )
+    
+    logger.info(
+        f"Certificats de la formation {formation_id}: {metriques['generes']} générés, "
+        f"{metriques['echecs']} erreurs en {metriques['duree_secondes']}s "
+        f"({metriques['certificats_par_seconde']} certificats/s)"
+    )
+    return metriques
@@ -0,0 +1,21 @@
+# ============================================================================
+# backend/training/throttles.py
+# ============================================================================
+"""
+Limitation de débit de la vérification publique des certificats
+"""
+from api.throttles import ThrottleParIP
+
+
+class VerificationCertificatThrottle(ThrottleParIP):
+    """Vérifications unitaires"""
+    
+    scope = 'verification_certificats'
+    rythme_defaut = '120/minute'
+
+
+class VerificationLotThrottle(ThrottleParIP):
+    """Vérifications groupées (jusqu'à LOT_MAX certificats par requête)"""
+    
+    scope = 'verification_certificats_lot'
+    rythme_defaut = '20/minute'
@@ -13,7 +13,11 @@ app_name = 'training'
 router = DefaultRouter()
 router.register(r'formations', views.FormationViewSet, basename='formation')
 router.register(r'inscriptions', views.InscriptionFormationViewSet, basename='inscription')
+router.register(r'certificats', views.CertificatViewSet, basename='certificat')
 
 urlpatterns = [
+    # Vérification publique des certificats
+    path('verification/lot/', views.CertificatVerificationLotView.as_view(), name='verification-certificats-lot'),
+    path('verification/<str:identifiant>/', views.CertificatVerificationView.as_view(), name='verification-certificat'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,140 @@
+# ============================================================================
+# backend/training/verification.py
+# ============================================================================
+"""
+Vérification publique des certificats
+Un certificat se vérifie par son numéro ou son hash de vérification (deux
+colonnes uniques). Les résultats, y compris « introuvable », sont mis en
+cache et invalidés à chaque écriture du certificat ; la validité
+(invalidation, expiration) est évaluée à chaque réponse.
+"""
+import hashlib
+import re
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Certificat
+
+
+# Durées de vie (secondes) des résultats en cache
+DUREE_CACHE_VERIFICATION = 3600
+DUREE_CACHE_INTROUVABLE = 300
+
+# Nombre maximal de certificats par vérification groupée
+LOT_MAX = 500
+
+MOTIF_HASH = re.compile(r'[0-9a-f]{64}')
+
+
+def normaliser(identifiant):
+    """(champ, valeur) : hash de vérification (64 hexadécimaux) ou numéro de certificat"""
+    identifiant = str(identifiant).strip()
+    if MOTIF_HASH.fullmatch(identifiant.lower()):
+        return 'hash_verification', identifiant.lower()
+    return 'numero_certificat', identifiant.upper()
+
+
+def cle_cache(champ, valeur):
+    empreinte = hashlib.md5(valeur.encode()).hexdigest()
+    return f'certificat_verification_{champ}_{empreinte}'
+
+
+def donnees_certificat(certificat):
+    """Données publiques d'un certificat (inscription, formation et participante chargées)"""
+    return {
+        'numero': certificat.numero_certificat,
+        'formation': certificat.inscription.formation.titre,
+        'participante': certificat.inscription.participante.get_full_name(),
+        'date_obtention': certificat.date_generation,
+        'date_expiration': certificat.date_expiration,
+        'est_valide': certificat.est_valide,
+        'raison_invalidation': certificat.raison_invalidation,
+    }
+
+
+def resultat(donnees):
+    """Résultat de vérification à partir des données en cache (None : introuvable)"""
+    if not donnees:
+        return {'trouve': False, 'valide': False, 'message': 'Certificat introuvable'}
+    
+    expire = bool(donnees['date_expiration'] and timezone.now() > donnees['date_expiration'])
+    valide = donnees['est_valide'] and not expire
+    if valide:
+        message = 'Certificat authentique et valide'
+    elif not donnees['est_valide']:
+        message = 'Certificat invalidé'
+    else:
+        message = 'Certificat expiré'
+    
+    return {
+        'trouve': True,
+        'valide': valide,
+        'est_expire': expire,
+        'message': message,
+        **{champ: valeur for champ, valeur in donnees.items() if champ != 'est_valide'},
+    }
+
+
+def verifier_certificats(identifiants):
+    """
+    Vérifie une liste de numéros et/ou hashes : lecture groupée du cache
+    puis une requête pour les absents. Retourne {identifiant: résultat}.
+    """
+    demandes = {identifiant: normaliser(identifiant) for identifiant in identifiants}
+    cles = {cle_cache(*demande): demande for demande in set(demandes.values())}
+    
+    en_cache = cache.get_many(list(cles))
+    manquants = [demande for cle, demande in cles.items() if cle not in en_cache]
+    
+    if manquants:
+        filtre = Q()
+        for champ in ('numero_certificat', 'hash_verification'):
+            valeurs = [valeur for nom, valeur in manquants if nom == champ]
+            if valeurs:
+                filtre |= Q(**{f'{champ}__in': valeurs})
+        
+        trouves = {}
+        certificats = Certificat.objects.filter(filtre).select_related(
+            'inscription__formation', 'inscription__participante'
+        )
+        for certificat in certificats:
+            donnees = donnees_certificat(certificat)
+            trouves[('numero_certificat', certificat.numero_certificat.upper())] = donnees
+            trouves[('hash_verification', certificat.hash_verification.lower())] = donnees
+        
+        # Les introuvables sont mémorisés (False) moins longtemps
+        nouveaux = {cle_cache(*demande): trouves.get(demande, False) for demande in manquants}
+        cache.set_many({cle: donnees for cle, donnees in nouveaux.items() if donnees}, DUREE_CACHE_VERIFICATION)
+        cache.set_many({cle: donnees for cle, donnees in nouveaux.items() if not donnees}, DUREE_CACHE_INTROUVABLE)
+        en_cache.update(nouveaux)
+    
+    return {
+        identifiant: resultat(en_cache.get(cle_cache(*demande)))
+        for identifiant, demande in demandes.items()
+    }
+
+
+def verifier_certificat(identifiant):
+    return verifier_certificats([identifiant])[identifiant]
+
+
+def invalider_verifications(certificats):
+    """Oublie les résultats en cache (y compris « introuvable ») de ces certificats"""
+    cles = []
+    for certificat in certificats:
+        cles.append(cle_cache('numero_certificat', certificat.numero_certificat.upper()))
+        cles.append(cle_cache('hash_verification', certificat.hash_verification.lower()))
+    if cles:
+        cache.delete_many(cles)
+
+
+def invalider_verification(sender, instance, **kwargs):
+    """Certificat modifié (dont est_valide) ou supprimé"""
+    invalider_verifications([instance])
+
+
+post_save.connect(invalider_verification, sender=Certificat, dispatch_uid='training_verification_save')
+post_delete.connect(invalider_verification, sender=Certificat, dispatch_uid='training_verification_delete')
@@ -8,12 +8,20 @@ CORRECTION: Import du bon modèle ModuleFormation
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db import transaction
 from django.db.models import Count, Avg, Q
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
 # CORRECTION: Import des bons modèles
 from .models import Formation, InscriptionFormation, Certificat, ModuleFormation
+from api.conditionnel import RetrieveConditionnelMixin
+from api.statistiques import totaux
+from .certificats import creer_certificats, planifier_pdf, planifier_pdfs_formation, reponse_telechargement
+from .progression import completer_module
+from .throttles import VerificationCertificatThrottle, VerificationLotThrottle
+from .verification import LOT_MAX, verifier_certificat, verifier_certificats
 from .serializers import (
     FormationSerializer, 
     InscriptionFormationSerializer, 
@@ -23,7 +31,7 @@ from .serializers import (
 )
 
 
-class FormationViewSet(viewsets.ModelViewSet):
+class FormationViewSet(RetrieveConditionnelMixin, viewsets.ModelViewSet):
     """ViewSet pour la gestion des formations."""
     serializer_class = FormationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -54,6 +62,17 @@ class FormationViewSet(viewsets.ModelViewSet):
             return FormationDetailSerializer
         return FormationSerializer
     
+    def ressources_conditionnelles(self, formation):
+        """Inscriptions et modules de la formation entrent dans ses validateurs HTTP."""
+        return [f'formation_{formation.pk}']
+    
+    def contenu_publie(self, formation):
+        return formation.status == 'active'
+    
+    def echeances_conditionnelles(self, formation):
+        """Début, fin et date limite d'inscription (est_ouverte, peut_s_inscrire)"""
+        return [formation.date_debut, formation.date_fin, formation.date_limite_inscription]
+    
     @action(detail=True, methods=['post'])
     def inscrire(self, request, pk=None):
         """Permet à un utilisateur de s'inscrire à une formation."""
@@ -94,6 +113,82 @@ class FormationViewSet(viewsets.ModelViewSet):
             'inscription': InscriptionFormationSerializer(inscription).data
         }, status=status.HTTP_201_CREATED)
     
+    @action(detail=True, methods=['post'])
+    def completer_module(self, request, pk=None):
+        """
+        Marque un module complété pour une cohorte (réservé à la créatrice de
+        la formation et à l'équipe). Corps : module (id) et, optionnellement,
+        inscriptions (ids) ; par défaut toutes les inscriptions confirmées ou
+        en cours.
+        """
+        formation = self.get_object()
+        
+        if not (request.user.is_staff or formation.created_by_id == request.user.id):
+            return Response(
+                {'error': 'Réservé aux organisatrices de la formation'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            module_id = int(request.data.get('module'))
+            identifiants = [int(identifiant) for identifiant in request.data.get('inscriptions') or []]
+        except (TypeError, ValueError):
+            return Response(
+                {'error': "module (id) requis, inscriptions doit être une liste d'ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        module = ModuleFormation.objects.filter(formation=formation, pk=module_id).first()
+        if module is None:
+            return Response(
+                {'error': 'Module introuvable dans cette formation'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        inscriptions = InscriptionFormation.objects.filter(formation=formation)
+        if identifiants:
+            inscriptions = inscriptions.filter(pk__in=identifiants)
+        else:
+            inscriptions = inscriptions.filter(statut__in=['confirmee', 'en_cours'])
+        
+        nouvelles = completer_module(module, inscriptions)
+        
+        return Response({
+            'message': 'Module marqué comme complété pour la cohorte',
+            'inscriptions_concernees': inscriptions.count(),
+            'modules_completes_ajoutes': nouvelles
+        })
+    
+    @action(detail=True, methods=['post'])
+    def generer_certificats(self, request, pk=None):
+        """
+        Crée les certificats manquants de la cohorte (inscriptions terminées
+        éligibles) et lance le rendu de leurs PDF en tâche de fond.
+        Réservé à la créatrice de la formation et à l'équipe.
+        """
+        formation = self.get_object()
+        
+        if not (request.user.is_staff or formation.created_by_id == request.user.id):
+            return Response(
+                {'error': 'Réservé aux organisatrices de la formation'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not formation.certificat_delivre:
+            return Response(
+                {'error': 'Cette formation ne délivre pas de certificat'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        forcer = str(request.data.get('forcer', '')).lower() == 'true'
+        crees = creer_certificats(formation)
+        transaction.on_commit(lambda: planifier_pdfs_formation(formation.pk, forcer=forcer))
+        
+        return Response({
+            'message': 'Génération des certificats lancée',
+            'certificats_crees': len(crees)
+        }, status=status.HTTP_202_ACCEPTED)
+    
     @action(detail=False, methods=['get'])
     def mes_formations(self, request):
         """Retourne les formations auxquelles l'utilisateur est inscrit."""
@@ -117,35 +212,38 @@ class FormationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistiques(self, request):
         """Retourne les statistiques générales des formations."""
+        compteurs_formations = Formation.objects.aggregate(
+            total_formations=Count('id', filter=Q(status='active')),
+            formations_en_ligne=Count('id', filter=Q(status='active', est_en_ligne=True))
+        )
+        
+        # Inscriptions lues dans les statistiques quotidiennes (api.statistiques)
+        inscriptions = totaux(
+            'inscriptions_formations', 'formations_terminees',
+            'somme_evaluations_formations', 'nb_evaluations_formations'
+        )
+        total_inscriptions = inscriptions['inscriptions_formations']
+        
         stats = {
-            'total_formations': Formation.objects.filter(status='active').count(),
-            'formations_en_ligne': Formation.objects.filter(
-                status='active', est_en_ligne=True
-            ).count(),
-            'total_participants': InscriptionFormation.objects.count(),
+            'total_formations': compteurs_formations['total_formations'],
+            'formations_en_ligne': compteurs_formations['formations_en_ligne'],
+            'total_participants': total_inscriptions,
             'taux_completion': 0,
             'moyenne_evaluation': 0,
             'categories_populaires': []
         }
         
         # Calcul du taux de completion
-        inscriptions_terminees = InscriptionFormation.objects.filter(
-            statut='terminee'
-        ).count()
-        total_inscriptions = InscriptionFormation.objects.count()
-        
         if total_inscriptions > 0:
             stats['taux_completion'] = round(
-                (inscriptions_terminees / total_inscriptions) * 100, 2
+                (inscriptions['formations_terminees'] / total_inscriptions) * 100, 2
             )
         
         # Moyenne des évaluations
-        moyenne = InscriptionFormation.objects.filter(
-            evaluation_formation__isnull=False
-        ).aggregate(moyenne=Avg('evaluation_formation'))['moyenne']
-        
-        if moyenne:
-            stats['moyenne_evaluation'] = round(moyenne, 2)
+        if inscriptions['nb_evaluations_formations'] > 0:
+            stats['moyenne_evaluation'] = round(
+                inscriptions['somme_evaluations_formations'] / inscriptions['nb_evaluations_formations'], 2
+            )
         
         # Catégories populaires
         categories = Formation.objects.values('categorie').annotate(
@@ -204,9 +302,9 @@ class InscriptionFormationViewSet(viewsets.ModelViewSet):
                     'est_valide': True
                 }
             )
-            if created:
-                certificat.generer_numero()
-                certificat.generer_hash()
+            # Numéro et hash sont attribués à la création ; le PDF est rendu en tâche de fond
+            if created or not certificat.fichier_pdf:
+                transaction.on_commit(lambda: planifier_pdf(certificat.pk))
         
         return Response({
             'message': 'Formation marquée comme terminée',
@@ -280,17 +378,9 @@ class ModuleFormationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Ajouter le module aux modules complétés
-        if module not in inscription.modules_completes.all():
-            inscription.modules_completes.add(module)
-            
-            # Mettre à jour la progression
-            total_modules = inscription.formation.modules.count()
-            modules_completes = inscription.modules_completes.count()
-            
-            if total_modules > 0:
-                inscription.progression = (modules_completes / total_modules) * 100
-                inscription.save()
+        # Ajouter le module aux modules complétés et recalculer la progression
+        if completer_module(module, InscriptionFormation.objects.filter(pk=inscription.pk)):
+            inscription.refresh_from_db(fields=['progression'])
         
         return Response({
             'message': 'Module marqué comme complété',
@@ -324,13 +414,78 @@ class CertificatViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=True, methods=['get'])
     def telecharger(self, request, pk=None):
-        """Génère et retourne le PDF du certificat."""
+        """Retourne le PDF du certificat (rendu en tâche de fond s'il n'existe pas encore)."""
         certificat = self.get_object()
         
-        # Ici, vous pourriez intégrer une génération PDF
-        # Par exemple avec reportlab ou weasyprint
+        if not certificat.est_valide:
+            return Response(
+                {'error': 'Certificat invalidé'},
+                status=status.HTTP_410_GONE
+            )
+        
+        # Un seul rendu planifié tant qu'il est en attente, quel que soit le nombre d'appels
+        if not certificat.fichier_pdf and planifier_pdf(certificat.pk):
+            certificat.refresh_from_db(fields=['fichier_pdf'])
+        
+        if not certificat.fichier_pdf:
+            return Response({
+                'message': 'Certificat en cours de génération, réessayez dans quelques instants',
+                'certificat_id': certificat.id
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        return reponse_telechargement(certificat)
+
+
+class CertificatVerificationView(APIView):
+    """
+    Vérification publique d'un certificat par son numéro ou son hash
+    de vérification (sans authentification, débit limité par IP).
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [VerificationCertificatThrottle]
+    
+    def get(self, request, identifiant):
+        resultat = verifier_certificat(identifiant)
+        return Response(
+            resultat,
+            status=status.HTTP_200_OK if resultat['trouve'] else status.HTTP_404_NOT_FOUND
+        )
+
+
+class CertificatVerificationLotView(APIView):
+    """
+    Vérification publique groupée : {"certificats": [numéros ou hashes]}
+    (au plus LOT_MAX par requête). Une requête SQL pour tous les absents du cache.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [VerificationLotThrottle]
+    
+    def post(self, request):
+        identifiants = request.data.get('certificats')
+        if not isinstance(identifiants, list) or not identifiants:
+            return Response(
+                {'error': 'certificats : liste de numéros ou de hashes requise'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(identifiants) > LOT_MAX:
+            return Response(
+                {'error': f'{LOT_MAX} certificats au plus par requête'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not all(isinstance(identifiant, str) and identifiant.strip() for identifiant in identifiants):
+            return Response(
+                {'error': 'Chaque certificat doit être un numéro ou un hash non vide'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        resultats = verifier_certificats(identifiants)
         return Response({
-            'message': 'Génération de PDF à implémenter',
-            'certificat_id': certificat.id
-        })
\ No newline at end of file
+            'total': len(resultats),
+            'valides': sum(1 for resultat in resultats.values() if resultat['valide']),
+            'resultats': [
+                {'identifiant': identifiant, **resultat}
+                for identifiant, resultat in resultats.items()
+            ]
+        })
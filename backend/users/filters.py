@@ -1,7 +1,8 @@
 import django_filters
 from django.db.models import Q
-from django.core.cache import cache
 from .models import Participante, UserProfile 
+from .presence import participantes_en_ligne
+from .recherche import rechercher_participantes
 
 class ParticipanteFilter(django_filters.FilterSet):
     """
@@ -45,52 +46,20 @@ class ParticipanteFilter(django_filters.FilterSet):
 
     def filter_search(self, queryset, name, value):
         """
-        Effectue une recherche globale sur plusieurs champs de Participante et UserProfile.
+        Recherche globale (nom, email, localisation, profil, compétences)
+        sur l'index de recherche des profils, classée par pertinence.
         """
         if not value:
             return queryset
-            
-        q_objects = Q(email__icontains=value) | \
-                    Q(first_name__icontains=value) | \
-                    Q(last_name__icontains=value) | \
-                    Q(region__icontains=value) | \
-                    Q(ville__icontains=value)
-
-        # Recherche dans le profil si il existe
-        try:
-            q_objects |= Q(profile__bio__icontains=value) | \
-                         Q(profile__current_position__icontains=value) | \
-                         Q(profile__organization__icontains=value)
-
-            # Recherche dans les champs JSON s'ils existent
-            if value:
-                q_objects |= Q(profile__skills__contains=[value]) | \
-                             Q(profile__languages__contains=[value]) | \
-                             Q(profile__political_interests__contains=[value]) | \
-                             Q(profile__mentorship_areas__contains=[value])
-        except:
-            # Si le profil n'existe pas ou si les champs JSON ne sont pas supportés
-            pass
-        
-        return queryset.filter(q_objects).distinct()
+        return rechercher_participantes(queryset, value)
 
     def filter_is_online(self, queryset, name, value):
         """
-        Filtre les utilisateurs en ligne (basé sur le cache de session).
+        Filtre les utilisateurs en ligne (passés dans les dernières minutes,
+        d'après le suivi de présence : une seule lecture, sans parcourir le queryset).
         """
-        online_users_ids = []
+        online_users_ids = participantes_en_ligne()
         
-        # Récupérer les IDs des utilisateurs en ligne depuis le cache
-        try:
-            # Parcourir les clés du cache pour trouver les utilisateurs en ligne
-            for user in queryset:
-                cache_key = f'user_online_{user.id}'
-                if cache.get(cache_key, False):
-                    online_users_ids.append(user.id)
-        except:
-            # En cas d'erreur avec le cache, retourner le queryset original
-            pass
-
         if value:
             return queryset.filter(id__in=online_users_ids)
         return queryset.exclude(id__in=online_users_ids)
@@ -0,0 +1,170 @@
+# ============================================================================
+# backend/users/management/commands/benchmark_recherche_participantes.py
+# ============================================================================
+"""
+Commande de mesure de la recherche de participantes
+Compare l'ancienne recherche (icontains sur dix champs et quatre listes
+JSON, jointure et DISTINCT) à l'index de recherche des profils
+(users.recherche) sur un volume de participantes généré
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from users.models import Participante, UserProfile
+from users.recherche import indexer_participantes, rechercher_participantes
+
+# Préfixe des participantes créées par le benchmark (purgées avant et après)
+PREFIXE = 'benchpart_'
+
+PRENOMS = ['Awa', 'Élodie', 'Chantal', 'Sylvie', 'Hélène', 'Joséphine', 'Nadège', 'Ornella', 'Prisca', 'Rébecca']
+NOMS = ['Ndong', 'Mba', 'Obiang', 'Nzé', 'Ondo', 'Moussavou', 'Boussougou', 'Nguema', 'Mintsa', 'Koumba']
+VILLES = ['Libreville', 'Port-Gentil', 'Franceville', 'Oyem', 'Moanda', 'Lambaréné']
+REGIONS = ['estuaire', 'haut_ogooue', 'ogooue_maritime', 'woleu_ntem', 'moyen_ogooue']
+POSTES = ['Conseillère municipale', 'Députée', 'Présidente d\'association', 'Juriste', 'Enseignante', 'Entrepreneure']
+ORGANISATIONS = ['Mairie', 'Assemblée nationale', 'ONG Femmes Debout', 'Coopérative agricole', 'Ministère']
+COMPETENCES = ['leadership', 'communication', 'négociation', 'gestion de projet', 'droit', 'finances']
+LANGUES = ['français', 'fang', 'punu', 'anglais', 'myènè']
+SYLLABES = ['ba', 'ko', 'mi', 'ndo', 'la', 'ze', 'tu', 'ga', 'ri', 'mbe', 'so', 'ny', 'ka', 'lo', 'vi', 'de']
+
+# Saisies mesurées : nom, nom et prénom (avec ou sans accents, dans les deux
+# ordres), faute de frappe, fragment d'email, puis termes peu sélectifs
+TERMES = [
+    'obiang', 'Hélène Obiang', 'obiang helene', 'obaing', 'benchpart_4242@',
+    'leadership', 'port-gentil', 'deputee',
+]
+
+
+def recherche_icontains(queryset, valeur):
+    """
+    Recherche historique de ParticipanteFilter.filter_search (sans les
+    listes JSON là où contains n'est pas pris en charge, ex. SQLite)
+    """
+    condition = (
+        Q(email__icontains=valeur) |
+        Q(first_name__icontains=valeur) |
+        Q(last_name__icontains=valeur) |
+        Q(region__icontains=valeur) |
+        Q(ville__icontains=valeur) |
+        Q(profile__bio__icontains=valeur) |
+        Q(profile__current_position__icontains=valeur) |
+        Q(profile__organization__icontains=valeur)
+    )
+    if connection.features.supports_json_field_contains:
+        condition |= (
+            Q(profile__skills__contains=[valeur]) |
+            Q(profile__languages__contains=[valeur]) |
+            Q(profile__political_interests__contains=[valeur]) |
+            Q(profile__mentorship_areas__contains=[valeur])
+        )
+    return queryset.filter(condition).distinct()
+
+
+class Command(BaseCommand):
+    help = "Mesure la recherche de participantes : icontains contre index de recherche des profils"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--participantes', type=int, default=200000, help='Participantes générées')
+        parser.add_argument('--repetitions', type=int, default=3, help='Exécutions par terme')
+        parser.add_argument(
+            '--garder',
+            action='store_true',
+            help='Conserve les participantes générées après la mesure',
+        )
+    
+    def handle(self, *args, **options):
+        self.purger()
+        try:
+            duree_creation, duree_indexation = self.creer_participantes(options['participantes'])
+            self.stdout.write(
+                f"{options['participantes']} participantes créées en {duree_creation:.1f}s, "
+                f"indexées en {duree_indexation:.1f}s"
+            )
+            
+            base = Participante.objects.filter(username__startswith=PREFIXE)
+            self.stdout.write(
+                f"{'terme':<18}{'icontains':>10}{'index':>8}{'icontains ms':>14}{'index ms':>10}{'gain':>8}  premier résultat"
+            )
+            for terme in TERMES:
+                nb_contains, duree_contains, _premier = self.mesurer(
+                    lambda: recherche_icontains(base, terme).order_by('-date_joined'), options['repetitions']
+                )
+                nb_index, duree_index, premier = self.mesurer(
+                    lambda: rechercher_participantes(base, terme), options['repetitions']
+                )
+                self.stdout.write(
+                    f"{terme:<18}{nb_contains:>10}{nb_index:>8}{duree_contains:>14.1f}{duree_index:>10.1f}"
+                    f"{duree_contains / duree_index if duree_index else 0:>7.1f}x  {premier}"
+                )
+        finally:
+            if not options['garder']:
+                self.purger()
+    
+    def mesurer(self, construire, repetitions):
+        """(total, durée médiane en ms du comptage et de la première page, premier résultat)"""
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            queryset = construire()
+            total = queryset.count()
+            page = list(queryset[:20])
+            durees.append((time.perf_counter() - debut) * 1000)
+        durees.sort()
+        premier = page[0].get_full_name() if page else '-'
+        return total, durees[len(durees) // 2], premier
+    
+    def creer_participantes(self, nombre):
+        aleatoire = random.Random(42)
+        # Mots de remplissage pour des biographies au vocabulaire varié
+        remplissage = [
+            ''.join(aleatoire.choices(SYLLABES, k=aleatoire.randint(2, 4)))
+            for _ in range(20000)
+        ]
+        # Noms de famille variés : une recherche par nom est sélective
+        noms = NOMS + [
+            ''.join(aleatoire.choices(SYLLABES, k=aleatoire.randint(2, 4))).capitalize()
+            for _ in range(4000)
+        ]
+        
+        debut = time.perf_counter()
+        for depart in range(0, nombre, 5000):
+            Participante.objects.bulk_create([
+                Participante(
+                    username=f'{PREFIXE}{numero}',
+                    email=f'{PREFIXE}{numero}@benchmark.invalid',
+                    nip=f'BPART{numero:07d}',
+                    first_name=aleatoire.choice(PRENOMS),
+                    last_name=aleatoire.choice(noms),
+                    region=aleatoire.choice(REGIONS),
+                    ville=aleatoire.choice(VILLES),
+                    password='!'
+                )
+                for numero in range(depart, min(depart + 5000, nombre))
+            ])
+        
+        ids = list(Participante.objects.filter(username__startswith=PREFIXE).values_list('pk', flat=True))
+        for depart in range(0, len(ids), 5000):
+            UserProfile.objects.bulk_create([
+                UserProfile(
+                    user_id=participante_id,
+                    bio=' '.join(aleatoire.choices(remplissage, k=40)),
+                    current_position=aleatoire.choice(POSTES),
+                    organization=aleatoire.choice(ORGANISATIONS),
+                    skills=aleatoire.sample(COMPETENCES, 2),
+                    languages=aleatoire.sample(LANGUES, 2),
+                )
+                for participante_id in ids[depart:depart + 5000]
+            ])
+        duree_creation = time.perf_counter() - debut
+        
+        # bulk_create ne passe pas par save() : indexation explicite
+        debut = time.perf_counter()
+        indexer_participantes(Participante.objects.filter(username__startswith=PREFIXE))
+        return duree_creation, time.perf_counter() - debut
+    
+    def purger(self):
+        """Supprime les participantes d'un précédent benchmark"""
+        Participante.objects.filter(username__startswith=PREFIXE).delete()
@@ -0,0 +1,69 @@
+# ============================================================================
+# backend/users/management/commands/importer_nip.py
+# ============================================================================
+"""
+Commande d'import du registre officiel des NIP (CSV) dans NipReference
+Colonnes attendues : nip, nom, prenom, region (facultative). Un import
+complet désactive les NIP absents du fichier ; --partiel ne fait qu'ajouter
+et mettre à jour.
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.referentiel_nip import TAILLE_PAQUET, ErreurImport, importer_nip
+
+
+class Command(BaseCommand):
+    help = 'Importe le registre officiel des NIP depuis un fichier CSV'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', type=str, help='Chemin vers le fichier CSV')
+        parser.add_argument('--delimiteur', default=',', help='Séparateur de colonnes (défaut : ,)')
+        parser.add_argument('--encodage', default='utf-8-sig', help='Encodage du fichier (défaut : utf-8-sig)')
+        parser.add_argument(
+            '--partiel',
+            action='store_true',
+            help='Fichier partiel : ne pas désactiver les NIP absents du fichier',
+        )
+        parser.add_argument(
+            '--taille-paquet',
+            type=int,
+            default=TAILLE_PAQUET,
+            help=f'Lignes validées et chargées par paquet (défaut : {TAILLE_PAQUET})',
+        )
+    
+    def handle(self, *args, **options):
+        csv_file = options['csv_file']
+        if not os.path.exists(csv_file):
+            raise CommandError(f'Le fichier {csv_file} n\'existe pas')
+        
+        try:
+            with open(csv_file, 'r', encoding=options['encodage'], newline='') as fichier:
+                rapport = importer_nip(
+                    fichier,
+                    delimiteur=options['delimiteur'],
+                    desactiver_absents=not options['partiel'],
+                    taille_paquet=options['taille_paquet'],
+                )
+        except (ErreurImport, UnicodeDecodeError) as e:
+            raise CommandError(f'Import impossible : {e}')
+        
+        for erreur in rapport['erreurs']:
+            self.stdout.write(self.style.ERROR(f"✗ {erreur}"))
+        if rapport['invalides'] > len(rapport['erreurs']):
+            self.stdout.write(
+                self.style.ERROR(f"✗ ... {rapport['invalides'] - len(rapport['erreurs'])} autre(s) ligne(s) rejetée(s)")
+            )
+        
+        self.stdout.write(
+            f"{rapport['lues']} lignes lues ({rapport['invalides']} invalides, {rapport['doublons']} doublons) : "
+            f"{rapport['crees']} créés, {rapport['modifies']} modifiés, {rapport['inchanges']} inchangés, "
+            f"{rapport['desactives']} désactivés"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nImport terminé ({rapport['methode']}) en {rapport['duree_secondes']} s : "
+                f"{rapport['lignes_par_seconde']:.0f} lignes/s"
+            )
+        )
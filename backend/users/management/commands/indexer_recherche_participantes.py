@@ -0,0 +1,27 @@
+# ============================================================================
+# backend/users/management/commands/indexer_recherche_participantes.py
+# ============================================================================
+"""
+Commande de reconstruction de l'index de recherche des participantes
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from users.recherche import indexer_participantes
+
+
+class Command(BaseCommand):
+    help = "Recalcule le nom et le document de recherche de tous les profils de participantes"
+    
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        nombre = indexer_participantes()
+        duree = time.perf_counter() - debut
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{nombre} profil(s) indexé(s) en {duree:.2f}s (base {connection.vendor})"
+            )
+        )
@@ -0,0 +1,34 @@
+# ============================================================================
+# backend/users/middleware.py
+# ============================================================================
+"""
+Middlewares de l'application users
+"""
+import logging
+
+from .presence import marquer_presence
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceMiddleware:
+    """
+    Note le passage de la participante authentifiée (users.presence).
+    Lu après la réponse : l'authentification JWT de DRF n'a lieu que dans
+    la vue, qui reporte l'utilisatrice sur la requête Django.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            try:
+                marquer_presence(user.pk)
+            except Exception as e:
+                # La présence ne doit jamais faire échouer une requête
+                logger.warning(f"Présence non notée pour {user.pk}: {str(e)}")
+        return response
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:09
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normaliser(texte):
+    decompose = unicodedata.normalize('NFKD', texte.lower())
+    return ''.join(caractere for caractere in decompose if not unicodedata.combining(caractere))
+
+
+def creer_index_recherche(apps, schema_editor):
+    """
+    PostgreSQL : extension pg_trgm et index GIN trigrammes sur le nom et le
+    document de recherche. Calcul des textes des profils existants, puis
+    sous SQLite table virtuelle FTS5 à trigrammes remplie avec ces textes.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS users_userprofile_nom_recherche_trgm '
+            'ON users_userprofile USING gin (nom_recherche gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS users_userprofile_document_recherche_trgm '
+            'ON users_userprofile USING gin (document_recherche gin_trgm_ops)'
+        )
+
+    UserProfile = apps.get_model('users', 'UserProfile')
+    requete = 'UPDATE users_userprofile SET nom_recherche = %s, document_recherche = %s WHERE id = %s'
+    lignes = []
+    with schema_editor.connection.cursor() as cursor:
+        for profil in UserProfile.objects.select_related('user').iterator(chunk_size=2000):
+            user = profil.user
+            nom = normaliser(f'{user.first_name} {user.last_name}'.strip())
+            textes = [
+                nom, user.email, user.get_region_display(), user.ville,
+                profil.current_position, profil.organization, profil.bio,
+            ]
+            for liste in (profil.skills, profil.languages, profil.political_interests, profil.mentorship_areas):
+                if isinstance(liste, list):
+                    textes.extend(str(element) for element in liste)
+            lignes.append((nom[:301], ' '.join(normaliser(texte) for texte in textes if texte), profil.pk))
+            if len(lignes) >= 1000:
+                cursor.executemany(requete, lignes)
+                lignes = []
+        if lignes:
+            cursor.executemany(requete, lignes)
+
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS users_userprofile_fts USING fts5("
+            "nom_recherche, document_recherche, tokenize = 'trigram')"
+        )
+        schema_editor.execute(
+            'INSERT INTO users_userprofile_fts (rowid, nom_recherche, document_recherche) '
+            'SELECT id, nom_recherche, document_recherche FROM users_userprofile'
+        )
+
+
+def supprimer_index_recherche(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS users_userprofile_nom_recherche_trgm')
+        schema_editor.execute('DROP INDEX IF EXISTS users_userprofile_document_recherche_trgm')
+    elif schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS users_userprofile_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='document_recherche',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='nom_recherche',
+            field=models.CharField(blank=True, default='', editable=False, max_length=301),
+        ),
+        migrations.RunPython(creer_index_recherche, supprimer_index_recherche),
+    ]
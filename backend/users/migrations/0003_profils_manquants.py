@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:10
+
+import unicodedata
+
+from django.db import migrations
+
+
+def normaliser(texte):
+    decompose = unicodedata.normalize('NFKD', texte.lower())
+    return ''.join(caractere for caractere in decompose if not unicodedata.combining(caractere))
+
+
+def creer_profils_manquants(apps, schema_editor):
+    """
+    Crée, avec leurs textes de recherche, les profils des participantes qui
+    n'en ont pas (créées sans signaux) : la recherche passe par le profil.
+    Sous SQLite, les profils créés sont ajoutés à la table FTS5.
+    """
+    Participante = apps.get_model('users', 'Participante')
+    UserProfile = apps.get_model('users', 'UserProfile')
+
+    sans_profil = Participante.objects.filter(profile__isnull=True)
+    profils = []
+    for user in sans_profil.iterator(chunk_size=2000):
+        nom = normaliser(f'{user.first_name} {user.last_name}'.strip())
+        textes = [nom, user.email, user.get_region_display(), user.ville]
+        profils.append(UserProfile(
+            user_id=user.pk,
+            nom_recherche=nom[:301],
+            document_recherche=' '.join(normaliser(texte) for texte in textes if texte)
+        ))
+    crees = UserProfile.objects.bulk_create(profils, batch_size=1000)
+
+    if crees and schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO users_userprofile_fts (rowid, nom_recherche, document_recherche) '
+                'SELECT id, nom_recherche, document_recherche FROM users_userprofile WHERE user_id = %s',
+                [(profil.user_id,) for profil in crees]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profil_recherche'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_profils_manquants, migrations.RunPython.noop),
+    ]
@@ -17,6 +17,8 @@ from django.utils.translation import gettext_lazy as _
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill, SmartResize
 
+from api.texte import normaliser
+
 
 def user_directory_path(instance, filename):
     """
@@ -339,11 +341,23 @@ class Participante(AbstractUser, PermissionsMixin):
         # AbstractUser a déjà get_full_name()
         return f"{self.get_full_name()} ({self.nip})" if self.get_full_name() else self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Statut lu en base : save() détecte un changement sans relire la ligne
+        instance._old_statut_validation = instance.__dict__.get('statut_validation')
+        return instance
+
     def save(self, *args, **kwargs):
         """Override save pour gérer les changements de statut"""
         if self.pk:
-            old_instance = Participante.objects.filter(pk=self.pk).first()
-            if old_instance and old_instance.statut_validation != self.statut_validation:
+            old_statut = getattr(self, '_old_statut_validation', None)
+            if old_statut is None:
+                # Instance non chargée depuis la base (ou statut différé)
+                old_statut = Participante.objects.filter(pk=self.pk).values_list(
+                    'statut_validation', flat=True
+                ).first()
+            if old_statut is not None and old_statut != self.statut_validation:
                 if self.statut_validation == 'validee':
                     self.validated_at = timezone.now()
                     # Invalider le cache
@@ -351,6 +365,7 @@ class Participante(AbstractUser, PermissionsMixin):
                     cache.delete(f'participants_region_{self.region}')
 
         super().save(*args, **kwargs)
+        self._old_statut_validation = self.statut_validation
 
     @property
     def nom_complet(self):
@@ -412,8 +427,13 @@ class Participante(AbstractUser, PermissionsMixin):
     """
 
     def update_last_activity(self):
-        """Met à jour la dernière activité sans déclencher les signaux"""
-        Participante.objects.filter(pk=self.pk).update(last_activity=timezone.now())
+        """
+        Note l'activité dans le suivi de présence : last_activity est écrit
+        au plus une fois par PRESENCE_INTERVALLE_ECRITURE, par lot
+        (users.presence.enregistrer_activites) ou au passage selon le stockage
+        """
+        from .presence import marquer_presence
+        marquer_presence(self.pk)
 
     def get_completion_percentage(self):
         """Calcule le pourcentage de complétion du profil"""
@@ -440,6 +460,10 @@ class Participante(AbstractUser, PermissionsMixin):
         return int((completed / total) * 100)
 
 
+# Champs de recherche d'un profil, toujours enregistrés avec lui
+CHAMPS_RECHERCHE = ('nom_recherche', 'document_recherche')
+
+
 class UserProfile(models.Model):
     """
     Profil étendu avec informations supplémentaires
@@ -552,6 +576,11 @@ class UserProfile(models.Model):
         default=False
     )
 
+    # Recherche des participantes (users.recherche) : textes sans accents
+    # ni majuscules, recalculés à chaque enregistrement du profil
+    nom_recherche = models.CharField(max_length=301, blank=True, default='', editable=False)
+    document_recherche = models.TextField(blank=True, default='', editable=False)
+
     class Meta:
         verbose_name = _('Profil utilisateur')
         verbose_name_plural = _('Profils utilisateurs')
@@ -559,8 +588,29 @@ class UserProfile(models.Model):
     def save(self, *args, **kwargs):
         """Calcule automatiquement le pourcentage de complétion et met à jour le profil user"""
         self.completion_percentage = self.calculate_completion()
+        self.nom_recherche, self.document_recherche = self.calculer_recherche()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(CHAMPS_RECHERCHE)
         super().save(*args, **kwargs)
 
+    def calculer_recherche(self):
+        """
+        (nom, document) de recherche : « prénom nom » et l'ensemble des
+        textes cherchables de la participante et de son profil
+        """
+        user = self.user
+        nom = normaliser(f'{user.first_name} {user.last_name}'.strip())
+        textes = [
+            nom, user.email, user.get_region_display(), user.ville,
+            self.current_position, self.organization, self.bio,
+        ]
+        for liste in (self.skills, self.languages, self.political_interests, self.mentorship_areas):
+            if isinstance(liste, list):
+                textes.extend(str(element) for element in liste)
+        document = ' '.join(normaliser(texte) for texte in textes if texte)
+        return nom[:301], document
+
     def calculate_completion(self):
         """Calcule le pourcentage de complétion du profil étendu"""
         fields = [
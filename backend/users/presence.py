@@ -0,0 +1,380 @@
+# ============================================================================
+# backend/users/presence.py
+# ============================================================================
+"""
+Présence des participantes
+Chaque requête authentifiée note l'heure de passage de la participante
+(PresenceMiddleware) dans un ensemble trié dont le score est l'horodatage :
+« qui est en ligne » se lit en une seule requête (ZRANGEBYSCORE) et
+Participante.last_activity est recopié périodiquement par lot
+(enregistrer_activites) au lieu d'un UPDATE par requête. Chaque
+participante est écrite au plus une fois par intervalle
+(PRESENCE_INTERVALLE_ECRITURE) : la colonne, indexée, ne change pas à
+chaque passage. Les compteurs de passages et d'écritures mesurent les
+écritures évitées.
+
+Stockage choisi par settings.PRESENCE_STOCKAGE, partagé entre les
+processus web et le worker Celery qui enregistre : PresenceRedis en
+production, PresenceBaseDonnees par défaut (last_activity écrit au passage,
+au plus une fois par intervalle). PresenceMemoire, propre au processus
+(tests), écrit aussi last_activity au passage.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .models import Participante
+
+logger = logging.getLogger(__name__)
+
+
+# Ensemble trié des passages (membre : id de la participante, score :
+# horodatage), ensemble trié des passages déjà écrits en base, horodatage
+# du dernier enregistrement et compteurs (passages, ecritures)
+CLE_PRESENCE = 'presence:participantes'
+CLE_ENREGISTREES = 'presence:enregistrees'
+CLE_CURSEUR = 'presence:dernier_enregistrement'
+CLE_METRIQUES = 'presence:metriques'
+
+# Une participante est en ligne si elle est passée depuis moins de (secondes)
+FENETRE_EN_LIGNE = 5 * 60
+
+# Intervalle minimal (secondes) entre deux écritures de last_activity
+# d'une même participante (settings.PRESENCE_INTERVALLE_ECRITURE)
+INTERVALLE_ECRITURE = 5 * 60
+
+# Passages plus anciens retirés de l'ensemble (déjà enregistrés en base)
+DUREE_CONSERVATION = 24 * 3600
+
+# Recouvrement (secondes) entre deux enregistrements : rattrape un passage
+# noté juste avant la fin du précédent mais écrit après sa lecture
+MARGE_ENREGISTREMENT = 5
+
+# Participantes mises à jour par requête lors de l'enregistrement
+TAILLE_PAQUET = 500
+
+
+class PresenceRedis:
+    """Ensemble trié Redis, via la connexion du cache django_redis"""
+    
+    def __init__(self):
+        from django_redis import get_redis_connection
+        self.redis = get_redis_connection('default')
+    
+    def marquer(self, participante_id, instant):
+        # Un seul aller-retour pour le passage et son compteur
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.zadd(CLE_PRESENCE, {participante_id: instant})
+        pipeline.hincrby(CLE_METRIQUES, 'passages', 1)
+        pipeline.execute()
+    
+    def en_ligne(self, depuis):
+        return [int(membre) for membre in self.redis.zrangebyscore(CLE_PRESENCE, depuis, '+inf')]
+    
+    def passages(self, debut, fin):
+        """{id: horodatage} des passages notés dans ]debut, fin]"""
+        return {
+            int(membre): score
+            for membre, score in self.redis.zrangebyscore(CLE_PRESENCE, f'({debut}', fin, withscores=True)
+        }
+    
+    def enregistrees(self, participante_ids):
+        """{id: horodatage} de la dernière écriture en base des participantes"""
+        participante_ids = list(participante_ids)
+        if not participante_ids:
+            return {}
+        # ZSCORE en pipeline plutôt que ZMSCORE (Redis >= 6.2) : un aller-retour, toute version
+        pipeline = self.redis.pipeline(transaction=False)
+        for participante_id in participante_ids:
+            pipeline.zscore(CLE_ENREGISTREES, participante_id)
+        scores = pipeline.execute()
+        return {
+            participante_id: score
+            for participante_id, score in zip(participante_ids, scores) if score is not None
+        }
+    
+    def noter_enregistrees(self, ecritures, nombre):
+        pipeline = self.redis.pipeline(transaction=False)
+        if ecritures:
+            pipeline.zadd(CLE_ENREGISTREES, ecritures)
+        pipeline.hincrby(CLE_METRIQUES, 'ecritures', nombre)
+        pipeline.execute()
+    
+    def purger(self, avant):
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.zremrangebyscore(CLE_PRESENCE, '-inf', f'({avant}')
+        pipeline.zremrangebyscore(CLE_ENREGISTREES, '-inf', f'({avant}')
+        pipeline.execute()
+    
+    def curseur(self):
+        valeur = self.redis.get(CLE_CURSEUR)
+        return float(valeur) if valeur is not None else None
+    
+    def definir_curseur(self, instant):
+        self.redis.set(CLE_CURSEUR, instant)
+    
+    def compteurs(self):
+        return {cle.decode(): int(valeur) for cle, valeur in self.redis.hgetall(CLE_METRIQUES).items()}
+
+
+class PresenceMemoire:
+    """
+    Équivalent en mémoire du processus de PresenceRedis (tests). Non
+    partagé : le worker qui enregistre par lot ne voit pas ces passages,
+    last_activity est donc écrit au passage (ecrire_activite), au plus une
+    fois par intervalle.
+    """
+    
+    def __init__(self):
+        self.scores = {}
+        self.ecrits = {}
+        self.dernier_enregistrement = None
+        self.metriques = {'passages': 0, 'ecritures': 0}
+        self.verrou = threading.Lock()
+    
+    def marquer(self, participante_id, instant):
+        with self.verrou:
+            self.scores[participante_id] = instant
+            self.metriques['passages'] += 1
+            derniere = self.ecrits.get(participante_id)
+            if derniere is not None and instant - derniere < intervalle_ecriture():
+                return
+            self.ecrits[participante_id] = instant
+        
+        ecrites = ecrire_activite(participante_id, instant)
+        with self.verrou:
+            self.metriques['ecritures'] += ecrites
+    
+    def en_ligne(self, depuis):
+        with self.verrou:
+            return [membre for membre, score in self.scores.items() if score >= depuis]
+    
+    def passages(self, debut, fin):
+        with self.verrou:
+            return {membre: score for membre, score in self.scores.items() if debut < score <= fin}
+    
+    def enregistrees(self, participante_ids):
+        with self.verrou:
+            return {membre: self.ecrits[membre] for membre in participante_ids if membre in self.ecrits}
+    
+    def noter_enregistrees(self, ecritures, nombre):
+        with self.verrou:
+            self.ecrits.update(ecritures)
+            self.metriques['ecritures'] += nombre
+    
+    def purger(self, avant):
+        with self.verrou:
+            self.scores = {membre: score for membre, score in self.scores.items() if score >= avant}
+            self.ecrits = {membre: score for membre, score in self.ecrits.items() if score >= avant}
+    
+    def curseur(self):
+        return self.dernier_enregistrement
+    
+    def definir_curseur(self, instant):
+        self.dernier_enregistrement = instant
+    
+    def compteurs(self):
+        with self.verrou:
+            return dict(self.metriques)
+
+
+
+class PresenceBaseDonnees:
+    """
+    Présence lue dans Participante.last_activity, écrit au passage par un
+    UPDATE conditionnel (ecrire_activite) : partagée par tous les processus
+    sans Redis. last_activity retardant au plus d'un intervalle d'écriture,
+    la fenêtre « en ligne » en est élargie. Rien à enregistrer par lot ;
+    compteurs propres au processus.
+    """
+    
+    def __init__(self):
+        self.ecrits = {}
+        self.metriques = {'passages': 0, 'ecritures': 0}
+        self.verrou = threading.Lock()
+    
+    def marquer(self, participante_id, instant):
+        with self.verrou:
+            self.metriques['passages'] += 1
+            # Écriture déjà tentée par ce processus dans l'intervalle : pas de requête
+            derniere = self.ecrits.get(participante_id)
+            if derniere is not None and instant - derniere < intervalle_ecriture():
+                return
+            self.ecrits[participante_id] = instant
+        
+        ecrites = ecrire_activite(participante_id, instant)
+        with self.verrou:
+            self.metriques['ecritures'] += ecrites
+    
+    def en_ligne(self, depuis):
+        return list(
+            Participante.objects.filter(
+                last_activity__gte=datetime.fromtimestamp(depuis - intervalle_ecriture(), tz=dt_timezone.utc)
+            ).values_list('pk', flat=True)
+        )
+    
+    def passages(self, debut, fin):
+        return {}
+    
+    def enregistrees(self, participante_ids):
+        return {}
+    
+    def noter_enregistrees(self, ecritures, nombre):
+        pass
+    
+    def purger(self, avant):
+        with self.verrou:
+            self.ecrits = {membre: score for membre, score in self.ecrits.items() if score >= avant}
+    
+    def curseur(self):
+        return None
+    
+    def definir_curseur(self, instant):
+        pass
+    
+    def compteurs(self):
+        with self.verrou:
+            return dict(self.metriques)
+
+
+_stockage = None
+
+
+def stockage():
+    """Stockage de présence configuré (instancié une fois par processus)"""
+    global _stockage
+    if _stockage is None:
+        chemin = getattr(settings, 'PRESENCE_STOCKAGE', 'users.presence.PresenceBaseDonnees')
+        _stockage = import_string(chemin)()
+    return _stockage
+
+
+def reinitialiser():
+    """Oublie le stockage instancié (changement de réglage, tests)"""
+    global _stockage
+    _stockage = None
+
+
+def marquer_presence(participante_id, instant=None):
+    stockage().marquer(participante_id, instant if instant is not None else time.time())
+
+
+def participantes_en_ligne(fenetre=FENETRE_EN_LIGNE):
+    """Ids des participantes passées depuis moins de `fenetre` secondes"""
+    return stockage().en_ligne(time.time() - fenetre)
+
+
+def intervalle_ecriture():
+    return getattr(settings, 'PRESENCE_INTERVALLE_ECRITURE', INTERVALLE_ECRITURE)
+
+
+def ecrire_activite(participante_id, instant):
+    """
+    Écrit l'horodatage `instant` dans last_activity d'une participante si
+    la valeur en base date de plus d'un intervalle d'écriture : un UPDATE
+    conditionnel, sans effet (0 ligne) dans l'intervalle, quel que soit le
+    processus qui l'a écrite. Retourne le nombre de lignes modifiées.
+    """
+    vu = datetime.fromtimestamp(instant, tz=dt_timezone.utc)
+    return Participante.objects.filter(
+        pk=participante_id,
+        last_activity__lt=vu - timedelta(seconds=intervalle_ecriture())
+    ).update(last_activity=vu)
+
+
+def ecrire_activites(activites):
+    """
+    Écrit [(id, horodatage)] dans Participante.last_activity, un UPDATE
+    ... FROM (VALUES ...) par paquet (bulk_update ailleurs). Une ligne dont
+    last_activity est déjà plus récente n'est pas réécrite.
+    Retourne le nombre de lignes modifiées.
+    """
+    table = Participante._meta.db_table
+    colonne = Participante._meta.get_field('last_activity').column
+    lignes = [
+        (participante_id, datetime.fromtimestamp(score, tz=dt_timezone.utc))
+        for participante_id, score in activites
+    ]
+    
+    if connection.vendor == 'postgresql':
+        valeurs, alias = '(%s, %s::timestamptz)', 'v (id, vu)'
+        jointure = f'{table}.id = v.id AND {table}.{colonne} < v.vu'
+        nouvelle_valeur = 'v.vu'
+    elif connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 33):
+        # Colonnes anonymes du VALUES SQLite : column1, column2
+        valeurs, alias = '(%s, %s)', 'v'
+        jointure = f'{table}.id = v.column1 AND {table}.{colonne} < v.column2'
+        nouvelle_valeur = 'v.column2'
+    else:
+        instances = [Participante(pk=participante_id, last_activity=vu) for participante_id, vu in lignes]
+        Participante.objects.bulk_update(instances, ['last_activity'], batch_size=TAILLE_PAQUET)
+        return len(instances)
+    
+    modifiees = 0
+    with connection.cursor() as cursor:
+        for depart in range(0, len(lignes), TAILLE_PAQUET):
+            paquet = lignes[depart:depart + TAILLE_PAQUET]
+            parametres = []
+            for participante_id, vu in paquet:
+                parametres += [participante_id, connection.ops.adapt_datetimefield_value(vu)]
+            cursor.execute(
+                f'UPDATE {table} SET {colonne} = {nouvelle_valeur} '
+                f'FROM (VALUES {", ".join([valeurs] * len(paquet))}) AS {alias} '
+                f'WHERE {jointure}',
+                parametres
+            )
+            modifiees += cursor.rowcount
+    return modifiees
+
+
+def enregistrer_activites():
+    """
+    Recopie dans Participante.last_activity les passages notés depuis le
+    dernier enregistrement. Une participante déjà écrite il y a moins de
+    intervalle_ecriture() secondes est reportée : ses passages sont relus
+    aux enregistrements suivants jusqu'à l'échéance. Retourne les métriques
+    de l'enregistrement et les compteurs cumulés.
+    """
+    presence = stockage()
+    intervalle = intervalle_ecriture()
+    fin = time.time()
+    curseur = presence.curseur()
+    # Relecture d'un intervalle en arrière : passages reportés à écrire
+    debut = curseur - intervalle - MARGE_ENREGISTREMENT if curseur is not None else fin - DUREE_CONSERVATION
+    passages = presence.passages(debut, fin)
+    enregistrees = presence.enregistrees(passages)
+    
+    a_ecrire = {}
+    reportees = 0
+    for participante_id, score in passages.items():
+        derniere_ecriture = enregistrees.get(participante_id)
+        if derniere_ecriture is not None and score <= derniere_ecriture:
+            continue
+        if derniere_ecriture is not None and fin - derniere_ecriture < intervalle:
+            reportees += 1
+            continue
+        a_ecrire[participante_id] = score
+    
+    ecrites = ecrire_activites(a_ecrire.items())
+    presence.noter_enregistrees({participante_id: fin for participante_id in a_ecrire}, ecrites)
+    presence.definir_curseur(fin)
+    presence.purger(fin - DUREE_CONSERVATION)
+    
+    compteurs = presence.compteurs()
+    metriques = {
+        'ecrites': ecrites,
+        'reportees': reportees,
+        'passages_total': compteurs.get('passages', 0),
+        'ecritures_total': compteurs.get('ecritures', 0),
+    }
+    metriques['ecritures_evitees'] = max(metriques['passages_total'] - metriques['ecritures_total'], 0)
+    logger.info(
+        f"Présence : {ecrites} dernière(s) activité(s) écrite(s), {reportees} reportée(s) ; "
+        f"{metriques['ecritures_evitees']} écritures évitées sur {metriques['passages_total']} passages"
+    )
+    return metriques
@@ -0,0 +1,162 @@
+# ============================================================================
+# backend/users/recherche.py
+# ============================================================================
+"""
+Recherche des participantes
+Chaque profil porte un nom et un document de recherche (textes de la
+participante et du profil, sans accents ni majuscules) recalculés à chaque
+enregistrement : une recherche ne lit qu'une colonne par mot, sans OR sur
+dix champs ni DISTINCT. PostgreSQL : index GIN trigrammes (pg_trgm) qui
+servent les LIKE et la recherche approchée sur le nom ; SQLite : table
+virtuelle FTS5 à trigrammes (sous-chaînes, sans correspondance approchée),
+tenue à jour à chaque enregistrement ou suppression d'un profil.
+"""
+import re
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from api.texte import normaliser, table_index_disponible
+from .models import Participante, UserProfile
+
+
+# Sous SQLite : table virtuelle FTS5 (tokenizer trigram) créée par la
+# migration 0002, dont le rowid est l'id du profil
+TABLE_FTS = 'users_userprofile_fts'
+
+# Nombre maximal de mots pris en compte dans une recherche
+MOTS_MAX = 6
+
+# Profils recalculés par paquet lors d'une réindexation
+TAILLE_PAQUET_INDEX = 1000
+
+
+def mots_recherche(terme):
+    return re.findall(r'[\w@.-]+', normaliser(terme))[:MOTS_MAX]
+
+
+def _fts_disponible():
+    return connection.vendor == 'sqlite' and table_index_disponible(TABLE_FTS)
+
+
+def indexer_fts(lignes):
+    """Remplace les lignes FTS5 de profils : [(id, nom_recherche, document_recherche)]"""
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLE_FTS} WHERE rowid = %s', [(ligne[0],) for ligne in lignes])
+        cursor.executemany(
+            f'INSERT INTO {TABLE_FTS} (rowid, nom_recherche, document_recherche) VALUES (%s, %s, %s)',
+            lignes
+        )
+
+
+def indexer_profil(profil):
+    """Profil enregistré (post_save) : sa ligne FTS5 suit ses textes de recherche"""
+    if _fts_disponible():
+        indexer_fts([(profil.pk, profil.nom_recherche, profil.document_recherche)])
+
+
+def desindexer_profil(profil):
+    if _fts_disponible():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE_FTS} WHERE rowid = %s', [profil.pk])
+
+
+def pertinence_nom(mot):
+    """Score du mot sur le nom : début d'un prénom ou d'un nom (2) > ailleurs dans le nom (1)"""
+    return Case(
+        When(
+            Q(profile__nom_recherche__startswith=mot) | Q(profile__nom_recherche__contains=f' {mot}'),
+            then=Value(2.0)
+        ),
+        When(profile__nom_recherche__contains=mot, then=Value(1.0)),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+
+def rechercher_participantes(queryset, terme):
+    """
+    Filtre un queryset de participantes sur une saisie libre : chaque mot
+    doit figurer dans le document de recherche (ou, sous PostgreSQL,
+    ressembler à un mot du nom). Les résultats sont annotés d'une
+    `pertinence` (correspondance sur le nom, puis similarité trigrammes)
+    et triés par pertinence puis inscription la plus récente.
+    """
+    mots = mots_recherche(terme)
+    if not mots:
+        return queryset
+
+    pertinence = Value(0.0)
+    for mot in mots:
+        pertinence = pertinence + pertinence_nom(mot)
+
+    if connection.vendor == 'postgresql':
+        for mot in mots:
+            # Opérateur %> (word_similarity) servi par l'index GIN trigrammes
+            queryset = queryset.filter(
+                Q(profile__document_recherche__contains=mot) |
+                Q(profile__nom_recherche__trigram_word_similar=mot)
+            )
+            pertinence = pertinence + TrigramWordSimilarity(mot, 'profile__nom_recherche')
+    else:
+        # Les trigrammes exigent des mots d'au moins trois caractères : les
+        # plus courts sont cherchés par LIKE parmi les profils retenus
+        longs = [mot for mot in mots if len(mot) >= 3] if _fts_disponible() else []
+        if longs:
+            expression = ' AND '.join('"{}"'.format(mot.replace('"', '""')) for mot in longs)
+            queryset = queryset.filter(profile__id__in=RawSQL(
+                f'SELECT rowid FROM {TABLE_FTS} WHERE {TABLE_FTS} MATCH %s', [expression]
+            ))
+        for mot in mots:
+            if mot not in longs:
+                queryset = queryset.filter(profile__document_recherche__contains=mot)
+
+    return queryset.annotate(pertinence=pertinence).order_by('-pertinence', '-date_joined')
+
+
+def indexer_participantes(participantes=None):
+    """
+    Recalcule le nom et le document de recherche des profils d'un queryset
+    de participantes (toutes si None), après des écritures faites sans
+    save() (update(), bulk_create). Les profils manquants sont créés.
+    Retourne le nombre de profils indexés.
+    """
+    if participantes is None:
+        participantes = Participante.objects.all()
+
+    sans_profil = participantes.filter(profile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.bulk_create(
+        [UserProfile(user_id=participante_id) for participante_id in sans_profil],
+        batch_size=TAILLE_PAQUET_INDEX,
+        ignore_conflicts=True
+    )
+
+    profils = UserProfile.objects.filter(user__in=participantes).select_related('user')
+    fts = _fts_disponible()
+    # UPDATE paramétré exécuté par lot (executemany) : bulk_update construit
+    # un CASE par champ et par ligne, coûteux sur des centaines de milliers
+    requete = (
+        f'UPDATE {UserProfile._meta.db_table} '
+        f'SET nom_recherche = %s, document_recherche = %s WHERE id = %s'
+    )
+
+    def ecrire(paquet):
+        with connection.cursor() as cursor:
+            cursor.executemany(requete, [(nom, document, pk) for pk, nom, document in paquet])
+        if fts:
+            indexer_fts(paquet)
+
+    nombre = 0
+    paquet = []
+    with transaction.atomic():
+        for profil in profils.iterator(chunk_size=TAILLE_PAQUET_INDEX):
+            paquet.append((profil.pk, *profil.calculer_recherche()))
+            if len(paquet) >= TAILLE_PAQUET_INDEX:
+                ecrire(paquet)
+                nombre += len(paquet)
+                paquet = []
+        if paquet:
+            ecrire(paquet)
+    return nombre + len(paquet)
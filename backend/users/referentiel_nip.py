@@ -0,0 +1,269 @@
+# ============================================================================
+# backend/users/referentiel_nip.py
+# ============================================================================
+"""
+Import du registre officiel des NIP dans NipReference
+Le CSV (colonnes nip, nom, prenom, region) est lu en flux et validé par
+paquets. Sous PostgreSQL les lignes valides sont chargées par COPY dans une
+table temporaire puis fusionnées par un INSERT ... ON CONFLICT qui ne
+réécrit que les NIP modifiés ; ailleurs (SQLite) chaque paquet est comparé
+à la base puis écrit par bulk_create(update_conflicts=True). Un import
+complet désactive les NIP absents du fichier. La version partagée du
+référentiel est ensuite avancée : les processus reconstruisent leur filtre
+de Bloom et n'utilisent plus les recherches mises en cache avant l'import.
+"""
+import csv
+import io
+import re
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.conditionnel import marquer_modification
+from .models import NipReference
+
+# Lignes validées (et chargées) par paquet
+TAILLE_PAQUET = 5000
+
+# Erreurs de validation conservées pour le rapport
+ERREURS_MAX = 50
+
+# Ressource versionnée (api.conditionnel) du référentiel des NIP
+RESSOURCE_NIP = 'nip_reference'
+
+COLONNES = ('nip', 'nom', 'prenom', 'region')
+CHAMPS_MODIFIABLES = ('nom', 'prenom', 'region', 'is_active')
+
+MOTIF_NIP = re.compile(r'[A-Z0-9][A-Z0-9-]*')
+
+TAILLES = {
+    'nip': NipReference._meta.get_field('nip').max_length,
+    'nom': NipReference._meta.get_field('nom').max_length,
+    'prenom': NipReference._meta.get_field('prenom').max_length,
+    'region': NipReference._meta.get_field('region').max_length,
+}
+
+
+class ErreurImport(Exception):
+    """Fichier inexploitable (en-tête manquant ou incomplet)"""
+
+
+def normaliser_nip(nip):
+    return str(nip or '').strip().upper()
+
+
+def nip_valide(nip):
+    """NIP normalisé de forme acceptable (caractères et longueur)"""
+    return len(nip) <= TAILLES['nip'] and bool(MOTIF_NIP.fullmatch(nip))
+
+
+def valider_ligne(ligne):
+    """(nip, nom, prenom, region) normalisés, ou ValueError"""
+    valeurs = {colonne: (ligne.get(colonne) or '').strip() for colonne in COLONNES}
+    valeurs['nip'] = normaliser_nip(valeurs['nip'])
+    
+    if not valeurs['nip']:
+        raise ValueError('NIP manquant')
+    if not MOTIF_NIP.fullmatch(valeurs['nip']):
+        raise ValueError(f"NIP invalide : {valeurs['nip']}")
+    for colonne in ('nom', 'prenom'):
+        if not valeurs[colonne]:
+            raise ValueError(f'{colonne} manquant')
+    for colonne, taille in TAILLES.items():
+        if len(valeurs[colonne]) > taille:
+            raise ValueError(f'{colonne} trop long ({len(valeurs[colonne])} > {taille})')
+    
+    return tuple(valeurs[colonne] for colonne in COLONNES)
+
+
+def lire_paquets(fichier, delimiteur=',', taille_paquet=TAILLE_PAQUET, rapport=None):
+    """
+    Lit le CSV en flux et produit des paquets de (numéro de ligne, nip, nom,
+    prenom, region) valides. Les lignes rejetées sont comptées dans rapport.
+    """
+    lecteur = csv.DictReader(fichier, delimiter=delimiteur)
+    if lecteur.fieldnames is None:
+        raise ErreurImport('Fichier vide')
+    lecteur.fieldnames = [nom.strip().lower() for nom in lecteur.fieldnames]
+    manquantes = {'nip', 'nom', 'prenom'} - set(lecteur.fieldnames)
+    if manquantes:
+        raise ErreurImport(f"Colonnes manquantes : {', '.join(sorted(manquantes))}")
+    
+    paquet = []
+    for ligne in lecteur:
+        rapport['lues'] += 1
+        try:
+            paquet.append((lecteur.line_num, *valider_ligne(ligne)))
+        except ValueError as e:
+            rapport['invalides'] += 1
+            if len(rapport['erreurs']) < ERREURS_MAX:
+                rapport['erreurs'].append(f'ligne {lecteur.line_num} : {e}')
+            continue
+        if len(paquet) >= taille_paquet:
+            yield paquet
+            paquet = []
+    if paquet:
+        yield paquet
+
+
+def importer_nip(fichier, delimiteur=',', desactiver_absents=True, taille_paquet=TAILLE_PAQUET):
+    """
+    Importe un fichier CSV ouvert en texte dans NipReference, dans une
+    transaction. Avec desactiver_absents (registre complet), les NIP actifs
+    absents du fichier sont désactivés (jamais si aucune ligne n'est
+    valide). Retourne le rapport d'import.
+    """
+    rapport = {
+        'lues': 0,
+        'invalides': 0,
+        'doublons': 0,
+        'crees': 0,
+        'modifies': 0,
+        'inchanges': 0,
+        'desactives': 0,
+        'erreurs': [],
+        'methode': 'copy' if connection.vendor == 'postgresql' else 'bulk_create',
+    }
+    paquets = lire_paquets(fichier, delimiteur, taille_paquet, rapport)
+    
+    debut = time.perf_counter()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            _importer_copy(paquets, desactiver_absents, rapport)
+        else:
+            _importer_bulk(paquets, desactiver_absents, rapport)
+    marquer_modification(RESSOURCE_NIP)
+    duree = time.perf_counter() - debut
+    
+    rapport['duree_secondes'] = round(duree, 3)
+    rapport['lignes_par_seconde'] = round(rapport['lues'] / duree, 1) if duree else 0
+    return rapport
+
+
+# ----------------------------------------------------------------------------
+# PostgreSQL : COPY dans une table temporaire puis fusion
+# ----------------------------------------------------------------------------
+
+def _copier(cursor, sql, donnees):
+    """COPY ... FROM STDIN avec psycopg2 (copy_expert) ou psycopg 3 (copy)"""
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(sql, donnees)
+    else:
+        with cursor.copy(sql) as copie:
+            copie.write(donnees.getvalue())
+
+
+def _importer_copy(paquets, desactiver_absents, rapport):
+    table = NipReference._meta.db_table
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMPORARY TABLE import_nip ('
+            'ligne integer, nip varchar(20), nom varchar(100), prenom varchar(100), region varchar(100)'
+            ') ON COMMIT DROP'
+        )
+        
+        valides = 0
+        for paquet in paquets:
+            donnees = io.StringIO()
+            csv.writer(donnees).writerows(paquet)
+            donnees.seek(0)
+            _copier(cursor, 'COPY import_nip (ligne, nip, nom, prenom, region) FROM STDIN WITH (FORMAT csv)', donnees)
+            valides += len(paquet)
+        cursor.execute('ANALYZE import_nip')
+        
+        # Dernière occurrence d'un NIP répété dans le fichier ; les lignes
+        # identiques à la base ne sont pas réécrites (clause WHERE du DO UPDATE)
+        cursor.execute(f'''
+            WITH fusion AS (
+                INSERT INTO {table} (nip, nom, prenom, region, is_active, date_creation)
+                SELECT DISTINCT ON (nip) nip, nom, prenom, coalesce(region, ''), true, %s
+                FROM import_nip
+                ORDER BY nip, ligne DESC
+                ON CONFLICT (nip) DO UPDATE SET
+                    nom = EXCLUDED.nom,
+                    prenom = EXCLUDED.prenom,
+                    region = EXCLUDED.region,
+                    is_active = true
+                WHERE ({table}.nom, {table}.prenom, {table}.region, {table}.is_active)
+                    IS DISTINCT FROM (EXCLUDED.nom, EXCLUDED.prenom, EXCLUDED.region, true)
+                RETURNING (xmax = 0) AS cree
+            )
+            SELECT count(*) FILTER (WHERE cree), count(*) FILTER (WHERE NOT cree) FROM fusion
+        ''', [timezone.now()])
+        rapport['crees'], rapport['modifies'] = cursor.fetchone()
+        
+        cursor.execute('SELECT count(DISTINCT nip) FROM import_nip')
+        distincts = cursor.fetchone()[0]
+        rapport['doublons'] = valides - distincts
+        rapport['inchanges'] = distincts - rapport['crees'] - rapport['modifies']
+        
+        if desactiver_absents and valides:
+            cursor.execute(f'''
+                UPDATE {table} SET is_active = false
+                WHERE is_active AND NOT EXISTS (
+                    SELECT 1 FROM import_nip WHERE import_nip.nip = {table}.nip
+                )
+            ''')
+            rapport['desactives'] = cursor.rowcount
+
+
+# ----------------------------------------------------------------------------
+# Autres bases : comparaison par paquet et bulk_create(update_conflicts=True)
+# ----------------------------------------------------------------------------
+
+def _importer_bulk(paquets, desactiver_absents, rapport):
+    vus = set()
+    for paquet in paquets:
+        # Dernière occurrence d'un NIP répété dans le paquet
+        lignes = {}
+        for _ligne, nip, nom, prenom, region in paquet:
+            lignes[nip] = (nom, prenom, region, True)
+        rapport['doublons'] += len(paquet) - len(lignes)
+        
+        # Répété dans un paquet précédent : doublon, la dernière valeur l'emporte
+        deja_vus = vus.intersection(lignes)
+        rapport['doublons'] += len(deja_vus)
+        vus.update(lignes)
+        
+        existants = {
+            nip: valeurs
+            for nip, *valeurs in NipReference.objects.filter(nip__in=list(lignes)).values_list(
+                'nip', *CHAMPS_MODIFIABLES
+            ).iterator(chunk_size=TAILLE_PAQUET)
+        }
+        a_ecrire = []
+        for nip, valeurs in lignes.items():
+            actuel = existants.get(nip)
+            if actuel is None:
+                etat = 'crees'
+            elif tuple(actuel) != valeurs:
+                etat = 'modifies'
+            else:
+                etat = 'inchanges'
+            if nip not in deja_vus:
+                rapport[etat] += 1
+            if etat == 'inchanges':
+                continue
+            a_ecrire.append(NipReference(nip=nip, **dict(zip(CHAMPS_MODIFIABLES, valeurs))))
+        
+        NipReference.objects.bulk_create(
+            a_ecrire,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['nip'],
+            update_fields=list(CHAMPS_MODIFIABLES)
+        )
+    
+    if desactiver_absents and vus:
+        absents = [
+            nip for nip in NipReference.objects.filter(is_active=True).values_list(
+                'nip', flat=True
+            ).iterator(chunk_size=TAILLE_PAQUET)
+            if nip not in vus
+        ]
+        for debut in range(0, len(absents), 500):
+            rapport['desactives'] += NipReference.objects.filter(
+                nip__in=absents[debut:debut + 500]
+            ).update(is_active=False)
@@ -1,9 +1,13 @@
 """
 Signaux pour la gestion automatique des profils utilisateurs
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Participante, UserProfile
+
+from api.conditionnel import marquer_modification
+from .models import NipReference, Participante, UserProfile
+from .recherche import desindexer_profil, indexer_profil
+from .referentiel_nip import RESSOURCE_NIP
 
 
 @receiver(post_save, sender=Participante)
@@ -18,7 +22,32 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Participante)
 def save_user_profile(sender, instance, **kwargs):
     """
-    Sauvegarde le profil utilisateur quand la Participante est sauvegardée
+    Sauvegarde le profil utilisateur quand la Participante est sauvegardée,
+    ou le crée s'il manque (participante créée sans signaux) : la recherche
+    passe par le profil
     """
     if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+        instance.profile.save()
+    else:
+        UserProfile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def indexer_profil_recherche(sender, instance, **kwargs):
+    """Met à jour l'index de recherche (FTS5 sous SQLite) du profil enregistré"""
+    indexer_profil(instance)
+
+
+@receiver(post_delete, sender=UserProfile)
+def desindexer_profil_recherche(sender, instance, **kwargs):
+    """Retire le profil supprimé de l'index de recherche"""
+    desindexer_profil(instance)
+
+
+@receiver([post_save, post_delete], sender=NipReference)
+def nip_reference_modifie(sender, instance, **kwargs):
+    """
+    NIP de référence modifié (administration) : avance la version du
+    référentiel (filtres de Bloom reconstruits, cache des recherches oublié)
+    """
+    marquer_modification(RESSOURCE_NIP)
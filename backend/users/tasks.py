@@ -3,10 +3,12 @@ Tâches pour la gestion des utilisateurs
 Version simplifiée sans Celery pour les tests
 """
 import logging
-from django.core.mail import send_mail
+from celery import shared_task
 from django.conf import settings
 from django.utils import timezone
 from .models import Participante
+from .presence import enregistrer_activites
+from api.emails import creer_email, envoyer_email, envoyer_emails
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +40,7 @@ L'équipe Plateforme Femmes en Politique
             print(f"Subject: {subject}")
             print(f"Message: {message}")
         else:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
+            envoyer_email(subject, message, [user.email])
         
         logger.info(f"Email de bienvenue envoyé à {user.email}")
         return True
@@ -96,13 +92,7 @@ L'équipe Plateforme Femmes en Politique
             print(f"📧 Email de {status} envoyé à {user.email}")
             print(f"Subject: {subject}")
         else:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
+            envoyer_email(subject, message, [user.email])
         
         logger.info(f"Email de {status} envoyé à {user.email}")
         return True
@@ -138,14 +128,13 @@ Vous pouvez valider ou rejeter cette inscription depuis l'administration.
             print(f"📧 Notification admin pour nouvelle inscription: {user.username}")
             print(f"Nombre d'admins à notifier: {admins.count()}")
         else:
-            for admin in admins:
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[admin.email],
-                    fail_silently=False,
-                )
+            # Un message par administrateur, envoyés sur une même connexion
+            metriques = envoyer_emails(
+                creer_email(subject, message, [email])
+                for email in admins.exclude(email='').values_list('email', flat=True)
+            )
+            if metriques['echecs'] or metriques['reportes']:
+                logger.warning(f"Notifications admin partiellement envoyées: {metriques}")
         
         logger.info(f"Notification envoyée pour nouvelle inscription: {user.username}")
         return True
@@ -219,4 +208,14 @@ def check_inactive_users():
         
     except Exception as e:
         logger.error(f"Erreur vérification utilisateurs inactifs: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+
+@shared_task
+def enregistrer_activites_participantes():
+    """
+    Recopie par lot la dernière activité notée par le suivi de présence
+    dans Participante.last_activity (au plus une écriture par participante
+    et par intervalle) ; retourne les métriques, dont les écritures évitées
+    """
+    return enregistrer_activites()
@@ -23,6 +23,8 @@ from .serializers import (
     ProfileUpdateSerializer, 
     ChangePasswordSerializer
 )
+from api.pagination import PaginationListes
+from api.tableau_de_bord import tableau_participante
 
 User = get_user_model()
 
@@ -268,6 +270,8 @@ class UserListView(generics.ListAPIView):
     
     serializer_class = SimpleParticipanteSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PaginationListes
+    champs_curseur = ('-date_joined', '-id')
     
     def get_queryset(self):
         if self.request.user.is_staff:
@@ -284,8 +288,10 @@ class UserStatsView(APIView):
     
     def get(self, request):
         user = request.user
+        # Activité : agrégat en cache (api.tableau_de_bord), recalculé
+        # après chaque inscription ou tentative de la participante
+        activite = tableau_participante(user.pk)
         
-        # Statistiques de base
         stats = {
             'profil': {
                 'nom_complet': user.get_full_name(),
@@ -295,66 +301,20 @@ class UserStatsView(APIView):
                 'est_actif': user.is_active
             },
             'activite': {
-                'formations': 0,
-                'formations_terminees': 0,
-                'events': 0,
-                'events_passes': 0,
-                'quiz_tentatives': 0,
-                'quiz_reussis': 0
+                'formations': activite['formations'],
+                'formations_terminees': activite['formations_terminees'],
+                'events': activite['events'],
+                'events_passes': activite['events_passes'],
+                'quiz_tentatives': activite['quiz_tentatives'],
+                'quiz_reussis': activite['quiz_reussis']
             },
             'progression': {
-                'formations_en_cours': 0,
-                'formations_completees': 0,
-                'certifications_obtenues': 0
+                'formations_en_cours': activite['formations_en_cours'],
+                'formations_completees': activite['formations_terminees'],
+                'certifications_obtenues': activite['certifications_obtenues']
             }
         }
         
-        try:
-            # Statistiques formations
-            inscriptions_formations = user.inscriptions_formations.all()
-            stats['activite']['formations'] = inscriptions_formations.count()
-            stats['activite']['formations_terminees'] = inscriptions_formations.filter(
-                statut='terminee'
-            ).count()
-            stats['progression']['formations_en_cours'] = inscriptions_formations.filter(
-                statut='en_cours'
-            ).count()
-            stats['progression']['formations_completees'] = inscriptions_formations.filter(
-                statut='terminee'
-            ).count()
-            
-            # Certificats
-            stats['progression']['certifications_obtenues'] = inscriptions_formations.filter(
-                certificat_genere=True
-            ).count()
-            
-        except Exception:
-            pass
-        
-        try:
-            # Statistiques événements
-            inscriptions_events = user.inscriptions_events.all()
-            stats['activite']['events'] = inscriptions_events.count()
-            stats['activite']['events_passes'] = inscriptions_events.filter(
-                statut='presente'
-            ).count()
-            
-        except Exception:
-            pass
-        
-        try:
-            # Statistiques quiz
-            from quiz.models import TentativeQuiz
-            tentatives = TentativeQuiz.objects.filter(participante=user)
-            stats['activite']['quiz_tentatives'] = tentatives.count()
-            stats['activite']['quiz_reussis'] = tentatives.filter(
-                score__gte=models.F('quiz__note_passage'),
-                date_fin__isnull=False
-            ).count()
-            
-        except Exception:
-            pass
-        
         return Response(stats)
 
 